@@ -3,7 +3,7 @@ Admin configuration for Bookings app
 """
 
 from django.contrib import admin
-from .models import Booking, Ticket, BookingCancellation
+from .models import Booking, Ticket, SeatHold, QrRenderTask, BookingCancellation
 
 
 class TicketInline(admin.TabularInline):
@@ -34,6 +34,24 @@ class TicketAdmin(admin.ModelAdmin):
     readonly_fields = ['ticket_id', 'qr_code', 'qr_data', 'created_at', 'updated_at']
 
 
+@admin.register(SeatHold)
+class SeatHoldAdmin(admin.ModelAdmin):
+    """Admin for SeatHold"""
+    list_display = ['seat', 'show', 'booking', 'final_price', 'expires_at']
+    search_fields = ['booking__booking_id']
+    list_filter = ['expires_at']
+    readonly_fields = ['created_at']
+
+
+@admin.register(QrRenderTask)
+class QrRenderTaskAdmin(admin.ModelAdmin):
+    """Admin for QrRenderTask"""
+    list_display = ['ticket', 'status', 'attempts', 'updated_at']
+    search_fields = ['ticket__ticket_id']
+    list_filter = ['status']
+    readonly_fields = ['created_at', 'updated_at']
+
+
 @admin.register(BookingCancellation)
 class BookingCancellationAdmin(admin.ModelAdmin):
     """Admin for BookingCancellation"""
@@ -0,0 +1,205 @@
+"""
+Seat holds for pending bookings
+- Claim all seats of a booking with a TTL in one set-based insert
+- Convert holds into tickets once payment completes, only if every seat
+  of the booking is still held for it
+- Release expired holds in bulk (see release_expired_holds command)
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from theatres.occupancy import mark_unheld, update_positions
+from .models import Booking, SeatHold, Ticket
+from .qr import enqueue
+
+
+def hold_expiry(now=None):
+    """Expiry timestamp for a hold taken now"""
+    ttl = getattr(settings, 'SEAT_HOLD_TTL_SECONDS', 600)
+    return (now or timezone.now()) + timedelta(seconds=ttl)
+
+
+def reclaim_expired(show, seat_ids, now=None):
+    """Drop expired holds on specific seats so they can be held again"""
+    expired = SeatHold.objects.filter(show=show, seat_id__in=seat_ids, expires_at__lte=now or timezone.now())
+    expired_seat_ids = list(expired.values_list('seat_id', flat=True))
+    if expired_seat_ids:
+        expired.delete()
+        mark_unheld(show, expired_seat_ids)
+    return expired_seat_ids
+
+
+class SeatConflict(Exception):
+    """Raised by claim_seats with the exact seats another booking won"""
+
+    def __init__(self, seats):
+        self.seats = list(seats)
+        super().__init__(', '.join(f"{seat.row}{seat.seat_number}" for seat in self.seats))
+
+
+def claim_seats(booking, priced_seats, now=None):
+    """
+    Atomically hold all requested seats for a pending booking.
+
+    The holds go in with a single INSERT that skips conflicting rows;
+    reading back which rows landed tells exactly which seats lost the
+    race. Any loss rolls back the whole claim.
+
+    Args:
+        booking: Booking in 'pending' status
+        priced_seats: iterable of (seat, base_price, tax, final_price)
+
+    Raises SeatConflict listing the seats that are already held or sold.
+    """
+    now = now or timezone.now()
+    expires_at = hold_expiry(now)
+    show = booking.show
+    holds = [
+        SeatHold(
+            booking=booking,
+            show=show,
+            seat=seat,
+            base_price=base_price,
+            tax=tax,
+            final_price=final_price,
+            expires_at=expires_at,
+        )
+        for seat, base_price, tax, final_price in priced_seats
+    ]
+    seats = {h.seat_id: h.seat for h in holds}
+
+    with transaction.atomic():
+        reclaim_expired(show, list(seats), now)
+        SeatHold.objects.bulk_create(holds, ignore_conflicts=True)
+
+        won = set(booking.seat_holds.values_list('seat_id', flat=True))
+        sold = set(
+            Ticket.objects.filter(show=show, seat_id__in=won)
+            .exclude(status='cancelled')
+            .values_list('seat_id', flat=True)
+        )
+        lost = (set(seats) - won) | sold
+        if lost:
+            raise SeatConflict(seats[seat_id] for seat_id in sorted(lost))
+
+        update_positions(show.pk, hold=[seats[seat_id].position for seat_id in won])
+        Booking.objects.filter(pk=booking.pk).update(seat_count=len(holds))
+        booking.seat_count = len(holds)
+    return holds
+
+
+class HoldsLapsed(Exception):
+    """Raised by confirm_holds when seats of the booking are no longer held for it"""
+
+    def __init__(self, booking, missing):
+        self.booking = booking
+        self.missing = missing
+        super().__init__(f'{missing} seat(s) of booking {booking.booking_id} are no longer held')
+
+
+def confirm_holds(booking):
+    """
+    Turn a booking's holds into permanent tickets after payment.
+    Holds that already lapsed but were not yet reclaimed by someone
+    else are still honoured. Tickets are bulk-inserted; their QR images
+    are queued and rendered by bookings.qr after commit. Returns the created tickets.
+
+    Raises HoldsLapsed, writing nothing, when any seat of the booking lost
+    its hold (swept, or reclaimed by another booking): a booking is never
+    confirmed with only some of its seats.
+    """
+    with transaction.atomic():
+        holds = list(booking.seat_holds.select_related('seat'))
+        expected = booking.seat_count or len(holds)  # bookings from before seat_count
+        if not holds or len(holds) < expected:
+            raise HoldsLapsed(booking, max(expected - len(holds), 1))
+        tickets = []
+        for hold in holds:
+            ticket = Ticket(
+                booking=booking,
+                show_id=hold.show_id,
+                seat=hold.seat,
+                base_price=hold.base_price,
+                tax=hold.tax,
+                final_price=hold.final_price,
+            )
+            ticket.assign_identifiers()
+            tickets.append(ticket)
+
+        # Deleting exactly the holds read above also catches one reclaimed meanwhile
+        deleted, _ = SeatHold.objects.filter(pk__in=[hold.pk for hold in holds]).delete()
+        if deleted != len(holds):
+            raise HoldsLapsed(booking, len(holds) - deleted)
+        Ticket.objects.bulk_create(tickets)
+        positions = [hold.seat.position for hold in holds]
+        update_positions(booking.show_id, book=positions, unhold=positions)
+
+        enqueue(tickets)
+    return tickets
+
+
+def release_booking_holds(booking):
+    """Release all holds of a booking (e.g. abandoned or cancelled checkout)"""
+    with transaction.atomic():
+        seat_ids = list(booking.seat_holds.values_list('seat_id', flat=True))
+        if seat_ids:
+            booking.seat_holds.all().delete()
+            mark_unheld(booking.show, seat_ids)
+    return len(seat_ids)
+
+
+def release_expired_holds(now=None, batch_size=1000):
+    """
+    Delete every hold that expired before `now`, or whose show has started
+    by then, in primary-key batches.
+    Each batch costs a SELECT, a DELETE, a re-hold check and one map update
+    per affected show, independent of how many holds it contains.
+    Returns the number of holds released.
+    """
+    now = now or timezone.now()
+    lapsed = Q(expires_at__lte=now) | Q(show__starts_at__lte=now)
+    released = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            SeatHold.objects.filter(lapsed, pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'show_id', 'seat__position')[:batch_size]
+        )
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+
+        positions_by_show = defaultdict(set)
+        for _, show_id, position in batch:
+            positions_by_show[show_id].add(position)
+
+        with transaction.atomic():
+            deleted, _ = SeatHold.objects.filter(
+                lapsed, pk__in=[row[0] for row in batch]
+            ).delete()
+            # A seat may have been re-held since the batch was read; keep its bit
+            still_held = SeatHold.objects.filter(
+                show_id__in=positions_by_show.keys(),
+                seat__position__in=set().union(*positions_by_show.values()),
+            ).values_list('show_id', 'seat__position')
+            for show_id, position in still_held:
+                positions_by_show[show_id].discard(position)
+            for show_id, positions in positions_by_show.items():
+                update_positions(show_id, unhold=positions)
+        released += deleted
+    return released
+
+
+def booking_hold_lapsed(booking, now=None):
+    """True when a pending booking has neither tickets nor unexpired holds"""
+    now = now or timezone.now()
+    if booking.seat_holds.filter(expires_at__gt=now).exists():
+        return False
+    return not booking.tickets.exists()
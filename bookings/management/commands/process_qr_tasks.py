@@ -0,0 +1,42 @@
+"""
+Management command to render ticket QR images still waiting in the queue.
+The web process renders them in background threads after each booking;
+run this after a restart (or from cron) to finish anything left behind.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from bookings.qr import process_tasks, requeue_stale
+
+
+class Command(BaseCommand):
+    help = 'Render pending ticket QR images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of tickets to render (default: all pending)',
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=10,
+            help='Requeue tasks stuck in "running" for this long (default: 10)',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Also retry tasks that previously failed',
+        )
+
+    def handle(self, *args, **options):
+        older_than = timezone.now() - timedelta(minutes=options['stale_minutes'])
+        requeued = requeue_stale(older_than, include_failed=options['retry_failed'])
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} stale QR tasks')
+        rendered = process_tasks(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Rendered {rendered} ticket QR codes'))
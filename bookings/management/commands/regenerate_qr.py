@@ -34,9 +34,10 @@ class Command(BaseCommand):
                 if regenerate_all:
                     ticket.qr_data = ''
                     ticket.qr_code = None
+                    ticket.save(update_fields=['qr_data', 'qr_code', 'updated_at'])
 
-                # Save will trigger QR generation if needed
-                ticket.save()
+                # Renders synchronously; the background queue is not involved
+                ticket.ensure_qr_code()
                 count += 1
                 self.stdout.write(f'  ✓ Ticket {ticket.ticket_id}')
             except Exception as e:
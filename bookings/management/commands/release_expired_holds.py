@@ -0,0 +1,24 @@
+"""
+Management command to release seat holds whose TTL has passed.
+Schedule it every minute or so (cron/systemd timer) to return abandoned
+checkout seats to sale.
+"""
+
+from django.core.management.base import BaseCommand
+from bookings.holds import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = 'Release expired seat holds for pending bookings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of holds deleted per statement (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        released = release_expired_holds(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired seat holds'))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_seat_hold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QrRenderTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ticket', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='qr_task', to='bookings.ticket')),
+            ],
+            options={
+                'verbose_name': 'QR Render Task',
+                'verbose_name_plural': 'QR Render Tasks',
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='bookings_qr_status_2c4697_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def count_booked_seats(apps, schema_editor):
+    """seat_count of existing bookings: their tickets, or their holds while pending"""
+    Booking = apps.get_model('bookings', 'Booking')
+
+    def per_booking(model_name):
+        rows = apps.get_model('bookings', model_name).objects.filter(booking=OuterRef('pk'))
+        return Coalesce(Subquery(rows.order_by().values('booking').annotate(n=Count('pk')).values('n')), Value(0))
+
+    Booking.objects.update(seat_count=Greatest(per_booking('Ticket'), per_booking('SeatHold')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_qr_render_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='seat_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_booked_seats, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,8 @@
 Bookings App Models
 - Booking: Main booking record with multiple tickets
 - Ticket: Individual ticket for a specific seat
+- SeatHold: Time-limited seat reservation for a pending booking
+- QrRenderTask: Queue of tickets whose QR image is rendered in the background
 - Generates QR code for tickets
 """
 
@@ -10,10 +12,7 @@ from django.core.validators import MinValueValidator
 from django.urls import reverse
 from django.conf import settings
 import uuid
-import qrcode
-from io import BytesIO
-from django.core.files import File
-from PIL import Image
+from django.core.files.base import ContentFile
 
 
 class Booking(models.Model):
@@ -25,6 +24,7 @@ class Booking(models.Model):
         ('confirmed', 'Confirmed'),
         ('cancelled', 'Cancelled'),
         ('completed', 'Completed'),
+        ('refund_required', 'Refund Required'),  # paid after its seats were released
     ]
     
     booking_id = models.CharField(max_length=20, unique=True, editable=False)
@@ -35,6 +35,7 @@ class Booking(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, validators=[MinValueValidator(0)])
     final_amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
+    seat_count = models.PositiveSmallIntegerField(default=0, editable=False)  # seats claimed at checkout
     
     # Status tracking
     status = models.CharField(max_length=20, choices=BOOKING_STATUS_CHOICES, default='pending')
@@ -69,8 +70,8 @@ class Booking(models.Model):
         super().save(*args, **kwargs)
     
     def get_ticket_count(self):
-        """Get total number of tickets in this booking"""
-        return self.tickets.count()
+        """Get total number of tickets (or held seats while pending) in this booking"""
+        return self.tickets.count() or self.seat_holds.count()
 
 
 class Ticket(models.Model):
@@ -106,14 +107,37 @@ class Ticket(models.Model):
     class Meta:
         verbose_name = "Ticket"
         verbose_name_plural = "Tickets"
-        unique_together = ['show', 'seat']  # Can't have duplicate seat in same show
+        constraints = [
+            # Can't have duplicate seat in same show; cancelled tickets free the seat
+            models.UniqueConstraint(
+                fields=['show', 'seat'],
+                condition=~models.Q(status='cancelled'),
+                name='unique_active_ticket_per_seat',
+            ),
+        ]
         ordering = ['created_at']
     
     def __str__(self):
         return f"Ticket #{self.ticket_id} - {self.seat}"
     
     def save(self, *args, **kwargs):
-        """Generate ticket ID and QR code"""
+        """Generate ticket ID; the QR image is rendered after commit by bookings.qr"""
+        self.assign_identifiers()
+        
+        is_new = self._state.adding
+        super().save(*args, **kwargs)
+        
+        if is_new:
+            from .qr import enqueue
+            if not self.qr_code:
+                enqueue([self])
+            # Keep the show's occupancy map in step with new tickets
+            if self.status != 'cancelled':
+                from theatres.occupancy import mark_booked
+                mark_booked(self.show, [self.seat_id])
+    
+    def assign_identifiers(self):
+        """Fill ticket_id and qr_data; also used before bulk inserts, which skip save()"""
         if not self.ticket_id:
             self.ticket_id = f"TK{uuid.uuid4().hex[:8].upper()}"
         
@@ -132,32 +156,78 @@ class Ticket(models.Model):
                 site = site[:-1]
 
             self.qr_data = f"{site}{path}" if site else path
-        
-        # Generate QR code before saving (to ensure we save once with all data)
-        if not self.qr_code and self.booking_id and self.seat_id:
-            self.qr_code = self.generate_qr_code()
-        
-        super().save(*args, **kwargs)
+    
+    def ensure_qr_code(self):
+        """Render and store the QR image if it is missing (run by the bookings.qr workers)"""
+        if self.qr_code:
+            return False
+        self.qr_code = self.generate_qr_code()
+        super().save(update_fields=['qr_code', 'updated_at'])
+        return True
     
     def generate_qr_code(self):
         """Generate QR code for the ticket"""
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(self.qr_data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Save to BytesIO object
-        file_name = f"qr_{self.ticket_id}.png"
-        file_path = BytesIO()
-        img.save(file_path)
-        
-        return File(file_path, name=file_name)
+        from .qr import render_qr_png
+        return ContentFile(render_qr_png(self.qr_data), name=f"qr_{self.ticket_id}.png")
+
+
+class QrRenderTask(models.Model):
+    """
+    Pending QR image render for a ticket.
+    Rows are created with the ticket and deleted once the image is stored.
+    """
+    TASK_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    ]
+    
+    ticket = models.OneToOneField(Ticket, on_delete=models.CASCADE, related_name='qr_task')
+    status = models.CharField(max_length=20, choices=TASK_STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    last_error = models.CharField(max_length=255, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "QR Render Task"
+        verbose_name_plural = "QR Render Tasks"
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"QR task - {self.ticket_id} ({self.status})"
+
+
+class SeatHold(models.Model):
+    """
+    Temporary claim on a seat while its booking awaits payment.
+    Converted into a Ticket on payment, released by the expiry sweeper otherwise.
+    """
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='seat_holds')
+    show = models.ForeignKey('theatres.Show', on_delete=models.CASCADE, related_name='seat_holds')
+    seat = models.ForeignKey('theatres.Seat', on_delete=models.CASCADE, related_name='holds')
+    
+    # Pricing captured at booking time and copied onto the ticket
+    base_price = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(0)])
+    tax = models.DecimalField(max_digits=8, decimal_places=2, default=0, validators=[MinValueValidator(0)])
+    final_price = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(0)])
+    
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Seat Hold"
+        verbose_name_plural = "Seat Holds"
+        unique_together = ['show', 'seat']  # One hold per seat per show
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"Hold {self.seat} until {self.expires_at:%H:%M:%S}"
 
 
 class BookingCancellation(models.Model):
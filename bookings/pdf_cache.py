@@ -0,0 +1,96 @@
+"""
+On-disk cache of rendered ticket PDFs
+- Files live in TICKET_PDF_CACHE_DIR/<booking_id>/, one per ticket download
+  and one for the whole-booking download
+- File names carry a digest of everything printed on the pages (and the
+  renderer version and mode), so a changed ticket misses the cache by construction
+- Booking status transitions (payment, cancellation) drop the booking's directory
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+
+from .ticket_pdf import RENDER_VERSION, render_mode, ticket_page_fields
+
+
+def cache_root():
+    return Path(getattr(settings, 'TICKET_PDF_CACHE_DIR', Path(settings.BASE_DIR) / 'cache' / 'ticket_pdfs'))
+
+
+def content_digest(tickets, numbered=False):
+    """Digest of the page text of the given tickets as they would be rendered"""
+    count = len(tickets)
+    pages = [
+        ticket_page_fields(ticket, *((idx + 1, count) if numbered else ()))
+        for idx, ticket in enumerate(tickets)
+    ]
+    payload = json.dumps([RENDER_VERSION, render_mode(), pages], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def cache_path(booking, name, tickets, numbered=False):
+    """Path of the cached PDF `name` (e.g. 'booking' or a ticket id) for this content"""
+    return cache_root() / booking.booking_id / f'{name}-{content_digest(tickets, numbered)}.pdf'
+
+
+def open_cached(path):
+    """Open a cached PDF for reading, or None on a miss"""
+    try:
+        return open(path, 'rb')
+    except FileNotFoundError:
+        return None
+
+
+def _prune_siblings(path):
+    # Older renders of the same document can never be hit again
+    name = path.name.rsplit('-', 1)[0]
+    for sibling in path.parent.glob(f'{name}-*.pdf'):
+        if sibling != path and sibling.name.rsplit('-', 1)[0] == name:
+            sibling.unlink(missing_ok=True)
+
+
+def store(path, data):
+    """Write a rendered PDF atomically into the cache"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.part')
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+    _prune_siblings(path)
+    return path
+
+
+def stream_into(path, chunks):
+    """
+    Pass a streamed PDF through while writing it to the cache.
+    The file only appears once the last chunk was sent; an aborted download
+    leaves nothing behind.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.part')
+    complete = False
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+                yield chunk
+        complete = True
+    finally:
+        if complete:
+            os.replace(tmp, path)
+            _prune_siblings(path)
+        else:
+            Path(tmp).unlink(missing_ok=True)
+
+
+def invalidate_booking(booking):
+    """Drop every cached PDF of a booking once the current transaction commits"""
+    directory = cache_root() / booking.booking_id
+    transaction.on_commit(lambda: shutil.rmtree(directory, ignore_errors=True))
@@ -0,0 +1,198 @@
+"""
+Minimal PDF writer for ticket documents
+- Every page has one content stream and at most one image, so object numbers
+  are fixed by the page count and pages are written (and dropped) one at a
+  time; a response can stream while pages render
+- jpeg_page(): a full-page JPEG (the DCTDecode encoding Pillow's PDF plugin
+  uses for RGB images), for raster tickets encoded in worker processes
+- ContentStream: vector drawing (rectangles, lines, Helvetica text, one
+  image) in top-left pixel coordinates, for kilobyte-sized tickets
+- No dependencies beyond the standard library
+"""
+
+import zlib
+from collections import namedtuple
+
+# content: drawing operators; image: (dictionary entries, data) or None
+PdfPage = namedtuple('PdfPage', ['content', 'image'])
+
+# Standard Type 1 fonts need no embedding; text is WinAnsi (cp1252) encoded
+STANDARD_FONTS = {
+    'F1': 'Helvetica',
+    'F2': 'Helvetica-Bold',
+}
+
+# Distance from the top of a line of text to its baseline, per point of size
+# (Helvetica's ascender), so text lines up with Pillow's top-left anchoring
+ASCENT = 0.718
+
+
+def jpeg_page(jpeg, page_size):
+    """A page that is one full-page JPEG image"""
+    width, height = page_size
+    return PdfPage(
+        f'q {width} 0 0 {height} 0 0 cm /Im0 Do Q'.encode('ascii'),
+        (f'/Width {width} /Height {height} /ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode', jpeg),
+    )
+
+
+def _number(value):
+    return f'{value:.2f}'.rstrip('0').rstrip('.')
+
+
+def _color(rgb):
+    return ' '.join(_number(c / 255) for c in rgb)
+
+
+def _pdf_string(text):
+    data = text.encode('cp1252', errors='replace')
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+class ContentStream:
+    """
+    Vector drawing operators for one page.
+    Coordinates are pixels from the top-left (as in Pillow) and are flipped
+    to PDF's bottom-left origin.
+    """
+
+    def __init__(self, page_size):
+        self.width, self.height = page_size
+        self.ops = []
+
+    def _y(self, y):
+        return _number(self.height - y)
+
+    def fill_rect(self, x0, y0, x1, y1, fill):
+        self.ops.append(
+            f'{_color(fill)} rg {_number(x0)} {self._y(y1)} {_number(x1 - x0)} {_number(y1 - y0)} re f'.encode('ascii')
+        )
+
+    def stroke_rect(self, x0, y0, x1, y1, outline, width=1):
+        # Pillow draws outlines inside the box; PDF strokes are centred on the path
+        inset = width / 2
+        self.ops.append(
+            f'{_color(outline)} RG {_number(width)} w {_number(x0 + inset)} {self._y(y1 - inset)} '
+            f'{_number(x1 - x0 - width)} {_number(y1 - y0 - width)} re S'.encode('ascii')
+        )
+
+    def line(self, x0, y0, x1, y1, fill, width=1):
+        self.ops.append(
+            f'{_color(fill)} RG {_number(width)} w {_number(x0)} {self._y(y0)} m {_number(x1)} {self._y(y1)} l S'.encode('ascii')
+        )
+
+    def text(self, x, y, text, size, fill, font='F1'):
+        """Draw text with its top at y (Pillow's default anchor)"""
+        self.ops.append(
+            f'BT /{font} {_number(size)} Tf {_color(fill)} rg {_number(x)} {self._y(y + size * ASCENT)} Td '.encode('ascii')
+            + _pdf_string(text) + b' Tj ET'
+        )
+
+    def image(self, x, y, width, height):
+        """Place the page's image (/Im0) in the given box"""
+        self.ops.append(
+            f'q {_number(width)} 0 0 {_number(height)} {_number(x)} {self._y(y + height)} cm /Im0 Do Q'.encode('ascii')
+        )
+
+    def extend(self, other_ops):
+        self.ops.extend(other_ops)
+
+    def getvalue(self):
+        return b'\n'.join(self.ops)
+
+
+def gray_image(image):
+    """Image entry for a Pillow image in mode '1' or 'L' (e.g. a QR code)"""
+    if image.mode not in ('1', 'L'):
+        image = image.convert('L')
+    bits = 1 if image.mode == '1' else 8
+    width, height = image.size
+    return (
+        f'/Width {width} /Height {height} /ColorSpace /DeviceGray /BitsPerComponent {bits} /Filter /FlateDecode',
+        zlib.compress(image.tobytes(), 9),
+    )
+
+
+def iter_pdf(pages, page_count, page_size, fonts=None):
+    """
+    Yield a PDF, one chunk per page, from an iterable of PdfPage.
+
+    The catalog, page tree and fonts go out first and every page is written
+    as soon as it arrives; only byte offsets are kept for the trailing xref.
+
+    Args:
+        pages: iterable of PdfPage, in page order
+        page_count: number of pages `pages` will produce
+        page_size: (width, height) of every page in points
+        fonts: resource name -> standard font name, for pages with text
+    """
+    width, height = page_size
+    fonts = fonts or {}
+    offsets = []
+    position = 0
+
+    def obj(number, body, stream=None):
+        chunk = f'{number} 0 obj\n{body}'.encode('ascii')
+        if stream is not None:
+            chunk += b'\nstream\n' + stream + b'\nendstream'
+        return chunk + b'\nendobj\n'
+
+    def emit(*parts):
+        # Record the offset of each object and return the joined chunk
+        nonlocal position
+        out = []
+        for number, chunk in parts:
+            if number is not None:
+                offsets.append(position)
+            out.append(chunk)
+            position += len(chunk)
+        return b''.join(out)
+
+    # Object numbers: 1 catalog, 2 page tree, fonts, then page/content/image per page
+    font_numbers = {name: 3 + idx for idx, name in enumerate(fonts)}
+    first_page = 3 + len(fonts)
+
+    def page_number(idx):
+        return first_page + idx * 3
+
+    kids = ' '.join(f'{page_number(idx)} 0 R' for idx in range(page_count))
+    yield emit(
+        (None, b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'),
+        (1, obj(1, '<< /Type /Catalog /Pages 2 0 R >>')),
+        (2, obj(2, f'<< /Type /Pages /Kids [{kids}] /Count {page_count} >>')),
+        *(
+            (number, obj(number, f'<< /Type /Font /Subtype /Type1 /BaseFont /{fonts[name]} /Encoding /WinAnsiEncoding >>'))
+            for name, number in font_numbers.items()
+        ),
+    )
+    font_resources = ''
+    if fonts:
+        font_resources = '/Font << ' + ' '.join(f'/{name} {number} 0 R' for name, number in font_numbers.items()) + ' >> '
+
+    written = 0
+    for idx, page in enumerate(pages):
+        if idx >= page_count:
+            raise ValueError(f'more than {page_count} pages supplied')
+        number, contents, image = page_number(idx), page_number(idx) + 1, page_number(idx) + 2
+        content = zlib.compress(page.content, 6)
+        # Pages without an image still get a (1x1 white) one so numbering stays fixed
+        image_entries, image_data = page.image or ('/Width 1 /Height 1 /ColorSpace /DeviceGray /BitsPerComponent 8', b'\xff')
+        yield emit(
+            (number, obj(
+                number,
+                f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] '
+                f'/Resources << {font_resources}/XObject << /Im0 {image} 0 R >> /ProcSet [/PDF /Text /ImageB /ImageC] >> '
+                f'/Contents {contents} 0 R >>',
+            )),
+            (contents, obj(contents, f'<< /Length {len(content)} /Filter /FlateDecode >>', content)),
+            (image, obj(image, f'<< /Type /XObject /Subtype /Image {image_entries} /Length {len(image_data)} >>', image_data)),
+        )
+        written += 1
+    if written != page_count:
+        raise ValueError(f'expected {page_count} pages, got {written}')
+
+    size = page_number(page_count)
+    xref = [f'xref\n0 {size}\n0000000000 65535 f \n']
+    xref.extend(f'{offset:010d} 00000 n \n' for offset in offsets)
+    xref.append(f'trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n')
+    yield ''.join(xref).encode('ascii')
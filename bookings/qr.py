@@ -0,0 +1,140 @@
+"""
+Deferred ticket QR rendering
+- QrRenderTask rows queue tickets whose QR image still has to be drawn
+- A small thread pool drains the queue after the booking transaction commits
+- render_qr_png() renders on demand while a ticket's image is still pending
+"""
+
+import base64
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import QrRenderTask
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def render_qr_png(data):
+    """Encode data as a QR code and return PNG bytes"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    buf = BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buf)
+    return buf.getvalue()
+
+
+def qr_png_for(ticket):
+    """PNG bytes of a ticket's QR: the stored file if rendered, else drawn on demand"""
+    if ticket.qr_code and ticket.qr_code.name:
+        try:
+            with ticket.qr_code.open('rb') as fh:
+                return fh.read()
+        except (FileNotFoundError, OSError):
+            pass
+    return render_qr_png(ticket.qr_data)
+
+
+def qr_src_for(ticket):
+    """URL (or inline data URI while pending) suitable for an <img> tag"""
+    if ticket.qr_code and ticket.qr_code.name:
+        return ticket.qr_code.url
+    return 'data:image/png;base64,' + base64.b64encode(render_qr_png(ticket.qr_data)).decode('ascii')
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = max(1, getattr(settings, 'QR_RENDER_WORKERS', 2))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='qr-render')
+        return _executor
+
+
+def enqueue(tickets):
+    """
+    Queue QR rendering for tickets created in the current transaction.
+    Work is handed to the pool only after commit, so rendering never
+    holds the booking transaction or the SQLite write lock.
+    """
+    ticket_pks = [t.pk for t in tickets if t.pk]
+    if not ticket_pks:
+        return
+    QrRenderTask.objects.bulk_create(
+        [QrRenderTask(ticket_id=pk) for pk in ticket_pks], ignore_conflicts=True
+    )
+    transaction.on_commit(lambda: _dispatch(ticket_pks))
+
+
+def requeue_stale(older_than, include_failed=False):
+    """Put tasks stuck in 'running' (e.g. after a worker restart) back in the queue"""
+    stuck = QrRenderTask.objects.filter(status='running', updated_at__lt=older_than)
+    if include_failed:
+        stuck = stuck | QrRenderTask.objects.filter(status='failed')
+    return stuck.update(status='pending', updated_at=timezone.now())
+
+
+def _dispatch(ticket_pks):
+    if getattr(settings, 'QR_RENDER_WORKERS', 2) <= 0:
+        process_tasks(ticket_pks)
+        return
+    _get_executor().submit(_run_in_worker, ticket_pks)
+
+
+def _run_in_worker(ticket_pks):
+    close_old_connections()
+    try:
+        process_tasks(ticket_pks)
+    except Exception:
+        logger.exception('QR render batch failed')
+    finally:
+        close_old_connections()
+
+
+def process_tasks(ticket_pks=None, limit=None):
+    """
+    Render QR images for pending tasks (optionally restricted to ticket_pks).
+    Each task is claimed with a conditional UPDATE so concurrent workers
+    never render the same ticket twice; finished tasks are deleted.
+    Returns the number rendered.
+    """
+    tasks = QrRenderTask.objects.filter(status='pending')
+    if ticket_pks is not None:
+        tasks = tasks.filter(ticket_id__in=ticket_pks)
+    task_pks = list(tasks.order_by('pk').values_list('pk', flat=True)[:limit])
+
+    rendered = 0
+    for task_pk in task_pks:
+        claimed = QrRenderTask.objects.filter(pk=task_pk, status='pending').update(
+            status='running', attempts=F('attempts') + 1, updated_at=timezone.now()
+        )
+        if not claimed:
+            continue
+        task = QrRenderTask.objects.select_related('ticket').get(pk=task_pk)
+        try:
+            task.ticket.ensure_qr_code()
+        except Exception as exc:
+            logger.exception('QR render failed for ticket %s', task.ticket_id)
+            QrRenderTask.objects.filter(pk=task_pk).update(
+                status='failed', last_error=str(exc)[:255], updated_at=timezone.now()
+            )
+            continue
+        QrRenderTask.objects.filter(pk=task_pk).delete()
+        rendered += 1
+    return rendered
@@ -0,0 +1,119 @@
+"""
+Tests for the bookings app
+- bookings.holds: conflicting claims, confirming holds after they lapsed,
+  the expiry sweeper releasing seats and show counters
+"""
+
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from movies.models import Movie
+from theatres.models import Theatre, Screen, Seat, Show
+from theatres.occupancy import get_seat_map
+from .holds import HoldsLapsed, SeatConflict, claim_seats, confirm_holds, release_expired_holds
+from .models import Booking, SeatHold, Ticket
+
+
+class SeatHoldTest(TestCase):
+    """Two customers checking out seats of the same three-seat show"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', password='-')
+        self.bob = User.objects.create_user('bob', password='-')
+        theatre = Theatre.objects.create(
+            name='Test Theatre', address='-', city='Pune', state='MH',
+            postal_code='411001', phone_number='0', email='test@example.com', total_screens=1,
+        )
+        screen = Screen.objects.create(theatre=theatre, name='Screen 1', capacity=3, total_rows=1, seats_per_row=3)
+        self.seats = [
+            Seat.objects.create(screen=screen, row='A', seat_number=number, base_price=200)
+            for number in (1, 2, 3)
+        ]
+        movie = Movie.objects.create(
+            title='Test Movie', description='-', poster='movie_posters/test.jpg',
+            release_date=date.today(), duration_minutes=120, language='english',
+        )
+        self.show = Show.objects.create(  # tomorrow, so the sweeper never sees it started
+            screen=screen, movie=movie, show_date=date.today() + timedelta(days=1), show_time=time(20, 0),
+            end_time=time(22, 0), base_ticket_price=200,
+        )
+        get_seat_map(self.show)
+
+    def claim(self, user, seats):
+        booking = Booking.objects.create(user=user, show=self.show, total_amount=400, final_amount=420)
+        claim_seats(booking, [(seat, Decimal('200'), Decimal('10'), Decimal('210')) for seat in seats])
+        return booking
+
+    def expire(self, booking):
+        booking.seat_holds.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def show_counters(self):
+        show = Show.objects.get(pk=self.show.pk)
+        return show.seats_held, show.seats_sold
+
+    def test_claim_holds_seats_and_counts_them(self):
+        booking = self.claim(self.alice, self.seats[:2])
+
+        self.assertEqual(booking.seat_count, 2)
+        self.assertEqual(booking.seat_holds.count(), 2)
+        self.assertEqual(self.show_counters(), (2, 0))
+
+    def test_conflicting_claim_is_rejected_whole(self):
+        self.claim(self.alice, self.seats[:2])
+        booking = Booking.objects.create(user=self.bob, show=self.show, total_amount=400, final_amount=420)
+
+        with self.assertRaises(SeatConflict) as raised:
+            claim_seats(booking, [(seat, Decimal('200'), Decimal('10'), Decimal('210')) for seat in self.seats[1:]])
+        self.assertEqual(raised.exception.seats, [self.seats[1]])
+        # The free seat of the losing claim is not left held
+        self.assertFalse(SeatHold.objects.filter(booking=booking).exists())
+        self.assertFalse(SeatHold.objects.filter(seat=self.seats[2]).exists())
+        self.assertEqual(self.show_counters(), (2, 0))
+
+    def test_confirm_turns_holds_into_tickets(self):
+        booking = self.claim(self.alice, self.seats[:2])
+
+        tickets = confirm_holds(booking)
+        self.assertEqual(len(tickets), 2)
+        self.assertFalse(booking.seat_holds.exists())
+        self.assertEqual(self.show_counters(), (0, 2))
+
+    def test_confirm_after_ttl_and_reclaim_raises(self):
+        booking = self.claim(self.alice, self.seats[:2])
+        self.expire(booking)
+        self.claim(self.bob, self.seats[1:2])  # takes over the expired seat
+
+        with self.assertRaises(HoldsLapsed) as raised:
+            confirm_holds(booking)
+        self.assertEqual(raised.exception.missing, 1)
+        self.assertFalse(Ticket.objects.filter(booking=booking).exists())
+        self.assertEqual(booking.seat_holds.count(), 1)  # nothing written
+
+    def test_confirm_after_ttl_and_sweep_raises(self):
+        booking = self.claim(self.alice, self.seats[:2])
+        self.expire(booking)
+        release_expired_holds()
+
+        with self.assertRaises(HoldsLapsed):
+            confirm_holds(booking)
+        self.assertFalse(Ticket.objects.filter(booking=booking).exists())
+
+    def test_sweeper_frees_seats_and_updates_counters(self):
+        lapsed = self.claim(self.alice, self.seats[:2])
+        live = self.claim(self.bob, self.seats[2:])
+        self.expire(lapsed)
+
+        self.assertEqual(release_expired_holds(), 2)
+        self.assertFalse(lapsed.seat_holds.exists())
+        self.assertTrue(live.seat_holds.exists())
+        self.assertEqual(self.show_counters(), (1, 0))
+        seat_map = get_seat_map(Show.objects.get(pk=self.show.pk))
+        self.assertEqual(seat_map.held_bits, 1 << self.seats[2].position)
+
+        # The freed seats can be claimed again
+        self.claim(self.bob, self.seats[:2])
+        self.assertEqual(self.show_counters(), (3, 0))
@@ -0,0 +1,425 @@
+"""
+Ticket PDF rendering
+- Fonts are loaded once per process
+- The static page artwork (header, borders, labels, footer) is drawn once
+  and copied for every ticket; only per-ticket text and the QR are drawn
+- Pages of large bookings are rendered in a process pool and assembled in order
+- PDFs can be streamed page by page (see stream_tickets_pdf)
+- TICKET_PDF_MODE = 'vector' draws the same design with PDF text and shapes
+  instead of a bitmap per page (a few KB per ticket)
+- Used by download_ticket (single ticket) and booking_download (all tickets)
+"""
+
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image as PilImage, ImageDraw, ImageFont
+
+from .pdfwriter import STANDARD_FONTS, ContentStream, PdfPage, gray_image, iter_pdf, jpeg_page
+
+# Kept free of model imports at module level: pool workers are spawned
+# processes that import this module without setting up Django.
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+# Defaults for settings.TICKET_PDF_WORKERS / TICKET_PDF_PARALLEL_MIN_PAGES (same as settings.py)
+DEFAULT_WORKERS = 4
+DEFAULT_PARALLEL_MIN_PAGES = 8
+
+# Bump when the page design changes so cached PDFs (bookings.pdf_cache) are redrawn
+RENDER_VERSION = 1
+
+# PDF page size (A4-like) in pixels for Pillow at 72 DPI
+PAGE_SIZE = (595, 842)
+
+# Color scheme (matching CineBook theme)
+PRIMARY_COLOR = (102, 126, 234)  # #667eea
+SECONDARY_COLOR = (118, 75, 162)  # #764ba2
+ACCENT_COLOR = (16, 185, 129)  # #10b981
+TEXT_DARK = (45, 45, 45)  # #2d2d2d
+BORDER_COLOR = (220, 220, 220)  # #dcdcdc
+
+# Layout
+HEADER_HEIGHT = 100
+TICKET_X_START = 30
+TICKET_Y_START = 120
+TICKET_X_END = PAGE_SIZE[0] - 30
+TICKET_Y_END = TICKET_Y_START + 420
+LEFT_X = TICKET_X_START + 20
+DIVIDER_X = TICKET_X_START + 340
+QR_SIZE = 200
+QR_X = DIVIDER_X + 20
+QR_Y = TICKET_Y_START + 60
+
+# Vertical positions of the left column (fixed, so labels can be pre-drawn)
+TITLE_Y = TICKET_Y_START + 20
+TITLE_RULE_Y = TITLE_Y + 35
+TICKET_ID_Y = TITLE_RULE_Y + 15
+SHOW_DETAILS_Y = TICKET_ID_Y + 50
+DATE_Y = SHOW_DETAILS_Y + 15
+TIME_Y = DATE_Y + 20
+SEAT_BOX_Y = TIME_Y + 25
+REF_RULE_Y = SEAT_BOX_Y + 70
+BOOKING_REF_Y = REF_RULE_Y + 15
+PRICE_Y = BOOKING_REF_Y + 18
+FOOTER_Y = TICKET_Y_END + 20
+POLICY_Y = PAGE_SIZE[1] - 40
+
+FONT_SIZES = {
+    'title': 32,
+    'subtitle': 18,
+    'normal': 13,
+    'label': 11,
+    'small': 10,
+    'ticket_id': 16,
+    'seat': 24,
+}
+
+INFO_LINES = [
+    '• Present this ticket (printed or digital) at theatre entrance',
+    '• Arrive 15 minutes before show time',
+    '• Valid only for the specified show, date, and seat',
+    '• Non-transferable and non-refundable after show starts'
+]
+
+
+def _load_font(size):
+    # Try a TTF font, fall back to Pillow's bundled default
+    for name in ('arial.ttf', 'DejaVuSans.ttf'):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=1)
+def get_fonts():
+    """Fonts used on the ticket, keyed by role; loaded once per process"""
+    return {role: _load_font(size) for role, size in FONT_SIZES.items()}
+
+
+@lru_cache(maxsize=1)
+def page_template():
+    """The static part of a ticket page; callers must copy() before drawing"""
+    fonts = get_fonts()
+    width, height = PAGE_SIZE
+    canvas = PilImage.new('RGB', PAGE_SIZE, 'white')
+    draw = ImageDraw.Draw(canvas)
+
+    # ===== HEADER SECTION =====
+    draw.rectangle([(0, 0), (width, HEADER_HEIGHT)], fill=PRIMARY_COLOR)
+    draw.text((30, 20), '🎬 CineBook', font=fonts['title'], fill='white')
+    draw.text((30, 60), 'Premium Cinema Tickets', font=fonts['label'], fill='white')
+
+    # ===== MAIN TICKET SECTION =====
+    draw.rectangle(
+        [(TICKET_X_START, TICKET_Y_START), (TICKET_X_END, TICKET_Y_END)],
+        outline=PRIMARY_COLOR,
+        width=3
+    )
+
+    # Decorative corner elements
+    corner_size = 15
+    corners = [
+        (TICKET_X_START, TICKET_Y_START),
+        (TICKET_X_END - corner_size, TICKET_Y_START),
+        (TICKET_X_START, TICKET_Y_END - corner_size),
+        (TICKET_X_END - corner_size, TICKET_Y_END - corner_size)
+    ]
+    for corner in corners:
+        draw.rectangle([corner, (corner[0] + corner_size, corner[1] + corner_size)], fill=SECONDARY_COLOR)
+
+    # ===== LEFT SECTION (labels and rules) =====
+    draw.line([(LEFT_X, TITLE_RULE_Y), (DIVIDER_X - 20, TITLE_RULE_Y)], fill=BORDER_COLOR, width=2)
+    draw.text((LEFT_X, TICKET_ID_Y), 'TICKET ID', font=fonts['label'], fill=SECONDARY_COLOR)
+    draw.text((LEFT_X, SHOW_DETAILS_Y), 'SHOW DETAILS', font=fonts['label'], fill=SECONDARY_COLOR)
+
+    # Seat information box (highlighted)
+    draw.rectangle([(LEFT_X - 5, SEAT_BOX_Y - 5), (DIVIDER_X - 25, SEAT_BOX_Y + 45)], fill=ACCENT_COLOR, outline=ACCENT_COLOR)
+    draw.text((LEFT_X, SEAT_BOX_Y), 'SEAT', font=fonts['label'], fill='white')
+
+    draw.line([(LEFT_X, REF_RULE_Y), (DIVIDER_X - 20, REF_RULE_Y)], fill=BORDER_COLOR, width=1)
+
+    # ===== RIGHT SECTION (QR caption) =====
+    draw.text((QR_X, QR_Y + QR_SIZE + 15), 'Scan for entry', font=fonts['small'], fill=TEXT_DARK)
+
+    # ===== FOOTER SECTION =====
+    draw.rectangle(
+        [(TICKET_X_START, FOOTER_Y), (TICKET_X_END, FOOTER_Y + 100)],
+        outline=BORDER_COLOR,
+        width=1
+    )
+    info_y = FOOTER_Y + 10
+    draw.text((TICKET_X_START + 15, info_y), '✓ IMPORTANT INFORMATION', font=fonts['label'], fill=PRIMARY_COLOR)
+    info_y += 18
+    for line in INFO_LINES:
+        draw.text((TICKET_X_START + 15, info_y), line, font=fonts['small'], fill=TEXT_DARK)
+        info_y += 15
+
+    draw.text((TICKET_X_START, POLICY_Y), 'www.cinebook.in | support@cinebook.in | Call: 1800-CINEBOOK',
+              font=fonts['small'], fill=SECONDARY_COLOR)
+    return canvas
+
+
+def ticket_page_fields(ticket, page=None, page_count=None):
+    """
+    The text printed on a ticket's page, as plain values.
+    Pass page/page_count to print "Page x of y" in the footer.
+    """
+    try:
+        show_date = str(ticket.show.show_date)
+        show_time = str(ticket.show.show_time)
+    except Exception:
+        show_date = 'N/A'
+        show_time = 'N/A'
+
+    try:
+        seat_label = f'{ticket.seat.row}{ticket.seat.seat_number}'
+    except Exception:
+        seat_label = 'N/A'
+
+    generated = f'Generated on {ticket.booking.created_at.strftime("%d %b %Y")}'
+    if page is not None:
+        generated = f'Page {page} of {page_count} | {generated}'
+
+    return {
+        'movie_title': ticket.show.movie.title[:40],  # Truncate if too long
+        'ticket_id': ticket.ticket_id,
+        'show_date': show_date,
+        'show_time': show_time,
+        'seat_label': seat_label,
+        'booking_ref': ticket.booking.booking_id,
+        'price': f'₹ {ticket.final_price}',
+        'generated': generated,
+        'qr_data': ticket.qr_data,
+    }
+
+
+def ticket_page_data(ticket, page=None, page_count=None):
+    """ticket_page_fields plus the QR image: everything render_page needs"""
+    from .qr import qr_png_for
+
+    data = ticket_page_fields(ticket, page, page_count)
+    data['qr_png'] = qr_png_for(ticket) if ticket.qr_data else None
+    return data
+
+
+def render_page(data):
+    """Draw one ticket page (from ticket_page_data) onto a copy of the template"""
+    fonts = get_fonts()
+    canvas = page_template().copy()
+    draw = ImageDraw.Draw(canvas)
+
+    draw.text((LEFT_X, TITLE_Y), data['movie_title'], font=fonts['subtitle'], fill=TEXT_DARK)
+    draw.text((LEFT_X, TICKET_ID_Y + 14), f"#{data['ticket_id']}", font=fonts['ticket_id'], fill=PRIMARY_COLOR)
+    draw.text((LEFT_X, DATE_Y), f"Date: {data['show_date']}", font=fonts['normal'], fill=TEXT_DARK)
+    draw.text((LEFT_X, TIME_Y), f"Time: {data['show_time']}", font=fonts['normal'], fill=TEXT_DARK)
+    draw.text((LEFT_X, SEAT_BOX_Y + 18), data['seat_label'], font=fonts['seat'], fill='white')
+    draw.text((LEFT_X, BOOKING_REF_Y), f"Booking Ref: {data['booking_ref']}", font=fonts['label'], fill=SECONDARY_COLOR)
+    draw.text((LEFT_X, PRICE_Y), f"Price: {data['price']}", font=fonts['normal'], fill=TEXT_DARK)
+    draw.text((TICKET_X_START, POLICY_Y + 15), data['generated'], font=fonts['small'], fill='gray')
+
+    if data['qr_png']:
+        try:
+            qr_img = PilImage.open(BytesIO(data['qr_png'])).convert('RGB')
+            qr_img = qr_img.resize((QR_SIZE, QR_SIZE))
+            # Add white border around QR code
+            qr_with_border = PilImage.new('RGB', (QR_SIZE + 8, QR_SIZE + 8), 'white')
+            qr_with_border.paste(qr_img, (4, 4))
+            canvas.paste(qr_with_border, (QR_X, QR_Y))
+        except Exception:
+            # Placeholder for QR code
+            draw.rectangle([QR_X, QR_Y, QR_X + QR_SIZE, QR_Y + QR_SIZE], outline=BORDER_COLOR, width=2)
+            draw.text((QR_X + 30, QR_Y + 90), 'QR Code', font=fonts['label'], fill=TEXT_DARK)
+    return canvas
+
+
+def encode_page(data):
+    """Render a page and JPEG-encode it (the unit of work sent to pool workers)"""
+    buf = BytesIO()
+    render_page(data).save(buf, format='JPEG')
+    return buf.getvalue()
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn, not fork: the web process may be multi-threaded
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def _pool_result(data, future):
+    # A crashed worker breaks the whole pool: rebuild it later, render this page here
+    if future is not None:
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            _reset_pool()
+    return encode_page(data)
+
+
+def iter_encoded_pages(page_data, page_count, workers=None):
+    """
+    Yield JPEG-encoded pages in order from an iterable of page data.
+    Bookings with at least TICKET_PDF_PARALLEL_MIN_PAGES pages are spread
+    over TICKET_PDF_WORKERS processes with at most two pages per worker in
+    flight, so memory stays bounded however many tickets there are; smaller
+    ones (or workers <= 1) render in-process one canvas at a time.
+    """
+    if workers is None:
+        workers = getattr(settings, 'TICKET_PDF_WORKERS', DEFAULT_WORKERS)
+    min_pages = getattr(settings, 'TICKET_PDF_PARALLEL_MIN_PAGES', DEFAULT_PARALLEL_MIN_PAGES)
+    if workers <= 1 or page_count < max(2, min_pages):
+        for data in page_data:
+            yield encode_page(data)
+        return
+
+    pool = _get_pool(workers)
+    in_flight = deque()
+    for data in page_data:
+        try:
+            future = pool.submit(encode_page, data)
+        except BrokenProcessPool:
+            _reset_pool()
+            future = None
+        in_flight.append((data, future))
+        if len(in_flight) >= workers * 2:
+            yield _pool_result(*in_flight.popleft())
+    while in_flight:
+        yield _pool_result(*in_flight.popleft())
+
+
+def _vector_text(text):
+    # The standard PDF fonts only cover WinAnsi: no rupee sign or emoji
+    return text.replace('₹', 'Rs.').replace('✓ ', '')
+
+
+@lru_cache(maxsize=1)
+def vector_template():
+    """Drawing operators for the static part of a vector ticket page"""
+    page = ContentStream(PAGE_SIZE)
+    width, height = PAGE_SIZE
+    sizes = FONT_SIZES
+
+    # ===== HEADER SECTION =====
+    page.fill_rect(0, 0, width, HEADER_HEIGHT, PRIMARY_COLOR)
+    page.text(30, 20, 'CineBook', sizes['title'], (255, 255, 255), font='F2')
+    page.text(30, 60, 'Premium Cinema Tickets', sizes['label'], (255, 255, 255))
+
+    # ===== MAIN TICKET SECTION =====
+    page.stroke_rect(TICKET_X_START, TICKET_Y_START, TICKET_X_END, TICKET_Y_END, PRIMARY_COLOR, width=3)
+    corner_size = 15
+    for x, y in [
+        (TICKET_X_START, TICKET_Y_START),
+        (TICKET_X_END - corner_size, TICKET_Y_START),
+        (TICKET_X_START, TICKET_Y_END - corner_size),
+        (TICKET_X_END - corner_size, TICKET_Y_END - corner_size)
+    ]:
+        page.fill_rect(x, y, x + corner_size, y + corner_size, SECONDARY_COLOR)
+
+    # ===== LEFT SECTION (labels and rules) =====
+    page.line(LEFT_X, TITLE_RULE_Y, DIVIDER_X - 20, TITLE_RULE_Y, BORDER_COLOR, width=2)
+    page.text(LEFT_X, TICKET_ID_Y, 'TICKET ID', sizes['label'], SECONDARY_COLOR)
+    page.text(LEFT_X, SHOW_DETAILS_Y, 'SHOW DETAILS', sizes['label'], SECONDARY_COLOR)
+    page.fill_rect(LEFT_X - 5, SEAT_BOX_Y - 5, DIVIDER_X - 25, SEAT_BOX_Y + 45, ACCENT_COLOR)
+    page.text(LEFT_X, SEAT_BOX_Y, 'SEAT', sizes['label'], (255, 255, 255))
+    page.line(LEFT_X, REF_RULE_Y, DIVIDER_X - 20, REF_RULE_Y, BORDER_COLOR)
+
+    # ===== RIGHT SECTION (QR caption) =====
+    page.text(QR_X, QR_Y + QR_SIZE + 15, 'Scan for entry', sizes['small'], TEXT_DARK)
+
+    # ===== FOOTER SECTION =====
+    page.stroke_rect(TICKET_X_START, FOOTER_Y, TICKET_X_END, FOOTER_Y + 100, BORDER_COLOR)
+    info_y = FOOTER_Y + 10
+    page.text(TICKET_X_START + 15, info_y, 'IMPORTANT INFORMATION', sizes['label'], PRIMARY_COLOR, font='F2')
+    info_y += 18
+    for line in INFO_LINES:
+        page.text(TICKET_X_START + 15, info_y, line, sizes['small'], TEXT_DARK)
+        info_y += 15
+
+    page.text(TICKET_X_START, POLICY_Y, 'www.cinebook.in | support@cinebook.in | Call: 1800-CINEBOOK',
+              sizes['small'], SECONDARY_COLOR)
+    return tuple(page.ops)
+
+
+def render_vector_page(data):
+    """Vector counterpart of render_page: returns a PdfPage"""
+    sizes = FONT_SIZES
+    page = ContentStream(PAGE_SIZE)
+    page.extend(vector_template())
+
+    page.text(LEFT_X, TITLE_Y, data['movie_title'], sizes['subtitle'], TEXT_DARK, font='F2')
+    page.text(LEFT_X, TICKET_ID_Y + 14, f"#{data['ticket_id']}", sizes['ticket_id'], PRIMARY_COLOR)
+    page.text(LEFT_X, DATE_Y, f"Date: {data['show_date']}", sizes['normal'], TEXT_DARK)
+    page.text(LEFT_X, TIME_Y, f"Time: {data['show_time']}", sizes['normal'], TEXT_DARK)
+    page.text(LEFT_X, SEAT_BOX_Y + 18, data['seat_label'], sizes['seat'], (255, 255, 255), font='F2')
+    page.text(LEFT_X, BOOKING_REF_Y, f"Booking Ref: {data['booking_ref']}", sizes['label'], SECONDARY_COLOR)
+    page.text(LEFT_X, PRICE_Y, f"Price: {_vector_text(data['price'])}", sizes['normal'], TEXT_DARK)
+    page.text(TICKET_X_START, POLICY_Y + 15, data['generated'], sizes['small'], (128, 128, 128))
+
+    image = None
+    if data['qr_png']:
+        try:
+            image = gray_image(PilImage.open(BytesIO(data['qr_png'])))
+            page.image(QR_X + 4, QR_Y + 4, QR_SIZE, QR_SIZE)
+        except Exception:
+            image = None
+    if image is None:
+        # Placeholder for QR code
+        page.stroke_rect(QR_X, QR_Y, QR_X + QR_SIZE, QR_Y + QR_SIZE, BORDER_COLOR, width=2)
+        page.text(QR_X + 30, QR_Y + 90, 'QR Code', sizes['label'], TEXT_DARK)
+    return PdfPage(page.getvalue(), image)
+
+
+def render_mode():
+    """'raster' (bitmap pages, the default) or 'vector' (TICKET_PDF_MODE)"""
+    return getattr(settings, 'TICKET_PDF_MODE', 'raster')
+
+
+def stream_tickets_pdf(tickets, numbered=False, workers=None, mode=None):
+    """
+    Yield a PDF of the tickets, one page each, as it is rendered.
+    The header goes out before the first page is drawn; tickets must be a
+    list or queryset so the page count is known up front.
+    numbered adds "Page x of y" to every footer (multi-ticket downloads).
+    """
+    count = len(tickets)
+    page_data = (
+        ticket_page_data(ticket, *((idx + 1, count) if numbered else ()))
+        for idx, ticket in enumerate(tickets)
+    )
+    if (mode or render_mode()) == 'vector':
+        # Cheap enough to draw in-process; no pool needed
+        pages = (render_vector_page(data) for data in page_data)
+        return iter_pdf(pages, count, PAGE_SIZE, fonts=STANDARD_FONTS)
+    pages = (jpeg_page(jpeg, PAGE_SIZE) for jpeg in iter_encoded_pages(page_data, count, workers))
+    return iter_pdf(pages, count, PAGE_SIZE)
+
+
+def render_tickets_pdf(tickets, numbered=False, workers=None, mode=None):
+    """Render tickets as a PDF (see stream_tickets_pdf) and return the bytes"""
+    return b''.join(stream_tickets_pdf(list(tickets), numbered, workers, mode))
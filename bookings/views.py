@@ -10,57 +10,64 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
-from django.http import FileResponse, JsonResponse, Http404
+from django.http import FileResponse, JsonResponse, Http404, StreamingHttpResponse
 from django.db import transaction, IntegrityError
 from .models import Booking, Ticket, BookingCancellation
 from .forms import BookingForm, BookingCancellationForm
+from . import pdf_cache
+from .holds import SeatConflict, claim_seats
+from .qr import qr_src_for
+from .ticket_pdf import render_tickets_pdf, stream_tickets_pdf
 from theatres.models import Show, Seat
+from theatres.occupancy import mark_released
+from theatres.seat_finder import MAX_BLOCK_SIZE, find_best_seats
 from payments.models import Payment
 from decimal import Decimal
 import os
-from django.http import FileResponse
 from io import BytesIO
-from PIL import Image as PilImage, ImageDraw, ImageFont
 
 
 @login_required(login_url='users:login')
 @require_http_methods(["POST"])
 def create_booking(request):
     """
-    Create a new booking with selected seats
+    Create a new booking with selected seats, or with best_available=N
+    (and optional seat_type) to take the best N seats together
     """
     show_id = request.POST.get('show_id')
     seat_ids = request.POST.getlist('seats')
+    best_available = request.POST.get('best_available', '')
     discount = Decimal(request.POST.get('discount', 0))
     
-    if not show_id or not seat_ids:
+    if not show_id or not (seat_ids or best_available):
         messages.error(request, 'Please select a show and at least one seat.')
         return redirect('movies:movie_list')
     
     show = get_object_or_404(Show, id=show_id)
-    seats = Seat.objects.filter(id__in=seat_ids)
+    if not seat_ids:
+        # best_available=N: let the seat finder pick N seats together
+        count = int(best_available) if best_available.isdigit() else 0
+        if not 1 <= count <= MAX_BLOCK_SIZE:
+            messages.error(request, f'Please choose between 1 and {MAX_BLOCK_SIZE} seats.')
+            return redirect('theatres:seat_layout', show_id=show.id)
+        block = find_best_seats(show, count, seat_type=request.POST.get('seat_type') or None)
+        if block is None:
+            messages.error(request, f'Sorry, there are no {count} seats together left for this show.')
+            return redirect('theatres:seat_layout', show_id=show.id)
+        seat_ids = block.seat_ids
+    seats = list(Seat.objects.filter(id__in=seat_ids, screen_id=show.screen_id))
+    if not seats:
+        messages.error(request, 'Please select a show and at least one seat.')
+        return redirect('theatres:seat_layout', show_id=show.id)
     
     # Calculate total amount using Decimal for all calculations
     total_amount = sum((seat.base_price for seat in seats), Decimal('0'))
     tax = total_amount * Decimal('0.05')  # 5% tax
     final_amount = total_amount + tax - discount
     
-    # Check seat availability first to avoid UNIQUE constraint violations
-    already_booked = []
-    for seat in seats:
-        if Ticket.objects.filter(show=show, seat=seat).exists():
-            try:
-                label = f"{seat.row}{seat.seat_number}"
-            except Exception:
-                label = str(seat)
-            already_booked.append(label)
-
-    if already_booked:
-        messages.error(request, 'Some selected seats are already booked: ' + ', '.join(already_booked))
-        # Redirect back to the seat layout for this show
-        return redirect('theatres:seat_layout', show_id=show.id)
-
-    # Create booking and tickets inside a transaction so partial work is rolled back
+    # Create booking and claim its seats inside a transaction so partial work is rolled back.
+    # The claim reports exactly which seats were taken by someone else; holds become
+    # tickets once payment completes (see bookings.holds.confirm_holds).
     try:
         with transaction.atomic():
             booking = Booking.objects.create(
@@ -72,8 +79,9 @@ def create_booking(request):
                 status='pending'
             )
 
-            # Create tickets for each seat
+            # Price each seat and hold it for the duration of the checkout
             seat_count = len(seats)
+            priced_seats = []
             for seat in seats:
                 # If this show belongs to "Screen 2", override seat price to 300
                 # Robustly detect Screen 2 by id or name variations
@@ -98,16 +106,20 @@ def create_booking(request):
                 else:
                     seat_price = seat.base_price
 
-                Ticket.objects.create(
-                    booking=booking,
-                    show=show,
-                    seat=seat,
-                    base_price=seat_price,
-                    tax=(tax / Decimal(seat_count)),
-                    final_price=(seat_price + (tax / Decimal(seat_count))) - (discount / Decimal(seat_count))
-                )
+                priced_seats.append((
+                    seat,
+                    seat_price,
+                    (tax / Decimal(seat_count)),
+                    (seat_price + (tax / Decimal(seat_count))) - (discount / Decimal(seat_count))
+                ))
+
+            claim_seats(booking, priced_seats)
+    except SeatConflict as conflict:
+        messages.error(request, f'Some selected seats are already booked: {conflict}')
+        # Redirect back to the seat layout for this show
+        return redirect('theatres:seat_layout', show_id=show.id)
     except IntegrityError:
-        # This should be rare because we check availability above, but handle gracefully
+        # Should not happen since the claim skips conflicting rows, but handle gracefully
         messages.error(request, 'A seat was just booked by someone else. Please try selecting seats again.')
         return redirect('theatres:seat_layout', show_id=show.id)
     
@@ -124,10 +136,12 @@ def booking_detail(request, pk):
     booking = get_object_or_404(Booking, pk=pk, user=request.user)
     tickets = booking.tickets.all()
     payment = Payment.objects.filter(booking=booking).first()
+    holds = booking.seat_holds.select_related('seat') if booking.status == 'pending' else []
     
     context = {
         'booking': booking,
         'tickets': tickets,
+        'holds': holds,
         'payment': payment,
         'page_title': f'Booking Details - {booking.booking_id}',
     }
@@ -196,6 +210,7 @@ def ticket_preview(request, ticket_id):
         'show_dt': show_dt,
         'page_title': 'Ticket Details',
         'can_download': can_download,
+        'qr_src': qr_src_for(ticket),
     }
     return render(request, 'bookings/ticket_preview.html', context)
 
@@ -248,201 +263,16 @@ def download_ticket(request, ticket_id):
         raise Http404('Ticket not available.')
 
     # Serve a professional PDF ticket with details and embedded QR code
-    if ticket.qr_code and ticket.qr_code.name:
-        try:
-            # Build a ticket image using Pillow and save as PDF in-memory
-            from PIL import Image as PilImage, ImageDraw, ImageFont
-            
-            # Create canvas (A4 page)
-            width, height = (595, 842)
-            canvas = PilImage.new('RGB', (width, height), 'white')
-            draw = ImageDraw.Draw(canvas)
-
-            # Load fonts
-            try:
-                font_title = ImageFont.truetype('arial.ttf', 32)
-                font_subtitle = ImageFont.truetype('arial.ttf', 18)
-                font_normal = ImageFont.truetype('arial.ttf', 13)
-                font_label = ImageFont.truetype('arial.ttf', 11)
-                font_small = ImageFont.truetype('arial.ttf', 10)
-            except Exception:
-                font_title = ImageFont.load_default()
-                font_subtitle = ImageFont.load_default()
-                font_normal = ImageFont.load_default()
-                font_label = ImageFont.load_default()
-                font_small = ImageFont.load_default()
-
-            # Color scheme
-            primary_color = (102, 126, 234)  # #667eea
-            secondary_color = (118, 75, 162)  # #764ba2
-            accent_color = (16, 185, 129)  # #10b981
-            text_dark = (45, 45, 45)  # #2d2d2d
-            border_color = (220, 220, 220)  # #dcdcdc
-
-            # ===== HEADER SECTION =====
-            header_height = 100
-            draw.rectangle([(0, 0), (width, header_height)], fill=primary_color)
-            
-            # Cinema logo/branding
-            draw.text((30, 20), '🎬 CineBook', font=font_title, fill='white')
-            draw.text((30, 60), 'Premium Cinema Tickets', font=font_label, fill='white')
-
-            # ===== MAIN TICKET SECTION =====
-            ticket_x_start = 30
-            ticket_y_start = 120
-            ticket_width = width - 60
-            ticket_height = 420
-            ticket_x_end = ticket_x_start + ticket_width
-            ticket_y_end = ticket_y_start + ticket_height
-
-            # Main ticket border (thick outer border)
-            draw.rectangle(
-                [(ticket_x_start, ticket_y_start), (ticket_x_end, ticket_y_end)],
-                outline=primary_color,
-                width=3
-            )
-
-            # Decorative corner elements
-            corner_size = 15
-            corners = [
-                (ticket_x_start, ticket_y_start),
-                (ticket_x_end - corner_size, ticket_y_start),
-                (ticket_x_start, ticket_y_end - corner_size),
-                (ticket_x_end - corner_size, ticket_y_end - corner_size)
-            ]
-            for corner in corners:
-                draw.rectangle([corner, (corner[0] + corner_size, corner[1] + corner_size)], fill=secondary_color)
-
-            # ===== LEFT SECTION (Ticket Details) =====
-            left_x = ticket_x_start + 20
-            left_y = ticket_y_start + 20
-            divider_x = ticket_x_start + 340
-
-            # Movie title (large)
-            movie_title = ticket.show.movie.title[:40]  # Truncate if too long
-            draw.text((left_x, left_y), movie_title, font=font_subtitle, fill=text_dark)
-            left_y += 35
-
-            # Decorative line
-            draw.line([(left_x, left_y), (divider_x - 20, left_y)], fill=border_color, width=2)
-            left_y += 15
-
-            # Ticket number with barcode style
-            ticket_id_text = f'#{ticket.ticket_id}'
-            draw.text((left_x, left_y), 'TICKET ID', font=font_label, fill=secondary_color)
-            draw.text((left_x, left_y + 14), ticket_id_text, font=ImageFont.truetype('arial.ttf', 16) if font_normal else font_normal, fill=primary_color)
-            left_y += 50
-
-            # Show details
-            draw.text((left_x, left_y), 'SHOW DETAILS', font=font_label, fill=secondary_color)
-            left_y += 15
-            
-            try:
-                show_date = str(ticket.show.show_date)
-                show_time = str(ticket.show.show_time)
-            except Exception:
-                show_date = 'N/A'
-                show_time = 'N/A'
-            
-            draw.text((left_x, left_y), f'Date: {show_date}', font=font_normal, fill=text_dark)
-            left_y += 20
-            draw.text((left_x, left_y), f'Time: {show_time}', font=font_normal, fill=text_dark)
-            left_y += 25
-
-            # Seat information (highlighted)
-            try:
-                seat_label = f'{ticket.seat.row}{ticket.seat.seat_number}'
-            except Exception:
-                seat_label = 'N/A'
-
-            seat_box_y = left_y
-            draw.rectangle([(left_x - 5, seat_box_y - 5), (divider_x - 25, seat_box_y + 45)], fill=accent_color, outline=accent_color)
-            draw.text((left_x, seat_box_y), 'SEAT', font=font_label, fill='white')
-            draw.text((left_x, seat_box_y + 18), seat_label, font=ImageFont.truetype('arial.ttf', 24) if font_normal else font_normal, fill='white')
-
-            # ===== RIGHT SECTION (QR Code) =====
-            qr_size = 200
-            qr_x = divider_x + 20
-            qr_y = ticket_y_start + 60
-
-            try:
-                qr_img = PilImage.open(ticket.qr_code.path).convert('RGB')
-                qr_img = qr_img.resize((qr_size, qr_size))
-                # Add white border around QR code
-                qr_with_border = PilImage.new('RGB', (qr_size + 8, qr_size + 8), 'white')
-                qr_with_border.paste(qr_img, (4, 4))
-                canvas.paste(qr_with_border, (qr_x, qr_y))
-            except Exception:
-                # Placeholder for QR code
-                draw.rectangle([qr_x, qr_y, qr_x + qr_size, qr_y + qr_size], outline=border_color, width=2)
-                draw.text((qr_x + 30, qr_y + 90), 'QR Code', font=font_label, fill=text_dark)
-
-            draw.text((qr_x, qr_y + qr_size + 15), 'Scan for entry', font=font_small, fill=text_dark)
-
-            # Booking reference and price
-            left_y += 70
-            draw.line([(left_x, left_y), (divider_x - 20, left_y)], fill=border_color, width=1)
-            left_y += 15
-
-            draw.text((left_x, left_y), f'Booking Ref: {ticket.booking.booking_id}', font=font_label, fill=secondary_color)
-            left_y += 18
-
-            try:
-                price_str = f'₹ {ticket.final_price}'
-            except Exception:
-                price_str = '₹ 0'
-
-            draw.text((left_x, left_y), f'Price: {price_str}', font=font_normal, fill=text_dark)
-
-            # ===== FOOTER SECTION =====
-            footer_y = ticket_y_end + 20
-            
-            # Important information box
-            draw.rectangle(
-                [(ticket_x_start, footer_y), (ticket_x_end, footer_y + 100)],
-                outline=border_color,
-                width=1
-            )
-            
-            info_y = footer_y + 10
-            draw.text((ticket_x_start + 15, info_y), '✓ IMPORTANT INFORMATION', font=font_label, fill=primary_color)
-            info_y += 18
-            
-            info_lines = [
-                '• Present this ticket (printed or digital) at theatre entrance',
-                '• Arrive 15 minutes before show time',
-                '• Valid only for the specified show, date, and seat',
-                '• Non-transferable and non-refundable after show starts'
-            ]
-            
-            for line in info_lines:
-                draw.text((ticket_x_start + 15, info_y), line, font=font_small, fill=text_dark)
-                info_y += 15
-
-            # Bottom policy text
-            policy_y = height - 40
-            draw.text((ticket_x_start, policy_y), 'www.cinebook.in | support@cinebook.in | Call: 1800-CINEBOOK', 
-                     font=font_small, fill=secondary_color)
-            policy_y += 15
-            draw.text((ticket_x_start, policy_y), f'Generated on {ticket.booking.created_at.strftime("%d %b %Y")}', 
-                     font=font_small, fill='gray')
-
-            # Save to BytesIO as PDF
-            from io import BytesIO
-            buf = BytesIO()
-            canvas.save(buf, format='PDF')
-            buf.seek(0)
-
-            response = FileResponse(buf, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="CineBook_Ticket_{ticket.ticket_id}.pdf"'
-            return response
-            
-        except FileNotFoundError:
-            # If the file is missing on disk, show an informative page for owners if possible
-            if request.user.is_authenticated and ticket.booking.user == request.user:
-                messages.error(request, 'Ticket file is missing on server.')
-                return redirect('bookings:booking_detail', pk=ticket.booking.pk)
-            raise Http404('Ticket file is missing on server.')
+    # (drawn on demand if the background render has not finished yet)
+    if ticket.qr_data:
+        path = pdf_cache.cache_path(ticket.booking, ticket.ticket_id, [ticket])
+        pdf_file = pdf_cache.open_cached(path)
+        if pdf_file is None:
+            pdf_file = BytesIO(render_tickets_pdf([ticket]))
+            pdf_cache.store(path, pdf_file.getvalue())
+        response = FileResponse(pdf_file, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="CineBook_Ticket_{ticket.ticket_id}.pdf"'
+        return response
 
     # No QR code stored
     if request.user.is_authenticated and ticket.booking.user == request.user:
@@ -473,11 +303,20 @@ def cancel_booking(request, pk):
             
             # Calculate refund
             cancellation.refund_amount = booking.final_amount - cancellation.cancellation_charges
-            cancellation.save()
             
-            # Update booking status
-            booking.status = 'cancelled'
-            booking.save()
+            with transaction.atomic():
+                cancellation.save()
+                
+                # Update booking status
+                booking.status = 'cancelled'
+                booking.save()
+                
+                # Cancel the tickets and free their seats for resale
+                tickets = booking.tickets.exclude(status='cancelled')
+                seat_ids = list(tickets.values_list('seat_id', flat=True))
+                tickets.update(status='cancelled')
+                mark_released(booking.show, seat_ids)
+                pdf_cache.invalidate_booking(booking)
             
             messages.success(request, f'Booking cancelled. Refund: {cancellation.refund_amount}')
             return redirect('bookings:booking_list')
@@ -534,204 +373,19 @@ def booking_download(request, pk):
         messages.error(request, 'Payment required to download tickets.')
         return redirect('bookings:booking_detail', pk=booking.pk)
 
-    tickets = booking.tickets.all()
+    tickets = list(booking.tickets.select_related('seat', 'show__movie'))
     if not tickets:
         messages.error(request, 'No tickets available for this booking.')
         return redirect('bookings:booking_detail', pk=booking.pk)
 
-    pages = []
-    # PDF page size (A4-like) in pixels for Pillow at 72 DPI
-    width, height = (595, 842)
-
-    # Try to load a TTF font, fall back to default
-    try:
-        font_title = ImageFont.truetype('arial.ttf', 32)
-        font_subtitle = ImageFont.truetype('arial.ttf', 18)
-        font_normal = ImageFont.truetype('arial.ttf', 13)
-        font_label = ImageFont.truetype('arial.ttf', 11)
-        font_small = ImageFont.truetype('arial.ttf', 10)
-    except Exception:
-        font_title = ImageFont.load_default()
-        font_subtitle = ImageFont.load_default()
-        font_normal = ImageFont.load_default()
-        font_label = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-
-    # Color scheme (matching CineBook theme)
-    primary_color = (102, 126, 234)  # #667eea
-    secondary_color = (118, 75, 162)  # #764ba2
-    accent_color = (16, 185, 129)  # #10b981
-    text_dark = (45, 45, 45)  # #2d2d2d
-    border_color = (220, 220, 220)  # #dcdcdc
-    gold_color = (212, 175, 55)  # #d4af37 - premium gold
-
-    for idx, ticket in enumerate(tickets):
-        canvas = PilImage.new('RGB', (width, height), 'white')
-        draw = ImageDraw.Draw(canvas)
-
-        # ===== HEADER SECTION =====
-        header_height = 100
-        draw.rectangle([(0, 0), (width, header_height)], fill=primary_color)
-        
-        # Cinema logo/branding
-        draw.text((30, 20), '🎬 CineBook', font=font_title, fill='white')
-        draw.text((30, 60), 'Premium Cinema Tickets', font=font_label, fill='white')
-
-        # ===== MAIN TICKET SECTION =====
-        ticket_x_start = 30
-        ticket_y_start = 120
-        ticket_width = width - 60
-        ticket_height = 420
-        ticket_x_end = ticket_x_start + ticket_width
-        ticket_y_end = ticket_y_start + ticket_height
-
-        # Main ticket border (thick outer border)
-        draw.rectangle(
-            [(ticket_x_start, ticket_y_start), (ticket_x_end, ticket_y_end)],
-            outline=primary_color,
-            width=3
-        )
-
-        # Decorative corner elements
-        corner_size = 15
-        corners = [
-            (ticket_x_start, ticket_y_start),
-            (ticket_x_end - corner_size, ticket_y_start),
-            (ticket_x_start, ticket_y_end - corner_size),
-            (ticket_x_end - corner_size, ticket_y_end - corner_size)
-        ]
-        for corner in corners:
-            draw.rectangle([corner, (corner[0] + corner_size, corner[1] + corner_size)], fill=secondary_color)
-
-        # ===== LEFT SECTION (Ticket Details) =====
-        left_x = ticket_x_start + 20
-        left_y = ticket_y_start + 20
-        divider_x = ticket_x_start + 340
-
-        # Movie title (large)
-        movie_title = ticket.show.movie.title[:40]  # Truncate if too long
-        draw.text((left_x, left_y), movie_title, font=font_subtitle, fill=text_dark)
-        left_y += 35
-
-        # Decorative line
-        draw.line([(left_x, left_y), (divider_x - 20, left_y)], fill=border_color, width=2)
-        left_y += 15
-
-        # Ticket number with barcode style
-        ticket_id_text = f'#{ticket.ticket_id}'
-        draw.text((left_x, left_y), 'TICKET ID', font=font_label, fill=secondary_color)
-        draw.text((left_x, left_y + 14), ticket_id_text, font=ImageFont.truetype('arial.ttf', 16) if font_normal else font_normal, fill=primary_color)
-        left_y += 50
-
-        # Show details
-        draw.text((left_x, left_y), 'SHOW DETAILS', font=font_label, fill=secondary_color)
-        left_y += 15
-        
-        try:
-            show_date = str(ticket.show.show_date)
-            show_time = str(ticket.show.show_time)
-        except Exception:
-            show_date = 'N/A'
-            show_time = 'N/A'
-        
-        draw.text((left_x, left_y), f'Date: {show_date}', font=font_normal, fill=text_dark)
-        left_y += 20
-        draw.text((left_x, left_y), f'Time: {show_time}', font=font_normal, fill=text_dark)
-        left_y += 25
-
-        # Seat information (highlighted)
-        try:
-            seat_label = f'{ticket.seat.row}{ticket.seat.seat_number}'
-        except Exception:
-            seat_label = 'N/A'
-
-        seat_box_y = left_y
-        draw.rectangle([(left_x - 5, seat_box_y - 5), (divider_x - 25, seat_box_y + 45)], fill=accent_color, outline=accent_color)
-        draw.text((left_x, seat_box_y), 'SEAT', font=font_label, fill='white')
-        draw.text((left_x, seat_box_y + 18), seat_label, font=ImageFont.truetype('arial.ttf', 24) if font_normal else font_normal, fill='white')
-
-        # ===== RIGHT SECTION (QR Code) =====
-        qr_size = 200
-        qr_x = divider_x + 20
-        qr_y = ticket_y_start + 60
-
-        if ticket.qr_code and ticket.qr_code.path:
-            try:
-                qr_img = PilImage.open(ticket.qr_code.path).convert('RGB')
-                qr_img = qr_img.resize((qr_size, qr_size))
-                # Add white border around QR code
-                qr_with_border = PilImage.new('RGB', (qr_size + 8, qr_size + 8), 'white')
-                qr_with_border.paste(qr_img, (4, 4))
-                canvas.paste(qr_with_border, (qr_x, qr_y))
-            except Exception:
-                # Placeholder for QR code
-                draw.rectangle([qr_x, qr_y, qr_x + qr_size, qr_y + qr_size], outline=border_color, width=2)
-                draw.text((qr_x + 30, qr_y + 90), 'QR Code', font=font_label, fill=text_dark)
-
-        draw.text((qr_x, qr_y + qr_size + 15), 'Scan for entry', font=font_small, fill=text_dark)
-
-        # Booking reference and price
-        left_y += 70
-        draw.line([(left_x, left_y), (divider_x - 20, left_y)], fill=border_color, width=1)
-        left_y += 15
-
-        draw.text((left_x, left_y), f'Booking Ref: {booking.booking_id}', font=font_label, fill=secondary_color)
-        left_y += 18
-
-        try:
-            price_str = f'₹ {ticket.final_price}'
-        except Exception:
-            price_str = '₹ 0'
-
-        draw.text((left_x, left_y), f'Price: {price_str}', font=font_normal, fill=text_dark)
-        left_y += 20
-
-        # ===== FOOTER SECTION =====
-        footer_y = ticket_y_end + 20
-        
-        # Important information box
-        draw.rectangle(
-            [(ticket_x_start, footer_y), (ticket_x_end, footer_y + 100)],
-            outline=border_color,
-            width=1
-        )
-        
-        info_y = footer_y + 10
-        draw.text((ticket_x_start + 15, info_y), '✓ IMPORTANT INFORMATION', font=font_label, fill=primary_color)
-        info_y += 18
-        
-        info_lines = [
-            '• Present this ticket (printed or digital) at theatre entrance',
-            '• Arrive 15 minutes before show time',
-            '• Valid only for the specified show, date, and seat',
-            '• Non-transferable and non-refundable after show starts'
-        ]
-        
-        for line in info_lines:
-            draw.text((ticket_x_start + 15, info_y), line, font=font_small, fill=text_dark)
-            info_y += 15
-
-        # Bottom policy text
-        policy_y = height - 40
-        draw.text((ticket_x_start, policy_y), 'www.cinebook.in | support@cinebook.in | Call: 1800-CINEBOOK', 
-                 font=font_small, fill=secondary_color)
-        policy_y += 15
-        draw.text((ticket_x_start, policy_y), f'Page {idx + 1} of {len(tickets)} | Generated on {booking.created_at.strftime("%d %b %Y")}', 
-                 font=font_small, fill='gray')
-
-        pages.append(canvas)
-
-    # Save pages to a single PDF in-memory
-    buf = BytesIO()
-    try:
-        if len(pages) == 1:
-            pages[0].save(buf, format='PDF')
-        else:
-            pages[0].save(buf, format='PDF', save_all=True, append_images=pages[1:])
-        buf.seek(0)
-        response = FileResponse(buf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="CineBook_Tickets_{booking.booking_id}.pdf"'
-        return response
-    except Exception as e:
-        messages.error(request, f'Could not generate PDF: {e}')
-        return redirect('bookings:booking_detail', pk=booking.pk)
+    # Serve a previous render from disk; otherwise stream page by page (only
+    # one page is rendered at a time per worker) and keep a copy for next time
+    path = pdf_cache.cache_path(booking, 'booking', tickets, numbered=True)
+    pdf_file = pdf_cache.open_cached(path)
+    if pdf_file is not None:
+        response = FileResponse(pdf_file, content_type='application/pdf')
+    else:
+        stream = pdf_cache.stream_into(path, stream_tickets_pdf(tickets, numbered=True))
+        response = StreamingHttpResponse(stream, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="CineBook_Tickets_{booking.booking_id}.pdf"'
+    return response
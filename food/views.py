@@ -18,7 +18,7 @@ from theatres.models import Theatre
 from bookings.models import Booking
 from django.views.decorators.http import require_POST
 from django.http import HttpResponseForbidden
-from payments.models import Payment
+from payments.transitions import cancel_food_order as cancel_order
 
 
 def menu(request, theatre_id=None):
@@ -167,18 +167,10 @@ def cancel_food_order(request, pk):
         return redirect('food:order_detail', pk=food_order.pk)
 
     if request.method == 'POST':
-        # mark as cancelled
-        food_order.status = 'cancelled'
-        food_order.save()
-
-        # If there is a payment associated, mark as cancelled too
-        try:
-            payment = Payment.objects.filter(payment_notes__startswith=f'food_order:{food_order.pk}').first()
-            if payment:
-                payment.status = 'cancelled'
-                payment.save()
-        except Exception:
-            pass
+        # mark as cancelled, together with its unpaid payment
+        if not cancel_order(food_order):
+            messages.error(request, 'This order cannot be cancelled at this stage.')
+            return redirect('food:order_detail', pk=food_order.pk)
 
         messages.success(request, 'Your food order has been cancelled.')
         return redirect('food:order_list')
@@ -137,6 +137,35 @@ LOGOUT_REDIRECT_URL = 'users:login'
 SESSION_COOKIE_AGE = 86400  # 1 day
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
+# Seat holds: how long seats stay reserved for a pending booking awaiting payment.
+# Expired holds are released by `python manage.py release_expired_holds` (run from cron).
+SEAT_HOLD_TTL_SECONDS = config('SEAT_HOLD_TTL_SECONDS', default=600, cast=int)
+
+# Live seat status (Server-Sent Events): keepalive interval and how long one
+# connection stays open before the browser reconnects. Streams are served only
+# under ASGI (asgi.py); under WSGI the seat layout page polls seat-status instead.
+# Each process re-reads a watched show's version every SEAT_EVENTS_POLL_SECONDS
+# to pick up changes made by other processes.
+SEAT_EVENTS_KEEPALIVE_SECONDS = config('SEAT_EVENTS_KEEPALIVE_SECONDS', default=15, cast=int)
+SEAT_EVENTS_MAX_SECONDS = config('SEAT_EVENTS_MAX_SECONDS', default=300, cast=int)
+SEAT_EVENTS_POLL_SECONDS = config('SEAT_EVENTS_POLL_SECONDS', default=2, cast=int)
+# Recent seat map changes kept per show for `?since=<version>` polling
+SEAT_MAP_CHANGE_LOG_SIZE = config('SEAT_MAP_CHANGE_LOG_SIZE', default=200, cast=int)
+
+# Ticket QR images are rendered by background threads after the booking commits
+# (0 = render inline). Leftover work: `python manage.py process_qr_tasks`.
+QR_RENDER_WORKERS = config('QR_RENDER_WORKERS', default=2, cast=int)
+
+# Ticket PDFs: bookings with at least TICKET_PDF_PARALLEL_MIN_PAGES tickets are
+# rendered across TICKET_PDF_WORKERS processes (0 or 1 = render in the request)
+TICKET_PDF_WORKERS = config('TICKET_PDF_WORKERS', default=4, cast=int)
+TICKET_PDF_PARALLEL_MIN_PAGES = config('TICKET_PDF_PARALLEL_MIN_PAGES', default=8, cast=int)
+# 'raster' (one bitmap per page) or 'vector' (PDF text and shapes, a few KB per ticket)
+TICKET_PDF_MODE = config('TICKET_PDF_MODE', default='raster')
+
+# Rendered ticket PDFs are cached here (outside MEDIA_ROOT so they are never public)
+TICKET_PDF_CACHE_DIR = config('TICKET_PDF_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'ticket_pdfs'))
+
 # Email configuration - Gmail SMTP Backend
 # Check if app password is properly configured
 _email_password = config('EMAIL_HOST_PASSWORD', default='').strip()
@@ -173,6 +202,18 @@ RAZORPAY_KEY_SECRET = config('RAZORPAY_KEY_SECRET', default='KuicTTUt04XID2bNu1j
 # When False, real Razorpay API is called (requires valid API keys and internet)
 RAZORPAY_FORCE_SIMULATION = config('RAZORPAY_FORCE_SIMULATION', default=False, cast=bool)
 
+# Razorpay client (payments.gateway): API base URL (point at tools/ fake gateway
+# for local testing), per-request timeouts in seconds, connection pool size,
+# how long validated keys are trusted, and the circuit breaker (consecutive
+# failures before failing fast, and for how long)
+RAZORPAY_BASE_URL = config('RAZORPAY_BASE_URL', default='https://api.razorpay.com')
+RAZORPAY_CONNECT_TIMEOUT = config('RAZORPAY_CONNECT_TIMEOUT', default=3.05, cast=float)
+RAZORPAY_READ_TIMEOUT = config('RAZORPAY_READ_TIMEOUT', default=10, cast=float)
+RAZORPAY_POOL_SIZE = config('RAZORPAY_POOL_SIZE', default=10, cast=int)
+RAZORPAY_CLIENT_TTL_SECONDS = config('RAZORPAY_CLIENT_TTL_SECONDS', default=600, cast=int)
+RAZORPAY_BREAKER_THRESHOLD = config('RAZORPAY_BREAKER_THRESHOLD', default=3, cast=int)
+RAZORPAY_BREAKER_COOLDOWN_SECONDS = config('RAZORPAY_BREAKER_COOLDOWN_SECONDS', default=30, cast=int)
+
 # Validate Razorpay configuration
 if not RAZORPAY_KEY_ID.startswith('rzp_test_') and not RAZORPAY_KEY_ID.startswith('rzp_live_'):
     raise ValueError("Invalid RAZORPAY_KEY_ID: Must start with 'rzp_test_' or 'rzp_live_'")
@@ -16,13 +16,13 @@ class PaymentMethodAdmin(admin.ModelAdmin):
 @admin.register(Payment)
 class PaymentAdmin(admin.ModelAdmin):
     """Admin for Payment"""
-    list_display = ['payment_id', 'booking', 'amount', 'total_amount', 'status', 'payment_method', 'created_at']
+    list_display = ['payment_id', 'booking', 'food_order', 'amount', 'total_amount', 'status', 'payment_method', 'created_at']
     search_fields = ['payment_id', 'booking__booking_id', 'razorpay_payment_id']
     list_filter = ['status', 'payment_method', 'created_at']
     readonly_fields = ['payment_id', 'created_at', 'updated_at', 'completed_at']
     fieldsets = (
         ('Payment Information', {
-            'fields': ('payment_id', 'booking', 'status', 'payment_method')
+            'fields': ('payment_id', 'booking', 'food_order', 'status', 'payment_method')
         }),
         ('Amount Details', {
             'fields': ('amount', 'processing_charges', 'total_amount', 'currency')
@@ -0,0 +1,199 @@
+"""
+Shared Razorpay client
+- One client per process, built on a pooled requests session with connect
+  and read timeouts on every call
+- Credentials are checked against the API once, then trusted for
+  RAZORPAY_CLIENT_TTL_SECONDS; checkout and callback requests make no
+  extra round trip to validate keys
+- A circuit breaker stops calling the gateway after repeated failures or
+  timeouts and fails fast until a cooldown has passed
+- RAZORPAY_BASE_URL points the client at another server (e.g. a local
+  fake gateway for development)
+"""
+
+import logging
+import threading
+import time
+
+import razorpay
+import requests
+from django.conf import settings
+from razorpay.constants import URL
+from razorpay.errors import BadRequestError, GatewayError, ServerError
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Errors that count against the circuit breaker
+GATEWAY_FAILURES = (requests.RequestException, ServerError, GatewayError)
+
+
+class GatewayUnavailable(Exception):
+    """The circuit breaker is open; the gateway was not called"""
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go through. After `threshold` consecutive failures it
+    opens and rejects calls for `cooldown` seconds, then lets one trial
+    call through (half-open): success closes it, failure opens it again.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return 'open'
+        return 'half-open'
+
+    def allow(self):
+        """Whether a call may go out now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class TimeoutSession(requests.Session):
+    """requests session that applies a default timeout to every request"""
+
+    def __init__(self, timeout, pool_size):
+        super().__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+breaker = CircuitBreaker(
+    threshold=getattr(settings, 'RAZORPAY_BREAKER_THRESHOLD', 3),
+    cooldown=getattr(settings, 'RAZORPAY_BREAKER_COOLDOWN_SECONDS', 30),
+)
+
+_lock = threading.Lock()
+# (credentials, client or None, monotonic time the check expires)
+_cached = None
+
+
+def credentials():
+    """(key_id, key_secret, base_url), or None for missing or placeholder keys"""
+    key_id = (getattr(settings, 'RAZORPAY_KEY_ID', '') or '').strip()
+    key_secret = (getattr(settings, 'RAZORPAY_KEY_SECRET', '') or '').strip()
+    if not key_id or not key_secret:
+        return None
+    if 'your_' in key_id.lower() or 'your_' in key_secret.lower() or key_id.startswith('paste_'):
+        return None
+    base_url = (getattr(settings, 'RAZORPAY_BASE_URL', '') or URL.BASE_URL).rstrip('/')
+    return key_id, key_secret, base_url
+
+
+def build_client(key_id, key_secret, base_url):
+    """A Razorpay client on a pooled session with timeouts"""
+    session = TimeoutSession(
+        timeout=(
+            getattr(settings, 'RAZORPAY_CONNECT_TIMEOUT', 3.05),
+            getattr(settings, 'RAZORPAY_READ_TIMEOUT', 10),
+        ),
+        pool_size=getattr(settings, 'RAZORPAY_POOL_SIZE', 10),
+    )
+    return razorpay.Client(session=session, auth=(key_id, key_secret), base_url=base_url)
+
+
+def call(fn, *args, **kwargs):
+    """
+    Run one gateway API call through the circuit breaker.
+    Raises GatewayUnavailable without calling out while the breaker is open.
+    """
+    if not breaker.allow():
+        raise GatewayUnavailable('Payment gateway is temporarily unavailable')
+    try:
+        result = fn(*args, **kwargs)
+    except GATEWAY_FAILURES:
+        breaker.record_failure()
+        raise
+    except Exception:
+        # The gateway answered (e.g. BadRequestError); it is up
+        breaker.record_success()
+        raise
+    breaker.record_success()
+    return result
+
+
+def _check(client):
+    """
+    Validate credentials with a one-row read. Returns (client or None,
+    seconds to trust the result).
+    """
+    ttl = getattr(settings, 'RAZORPAY_CLIENT_TTL_SECONDS', 600)
+    try:
+        call(client.order.all, {'count': 1})
+    except BadRequestError:
+        logger.warning('Razorpay rejected the configured API keys')
+        return None, ttl
+    except (GatewayUnavailable, *GATEWAY_FAILURES):
+        # Gateway unreachable: keep the client so callers can fall back, check again after the cooldown
+        return client, breaker.cooldown
+    return client, ttl
+
+
+def get_client():
+    """
+    The shared Razorpay client, or None if the keys are missing, placeholders
+    or rejected by the gateway. Credentials are re-checked after the TTL or
+    when settings change.
+    """
+    global _cached
+    creds = credentials()
+    if creds is None:
+        return None
+    now = time.monotonic()
+    cached = _cached
+    if cached and cached[0] == creds and now < cached[2]:
+        return cached[1]
+    with _lock:
+        cached = _cached
+        if cached and cached[0] == creds and now < cached[2]:
+            return cached[1]
+        # Reuse the pooled client across re-checks
+        client = cached[1] if cached and cached[0] == creds and cached[1] else build_client(*creds)
+        client, ttl = _check(client)
+        _cached = (creds, client, time.monotonic() + ttl)
+        return client
+
+
+def reset():
+    """Forget the cached client and breaker state (tests, key rotation)"""
+    global _cached
+    with _lock:
+        _cached = None
+    breaker.record_success()
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def link_food_orders(apps, schema_editor):
+    """Set food_order from the 'food_order:<pk>' payment_notes, in pk batches"""
+    Payment = apps.get_model('payments', 'Payment')
+    FoodOrder = apps.get_model('food', 'FoodOrder')
+    pending = Payment.objects.filter(
+        booking=None, food_order=None, payment_notes__startswith='food_order:'
+    ).order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(pending.filter(pk__gt=last_pk).only('pk', 'payment_notes')[:BATCH_SIZE])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        wanted = {}
+        for payment in batch:
+            try:
+                wanted[payment] = int(payment.payment_notes.split(':', 1)[1])
+            except ValueError:
+                continue
+        existing = set(FoodOrder.objects.filter(pk__in=set(wanted.values())).values_list('pk', flat=True))
+        linked = []
+        for payment, order_id in wanted.items():
+            if order_id in existing:
+                payment.food_order_id = order_id
+                linked.append(payment)
+        Payment.objects.bulk_update(linked, ['food_order'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food', '0001_initial'),
+        ('payments', '0003_callback_idempotency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='food_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payments', to='food.foodorder'),
+        ),
+        migrations.RunPython(link_food_orders, migrations.RunPython.noop),
+    ]
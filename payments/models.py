@@ -49,6 +49,7 @@ class Payment(models.Model):
     payment_id = models.CharField(max_length=20, unique=True, editable=False)
     # Allow payments that are not tied to a Booking (e.g. food orders)
     booking = models.OneToOneField('bookings.Booking', on_delete=models.CASCADE, related_name='payment', null=True, blank=True)
+    food_order = models.ForeignKey('food.FoodOrder', on_delete=models.SET_NULL, related_name='payments', null=True, blank=True)
     
     # Amount details
     amount = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
@@ -79,6 +80,16 @@ class Payment(models.Model):
         indexes = [
             models.Index(fields=['payment_id']),
             models.Index(fields=['status']),
+            models.Index(fields=['razorpay_order_id']),
+        ]
+        constraints = [
+            # One gateway payment completes at most one Payment; also the
+            # index the callback's duplicate check reads
+            models.UniqueConstraint(
+                fields=['razorpay_payment_id'],
+                condition=models.Q(razorpay_payment_id__isnull=False),
+                name='unique_razorpay_payment_id',
+            ),
         ]
     
     def __str__(self):
@@ -0,0 +1,344 @@
+"""
+Tests for the payments app
+- payments.gateway against the local fake Razorpay (tools/fake_razorpay.py):
+  circuit breaker transitions, credential re-check TTL, read timeouts
+- payments.transitions: allowed and rejected status changes, compare_and_set
+  against a stale instance, completing a payment twice, lapsed seat holds
+- razorpay_callback: a repeated callback completes the payment only once
+"""
+
+import sys
+import time
+from datetime import date, time as clock, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.db import connection
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from razorpay.errors import ServerError
+
+from bookings.holds import claim_seats, release_expired_holds
+from bookings.models import Booking, BookingCancellation, Ticket
+from food.models import FoodOrder
+from movies.models import Movie
+from theatres.models import Theatre, Screen, Seat, Show
+from theatres.occupancy import get_seat_map
+from . import gateway
+from .models import Payment
+from .transitions import (
+    BOOKING_TRANSITIONS, PAYMENT_TRANSITIONS, cancel_food_order, compare_and_set,
+    complete_payment, set_payment_status,
+)
+
+sys.path.insert(0, str(Path(settings.BASE_DIR) / 'tools'))
+from fake_razorpay import FakeRazorpay, start_server  # noqa: E402
+
+
+class FakeGatewayMixin:
+    """Runs one fake Razorpay server per test class; each test starts from a healthy gateway"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.fake = FakeRazorpay(hang_seconds=1)
+        cls.server, cls.base_url = start_server(cls.fake)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.fake.error_rate = self.fake.timeout_rate = 0.0
+        self.fake.stats.clear()
+        settings_override = override_settings(
+            RAZORPAY_KEY_ID=self.fake.key_id,
+            RAZORPAY_KEY_SECRET=self.fake.key_secret,
+            RAZORPAY_BASE_URL=self.base_url,
+            RAZORPAY_READ_TIMEOUT=0.2,
+            RAZORPAY_CLIENT_TTL_SECONDS=600,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        threshold, cooldown = gateway.breaker.threshold, gateway.breaker.cooldown
+        gateway.breaker.threshold, gateway.breaker.cooldown = 2, 0.3
+        self.addCleanup(setattr, gateway.breaker, 'threshold', threshold)
+        self.addCleanup(setattr, gateway.breaker, 'cooldown', cooldown)
+        gateway.reset()
+        self.addCleanup(gateway.reset)
+
+    def razorpay_client(self):
+        return gateway.build_client(*gateway.credentials())
+
+    def requests_made(self, endpoint):
+        return self.fake.stats[endpoint]
+
+
+class CircuitBreakerTest(FakeGatewayMixin, SimpleTestCase):
+
+    def create_order(self, client):
+        return gateway.call(client.order.create, {'amount': 10000, 'currency': 'INR'})
+
+    def test_opens_after_threshold_failures_and_fails_fast(self):
+        client = self.razorpay_client()
+        self.fake.error_rate = 1.0
+        for _ in range(2):
+            with self.assertRaises(ServerError):
+                self.create_order(client)
+        self.assertEqual(gateway.breaker.state, 'open')
+
+        with self.assertRaises(gateway.GatewayUnavailable):
+            self.create_order(client)
+        self.assertEqual(self.requests_made('POST /v1/orders'), 2)
+
+    def test_half_open_trial_success_closes(self):
+        client = self.razorpay_client()
+        self.fake.error_rate = 1.0
+        for _ in range(2):
+            with self.assertRaises(ServerError):
+                self.create_order(client)
+        time.sleep(gateway.breaker.cooldown)
+        self.assertEqual(gateway.breaker.state, 'half-open')
+
+        self.fake.error_rate = 0.0
+        order = self.create_order(client)
+        self.assertTrue(order['id'].startswith('order_'))
+        self.assertEqual(gateway.breaker.state, 'closed')
+
+    def test_half_open_trial_failure_reopens(self):
+        client = self.razorpay_client()
+        self.fake.error_rate = 1.0
+        for _ in range(2):
+            with self.assertRaises(ServerError):
+                self.create_order(client)
+        time.sleep(gateway.breaker.cooldown)
+
+        with self.assertRaises(ServerError):
+            self.create_order(client)
+        self.assertEqual(gateway.breaker.state, 'open')
+        with self.assertRaises(gateway.GatewayUnavailable):
+            self.create_order(client)
+        self.assertEqual(self.requests_made('POST /v1/orders'), 3)
+
+    def test_read_timeout_counts_as_failure(self):
+        client = self.razorpay_client()
+        self.fake.timeout_rate = 1.0
+        start = time.monotonic()
+        with self.assertRaises(requests.Timeout):
+            self.create_order(client)
+        self.assertLess(time.monotonic() - start, 0.9)  # the fake hangs for 1s
+        self.assertEqual(gateway.breaker.failures, 1)
+        self.assertEqual(gateway.breaker.state, 'closed')
+
+
+class GetClientTest(FakeGatewayMixin, SimpleTestCase):
+
+    def test_credentials_checked_once_per_ttl(self):
+        client = gateway.get_client()
+        self.assertIsNotNone(client)
+        self.assertIs(gateway.get_client(), client)
+        self.assertEqual(self.requests_made('GET /v1/orders'), 1)
+
+        with override_settings(RAZORPAY_CLIENT_TTL_SECONDS=0):
+            gateway.reset()
+            first = gateway.get_client()
+            self.assertIs(gateway.get_client(), first)  # same pooled client, re-checked
+        self.assertEqual(self.requests_made('GET /v1/orders'), 3)
+
+    def test_rejected_keys_give_no_client(self):
+        with override_settings(RAZORPAY_KEY_SECRET='not-the-secret'):
+            self.assertIsNone(gateway.get_client())
+            self.assertIsNone(gateway.get_client())
+        self.assertEqual(self.requests_made('GET /v1/orders'), 1)
+
+    def test_unreachable_gateway_keeps_client_until_cooldown(self):
+        self.fake.error_rate = 1.0
+        client = gateway.get_client()
+        self.assertIsNotNone(client)  # callers can still fall back
+        self.assertEqual(self.requests_made('GET /v1/orders'), 1)
+        self.assertIs(gateway.get_client(), client)
+        self.assertEqual(self.requests_made('GET /v1/orders'), 1)
+
+        time.sleep(gateway.breaker.cooldown)
+        self.fake.error_rate = 0.0
+        self.assertIs(gateway.get_client(), client)
+        self.assertEqual(self.requests_made('GET /v1/orders'), 2)
+
+    def test_placeholder_keys_skip_the_gateway(self):
+        with override_settings(RAZORPAY_KEY_ID='your_key_id'):
+            self.assertIsNone(gateway.get_client())
+        self.assertEqual(self.requests_made('GET /v1/orders'), 0)
+
+
+class PaidBookingMixin:
+    """A show with two seats and a pending booking holding both, with its payment"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('buyer', password='-')
+        self.theatre = Theatre.objects.create(
+            name='Test Theatre', address='-', city='Pune', state='MH',
+            postal_code='411001', phone_number='0', email='test@example.com', total_screens=1,
+        )
+        screen = Screen.objects.create(theatre=self.theatre, name='Screen 1', capacity=2, total_rows=1, seats_per_row=2)
+        self.seats = [
+            Seat.objects.create(screen=screen, row='A', seat_number=number, base_price=200)
+            for number in (1, 2)
+        ]
+        movie = Movie.objects.create(
+            title='Test Movie', description='-', poster='movie_posters/test.jpg',
+            release_date=date.today(), duration_minutes=120, language='english',
+        )
+        self.show = Show.objects.create(  # tomorrow, so the hold sweeper never sees it started
+            screen=screen, movie=movie, show_date=date.today() + timedelta(days=1), show_time=clock(20, 0),
+            end_time=clock(22, 0), base_ticket_price=200,
+        )
+        get_seat_map(self.show)
+        self.booking = Booking.objects.create(user=self.user, show=self.show, total_amount=400, final_amount=420)
+        claim_seats(self.booking, [(seat, Decimal('200'), Decimal('10'), Decimal('210')) for seat in self.seats])
+        self.payment = Payment.objects.create(booking=self.booking, amount=420, total_amount=420)
+
+    def expire_holds(self):
+        self.booking.seat_holds.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+
+class CompareAndSetTest(PaidBookingMixin, TestCase):
+
+    def test_allowed_transition_writes_status_and_fields(self):
+        self.assertTrue(set_payment_status(self.payment, 'processing', razorpay_order_id='order_1'))
+        self.assertEqual(self.payment.status, 'processing')
+
+        payment = Payment.objects.get(pk=self.payment.pk)
+        self.assertEqual(payment.status, 'processing')
+        self.assertEqual(payment.razorpay_order_id, 'order_1')
+
+    def test_rejected_transition_changes_nothing(self):
+        Payment.objects.filter(pk=self.payment.pk).update(status='completed')
+        self.payment.refresh_from_db()
+
+        self.assertFalse(set_payment_status(self.payment, 'failed'))
+        self.assertFalse(compare_and_set(self.booking, BOOKING_TRANSITIONS, 'pending'))
+        self.assertEqual(Payment.objects.get(pk=self.payment.pk).status, 'completed')
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, 'pending')
+
+    def test_unknown_status_is_an_error(self):
+        with self.assertRaises(ValueError):
+            compare_and_set(self.payment, PAYMENT_TRANSITIONS, 'refunded')
+
+    def test_from_states_narrows_the_allowed_sources(self):
+        self.assertFalse(set_payment_status(self.payment, 'completed', from_states=('failed',)))
+        self.assertEqual(self.payment.status, 'pending')
+        self.assertTrue(set_payment_status(self.payment, 'completed', from_states=('pending',)))
+
+    def test_stale_instance_loses_to_the_database(self):
+        stale = Payment.objects.get(pk=self.payment.pk)
+        self.assertTrue(set_payment_status(self.payment, 'cancelled'))
+
+        self.assertFalse(set_payment_status(stale, 'completed', razorpay_payment_id='pay_late'))
+        self.assertEqual(stale.status, 'pending')  # in-memory copy untouched too
+        payment = Payment.objects.get(pk=self.payment.pk)
+        self.assertEqual(payment.status, 'cancelled')
+        self.assertIsNone(payment.razorpay_payment_id)
+
+
+class CompletePaymentTest(PaidBookingMixin, TestCase):
+
+    def test_completes_payment_and_confirms_booking(self):
+        self.assertTrue(complete_payment(self.payment, 'pay_1', 'sig'))
+
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'confirmed')
+        self.assertEqual(Ticket.objects.filter(booking=self.booking).count(), 2)
+        self.assertFalse(self.booking.seat_holds.exists())
+
+    def test_second_completion_is_a_noop(self):
+        complete_payment(self.payment, 'pay_1', 'sig')
+        again = Payment.objects.select_related('booking').get(pk=self.payment.pk)
+
+        self.assertFalse(complete_payment(again, 'pay_2', 'sig2'))
+        payment = Payment.objects.get(pk=self.payment.pk)
+        self.assertEqual(payment.razorpay_payment_id, 'pay_1')
+        self.assertEqual(Ticket.objects.filter(booking=self.booking).count(), 2)
+
+    def test_lapsed_hold_moves_booking_to_refund_required(self):
+        self.expire_holds()
+        release_expired_holds()
+
+        self.assertTrue(complete_payment(self.payment, 'pay_1', 'sig'))
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'refund_required')
+        self.assertEqual(self.payment.status, 'completed')
+        self.assertFalse(Ticket.objects.filter(booking=self.booking).exists())
+        cancellation = BookingCancellation.objects.get(booking=self.booking)
+        self.assertEqual(cancellation.refund_amount, Decimal('420'))
+
+    def test_expired_hold_not_yet_reclaimed_is_honoured(self):
+        self.expire_holds()
+
+        complete_payment(self.payment, 'pay_1', 'sig')
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, 'confirmed')
+
+
+class CancelFoodOrderTest(PaidBookingMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.order = FoodOrder.objects.create(user=self.user, theatre=self.theatre, total_amount=100, final_amount=100)
+
+    def food_payment(self, status):
+        return Payment.objects.create(food_order=self.order, amount=100, total_amount=100, status=status)
+
+    def test_cancels_order_and_its_unpaid_payments(self):
+        unpaid, failed, paid = self.food_payment('pending'), self.food_payment('failed'), self.food_payment('completed')
+
+        self.assertTrue(cancel_food_order(self.order))
+        self.assertEqual(FoodOrder.objects.get(pk=self.order.pk).status, 'cancelled')
+        statuses = dict(Payment.objects.filter(food_order=self.order).values_list('pk', 'status'))
+        self.assertEqual(statuses, {unpaid.pk: 'cancelled', failed.pk: 'cancelled', paid.pk: 'completed'})
+
+    def test_delivered_order_cannot_be_cancelled(self):
+        unpaid = self.food_payment('pending')
+        FoodOrder.objects.filter(pk=self.order.pk).update(status='delivered')
+
+        self.assertFalse(cancel_food_order(self.order))
+        self.assertEqual(Payment.objects.get(pk=unpaid.pk).status, 'pending')
+
+
+@override_settings(RAZORPAY_FORCE_SIMULATION=True)
+class RazorpayCallbackTest(PaidBookingMixin, TestCase):
+
+    def callback(self):
+        return self.client.post(reverse('payments:razorpay_callback'), {
+            'payment_id': self.payment.pk,
+            'razorpay_order_id': f'sim_order_{self.payment.pk}',
+            'razorpay_payment_id': 'pay_repeat',
+            'razorpay_signature': 'sig',
+        })
+
+    def test_repeated_callback_completes_once(self):
+        self.client.force_login(self.user)
+        first = self.callback()
+        self.assertEqual(first.status_code, 200)
+        completed = Payment.objects.get(pk=self.payment.pk)
+        self.assertEqual(completed.status, 'completed')
+
+        with CaptureQueriesContext(connection) as queries:
+            second = self.callback()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json(), first.json())
+        writes = [q['sql'] for q in queries if not q['sql'].lstrip().upper().startswith('SELECT')]
+        self.assertEqual(writes, [])
+
+        payment = Payment.objects.get(pk=self.payment.pk)
+        self.assertEqual((payment.updated_at, payment.completed_at), (completed.updated_at, completed.completed_at))
+        self.assertEqual(Booking.objects.get(pk=self.booking.pk).status, 'confirmed')
+        self.assertEqual(Ticket.objects.filter(booking=self.booking).count(), 2)
@@ -0,0 +1,159 @@
+"""
+Payment state machine
+- The legal status changes of a Payment, and of the Booking or FoodOrder
+  it pays for
+- Every change is one conditional UPDATE of the changed columns
+  (... WHERE status IN <states the change is legal from>): concurrent
+  requests cannot both apply a transition or overwrite each other's fields,
+  and nothing is written when the row is already in a later state
+- A payment that completes or is cancelled carries its booking or food
+  order along in the same transaction
+- A booking is confirmed only once it has a ticket for every seat it
+  claimed; a payment that arrives after its holds lapsed leaves the
+  booking in refund_required instead
+"""
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from bookings.holds import HoldsLapsed, confirm_holds, release_booking_holds
+from bookings.models import BookingCancellation
+from bookings.pdf_cache import invalidate_booking as invalidate_booking_pdfs
+
+logger = logging.getLogger(__name__)
+
+# status -> statuses it may move to
+PAYMENT_TRANSITIONS = {
+    'pending': {'pending', 'processing', 'completed', 'failed', 'cancelled'},
+    'processing': {'pending', 'processing', 'completed', 'failed', 'cancelled'},
+    'failed': {'pending', 'processing', 'completed', 'cancelled'},
+    'completed': set(),  # money has moved; reversals go through Refund
+    'cancelled': set(),
+}
+
+BOOKING_TRANSITIONS = {
+    'pending': {'confirmed', 'cancelled', 'refund_required'},
+    'confirmed': {'completed', 'cancelled'},
+    'completed': set(),
+    'cancelled': {'refund_required'},  # lapsed checkout that was paid after all
+    'refund_required': set(),
+}
+
+FOOD_ORDER_TRANSITIONS = {
+    'pending': {'preparing', 'cancelled'},
+    'preparing': {'ready', 'cancelled'},
+    'ready': {'delivered'},
+    'delivered': set(),
+    'cancelled': set(),
+}
+
+
+def sources(transitions, to):
+    """Statuses from which `to` may be reached in transitions"""
+    if to not in transitions:
+        raise ValueError(f'Unknown status {to!r}')
+    return [state for state, targets in transitions.items() if to in targets]
+
+
+def compare_and_set(instance, transitions, to, from_states=None, **fields):
+    """
+    Move instance to status `to` if that is legal from its current status in
+    the database (and, if given, that status is one of from_states), setting
+    `fields` in the same UPDATE. Returns True if this call made the change;
+    the instance is updated in memory only then.
+    """
+    allowed = sources(transitions, to)
+    if from_states is not None:
+        allowed = [state for state in allowed if state in from_states]
+    changes = dict(fields, status=to, updated_at=timezone.now())
+    won = type(instance)._default_manager.filter(pk=instance.pk, status__in=allowed).update(**changes)
+    if won:
+        for name, value in changes.items():
+            setattr(instance, name, value)
+    return bool(won)
+
+
+def set_payment_status(payment, to, from_states=None, **fields):
+    """compare_and_set() for a Payment"""
+    return compare_and_set(payment, PAYMENT_TRANSITIONS, to, from_states, **fields)
+
+
+def confirm_paid_booking(payment):
+    """
+    Confirm the booking a completed payment paid for, once its holds have
+    become tickets for every seat. If any seat lost its hold the booking
+    moves to refund_required instead: its remaining holds are released and
+    a cancellation records the amount to refund. Returns True if confirmed.
+    """
+    booking = payment.booking
+    method = payment.payment_method.get_name_display() if payment.payment_method_id else 'online'
+    try:
+        with transaction.atomic():
+            confirm_holds(booking)
+            if not compare_and_set(booking, BOOKING_TRANSITIONS, 'confirmed', from_states=('pending',),
+                                   payment_method=method):
+                # Cancelled meanwhile; its seats were released
+                raise HoldsLapsed(booking, booking.seat_count)
+    except HoldsLapsed as lapsed:
+        logger.error('Payment %s completed but %s', payment.payment_id, lapsed)
+        release_booking_holds(booking)
+        compare_and_set(booking, BOOKING_TRANSITIONS, 'refund_required', payment_method=method)
+        BookingCancellation.objects.get_or_create(booking=booking, defaults={
+            'cancellation_reason': 'Seat hold expired before the payment completed',
+            'refund_amount': payment.total_amount,
+        })
+        return False
+    invalidate_booking_pdfs(booking)
+    return True
+
+
+def needs_refund(payment):
+    """True when a completed payment's booking could not be confirmed"""
+    return bool(payment.booking_id) and payment.booking.status == 'refund_required'
+
+
+def complete_payment(payment, razorpay_payment_id, signature):
+    """
+    Mark a payment completed and confirm what it paid for, exactly once:
+    the pending booking gets its tickets and is confirmed (or moves to
+    refund_required, see confirm_paid_booking), or the food order moves to
+    preparing. Returns False (and changes nothing) when the payment is
+    already completed or cancelled.
+    """
+    with transaction.atomic():
+        if not set_payment_status(
+            payment, 'completed',
+            razorpay_payment_id=razorpay_payment_id,
+            razorpay_signature=signature,
+            completed_at=timezone.now(),
+        ):
+            return False
+
+        if payment.booking_id:
+            confirm_paid_booking(payment)
+        elif payment.food_order_id:
+            compare_and_set(payment.food_order, FOOD_ORDER_TRANSITIONS, 'preparing')
+    return True
+
+
+def fail_payment(payment):
+    """Record a failed attempt; a completed or cancelled payment is left alone"""
+    if payment is None:
+        return False
+    return set_payment_status(payment, 'failed')
+
+
+def cancel_food_order(food_order):
+    """
+    Cancel a food order and its unpaid payments. A completed payment stays
+    completed (it needs a refund). Returns False if the order can no longer
+    be cancelled.
+    """
+    with transaction.atomic():
+        if not compare_and_set(food_order, FOOD_ORDER_TRANSITIONS, 'cancelled'):
+            return False
+        food_order.payments.filter(status__in=sources(PAYMENT_TRANSITIONS, 'cancelled')).update(
+            status='cancelled', updated_at=timezone.now())
+    return True
@@ -17,9 +17,13 @@ from django.utils import timezone
 from .models import Payment, PaymentMethod, Refund, Invoice
 from food.models import FoodOrder
 from .forms import PaymentForm, RazorpayPaymentForm
+from . import gateway
+from .transitions import (
+    BOOKING_TRANSITIONS, compare_and_set, complete_payment, fail_payment, needs_refund, set_payment_status,
+)
 from bookings.models import Booking
-import razorpay
-from razorpay.errors import SignatureVerificationError, BadRequestError
+from bookings.holds import booking_hold_lapsed, release_booking_holds
+from razorpay.errors import SignatureVerificationError
 import logging
 from django.conf import settings
 import uuid
@@ -34,33 +38,13 @@ import base64
 import urllib.parse
 
 
-def get_razorpay_client():
-    """Return a configured Razorpay client or None if keys are missing/invalid."""
-    key_id = (getattr(settings, 'RAZORPAY_KEY_ID', '') or '').strip()
-    key_secret = (getattr(settings, 'RAZORPAY_KEY_SECRET', '') or '').strip()
-    # Consider keys invalid only if they look like placeholders or are empty
-    if not key_id or not key_secret:
-        return None
-    low_key = key_id.lower()
-    low_secret = key_secret.lower()
-    if 'your_' in low_key or 'your_' in low_secret or key_id.startswith('paste_'):
-        return None
+# Loaded with every payment a view works on: ownership checks and templates use them
+PAYMENT_RELATED = ('booking', 'food_order', 'payment_method')
 
-    try:
-        client = razorpay.Client(auth=(key_id, key_secret))
-        # Quick auth check: attempt a lightweight read request to verify credentials
-        # This will raise BadRequestError on authentication failure
-        try:
-            client.order.all({'count': 1})
-        except BadRequestError:
-            # Authentication failed
-            return None
-        except Exception:
-            # Other transient errors (network) - still return client so code can fallback
-            return client
-        return client
-    except Exception:
-        return None
+
+def get_razorpay_client():
+    """Return the shared Razorpay client or None if keys are missing/invalid (see payments.gateway)."""
+    return gateway.get_client()
 
 
 def is_simulation_enabled():
@@ -76,9 +60,38 @@ def is_simulation_enabled():
     if force_sim is False:
         return False
     
-    # Fallback: simulate only if client creation would fail
-    client = get_razorpay_client()
-    return client is None
+    # Fallback: simulate only if client creation would fail (cached, no extra API call)
+    return get_razorpay_client() is None
+
+
+def seat_hold_lapsed_redirect(request, booking):
+    """
+    If a pending booking lost its seat holds, cancel it and send the user
+    back to pick seats again. Returns a redirect response or None.
+    """
+    if booking.status != 'pending' or not booking_hold_lapsed(booking):
+        return None
+    release_booking_holds(booking)
+    compare_and_set(booking, BOOKING_TRANSITIONS, 'cancelled')
+    messages.error(request, 'Your seat hold has expired. Please select your seats again.')
+    return redirect('theatres:seat_layout', show_id=booking.show_id)
+
+
+def payment_success_response(payment_pk):
+    """JSON telling the checkout page where to go after a completed payment"""
+    success_url = reverse('payments:payment_success', kwargs={'payment_id': payment_pk})
+    return JsonResponse({'status': 'success', 'redirect_url': success_url})
+
+
+SEATS_RELEASED_MESSAGE = ('Your payment was received after your seat hold expired, so the seats were released. '
+                          'The booking was not confirmed and the full amount will be refunded.')
+
+
+def payment_refund_response(request, booking_pk):
+    """JSON for a completed payment whose booking lost its seats (see transitions.confirm_paid_booking)"""
+    messages.error(request, SEATS_RELEASED_MESSAGE)
+    detail_url = reverse('bookings:booking_detail', kwargs={'pk': booking_pk})
+    return JsonResponse({'status': 'error', 'message': SEATS_RELEASED_MESSAGE, 'redirect_url': detail_url}, status=409)
 
 
 def compute_signature(order_id: str, payment_id: str, secret: str) -> str:
@@ -98,6 +111,10 @@ def payment_gateway(request, booking_id):
         messages.warning(request, 'This booking is not pending payment.')
         return redirect('bookings:booking_detail', pk=booking_id)
     
+    lapsed = seat_hold_lapsed_redirect(request, booking)
+    if lapsed:
+        return lapsed
+    
     # Get or create payment record with required fields
     payment, created = Payment.objects.get_or_create(
         booking=booking,
@@ -107,18 +124,17 @@ def payment_gateway(request, booking_id):
             'currency': 'INR',
         }
     )
-    # Update amounts in case booking was modified
-    if not created:
-        payment.amount = booking.final_amount
-        payment.total_amount = booking.final_amount
-        payment.save()
+    # Update amounts in case booking was modified (only when they changed)
+    if not created and (payment.amount, payment.total_amount) != (booking.final_amount, booking.final_amount):
+        payment.amount = payment.total_amount = booking.final_amount
+        payment.save(update_fields=['amount', 'total_amount', 'updated_at'])
     
     if request.method == 'POST':
         form = PaymentForm(request.POST)
         if form.is_valid():
-            payment.payment_method = form.cleaned_data['payment_method']
-            payment.status = 'processing'
-            payment.save()
+            if not set_payment_status(payment, 'processing', payment_method=form.cleaned_data['payment_method']):
+                messages.warning(request, 'This payment can no longer be changed.')
+                return redirect('bookings:booking_detail', pk=booking_id)
             
             # Redirect to Razorpay
             return redirect('payments:razorpay_checkout', payment_id=payment.pk)
@@ -162,11 +178,11 @@ def initiate_payment(request, order_type, order_id):
     # Create Payment record without a Booking (booking nullable)
     payment = Payment.objects.create(
         booking=None,
+        food_order=food_order,
         amount=food_order.final_amount,
         total_amount=food_order.final_amount,
         currency='INR',
         status='pending',
-        payment_notes=f'food_order:{food_order.pk}'
     )
 
     return redirect('payments:razorpay_checkout', payment_id=payment.pk)
@@ -206,11 +222,14 @@ def use_payment_method(request, method_id):
     )
 
     # If payment existed, update the method and amounts
-    payment.payment_method = method
-    payment.amount = booking.final_amount
-    payment.total_amount = booking.final_amount
-    payment.status = 'pending'
-    payment.save()
+    if not created and not set_payment_status(
+        payment, 'pending',
+        payment_method=method,
+        amount=booking.final_amount,
+        total_amount=booking.final_amount,
+    ):
+        messages.warning(request, 'This booking has already been paid.')
+        return redirect('bookings:booking_detail', pk=booking.pk)
 
     # Redirect directly to checkout for this payment
     return redirect('payments:razorpay_checkout', payment_id=payment.pk)
@@ -221,21 +240,17 @@ def razorpay_checkout(request, payment_id):
     """
     Initialize Razorpay payment checkout
     """
-    payment = get_object_or_404(Payment, pk=payment_id)
+    payment = get_object_or_404(Payment.objects.select_related(*PAYMENT_RELATED), pk=payment_id)
     # authorize access
     if payment.booking:
         if payment.booking.user != request.user:
             return HttpResponseForbidden()
+        lapsed = seat_hold_lapsed_redirect(request, payment.booking)
+        if lapsed:
+            return lapsed
     else:
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-                if not fo or fo.user != request.user:
-                    return HttpResponseForbidden()
-            except Exception:
-                return HttpResponseForbidden()
-        else:
+        # food order payment: the order must be the user's
+        if not payment.food_order or payment.food_order.user_id != request.user.id:
             return HttpResponseForbidden()
     
     # Use centralized client factory to validate keys
@@ -250,7 +265,7 @@ def razorpay_checkout(request, payment_id):
             'amount': int(payment.total_amount * 100),
         }
         payment.razorpay_order_id = razorpay_order['id']
-        payment.save()
+        payment.save(update_fields=['razorpay_order_id', 'updated_at'])
 
         # Map our payment method to Razorpay method (if selected)
         razorpay_method = None
@@ -265,13 +280,7 @@ def razorpay_checkout(request, payment_id):
             razorpay_method = method_map.get(payment.payment_method.name)
 
         # include related food order in context when available
-        fo = None
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-            except Exception:
-                fo = None
+        fo = payment.food_order
 
         context = {
             'payment': payment,
@@ -294,7 +303,7 @@ def razorpay_checkout(request, payment_id):
             'amount': int(payment.total_amount * 100),
         }
         payment.razorpay_order_id = razorpay_order['id']
-        payment.save()
+        payment.save(update_fields=['razorpay_order_id', 'updated_at'])
 
         # Map our payment method to Razorpay method (if selected)
         razorpay_method = None
@@ -308,13 +317,7 @@ def razorpay_checkout(request, payment_id):
             }
             razorpay_method = method_map.get(payment.payment_method.name)
 
-        fo = None
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-            except Exception:
-                fo = None
+        fo = payment.food_order
 
         context = {
             'payment': payment,
@@ -331,16 +334,14 @@ def razorpay_checkout(request, payment_id):
     # Real client: create Razorpay order
     try:
         # Prepare notes for the Razorpay order. Support payments tied to bookings
-        # and payments created for other order types (food orders stored in payment_notes).
+        # and payments for other order types (food orders).
         notes = {'user_id': request.user.id}
         if payment.booking:
             notes['booking_id'] = payment.booking.booking_id
-        else:
-            # Include food_order reference if present
-            if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-                notes['food_order_id'] = payment.payment_notes.split(':', 1)[1]
+        elif payment.food_order_id:
+            notes['food_order_id'] = str(payment.food_order_id)
 
-        razorpay_order = client.order.create({
+        razorpay_order = gateway.call(client.order.create, {
             'amount': int(payment.total_amount * 100),  # Amount in paise
             'currency': payment.currency,
             'receipt': payment.payment_id,
@@ -348,7 +349,7 @@ def razorpay_checkout(request, payment_id):
         })
 
         payment.razorpay_order_id = razorpay_order['id']
-        payment.save()
+        payment.save(update_fields=['razorpay_order_id', 'updated_at'])
 
         # Map our payment method to Razorpay method (if selected)
         razorpay_method = None
@@ -362,13 +363,7 @@ def razorpay_checkout(request, payment_id):
             }
             razorpay_method = method_map.get(payment.payment_method.name)
 
-        fo = None
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-            except Exception:
-                fo = None
+        fo = payment.food_order
 
         context = {
             'payment': payment,
@@ -380,6 +375,13 @@ def razorpay_checkout(request, payment_id):
         }
         return render(request, 'payments/razorpay_checkout.html', context)
 
+    except gateway.GatewayUnavailable:
+        # Circuit breaker open: the gateway has been failing, do not wait on it again
+        messages.error(request, 'The payment gateway is not responding right now. Please try again in a minute.')
+        if payment.booking:
+            return redirect('payments:payment_gateway', booking_id=payment.booking.pk)
+        return redirect('food:order_list')
+
     except Exception as e:
         # AuthenticationError or other client errors bubble here.
         err_str = str(e) or ''
@@ -394,7 +396,7 @@ def razorpay_checkout(request, payment_id):
                 'amount': int(payment.total_amount * 100),
             }
             payment.razorpay_order_id = razorpay_order['id']
-            payment.save()
+            payment.save(update_fields=['razorpay_order_id', 'updated_at'])
 
             # Map our payment method to Razorpay method (if selected)
             razorpay_method = None
@@ -408,13 +410,7 @@ def razorpay_checkout(request, payment_id):
                 }
                 razorpay_method = method_map.get(payment.payment_method.name)
 
-            fo = None
-            if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-                try:
-                    fo_id = int(payment.payment_notes.split(':', 1)[1])
-                    fo = FoodOrder.objects.filter(pk=fo_id).first()
-                except Exception:
-                    fo = None
+            fo = payment.food_order
 
             context = {
                 'payment': payment,
@@ -434,12 +430,8 @@ def razorpay_checkout(request, payment_id):
         if payment.booking:
             return redirect('payments:payment_gateway', booking_id=payment.booking.pk)
         # try to send user to food order detail
-        try:
-            if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                return redirect('food:order_detail', pk=fo_id)
-        except Exception:
-            pass
+        if payment.food_order_id:
+            return redirect('food:order_detail', pk=payment.food_order_id)
         return redirect('food:order_list')
 
 
@@ -448,25 +440,38 @@ def razorpay_checkout(request, payment_id):
 def razorpay_callback(request):
     """
     Handle Razorpay payment callback
+    Idempotent: a repeated callback (browser retry, double submit) for a
+    completed payment returns the same success response without writing.
     """
+    payment = None
     try:
         payment_id = request.POST.get('payment_id')
         razorpay_order_id = request.POST.get('razorpay_order_id')
         razorpay_payment_id = request.POST.get('razorpay_payment_id')
         razorpay_signature = request.POST.get('razorpay_signature')
         
+        # Repeat of a callback that already completed: one indexed read, no writes
+        if razorpay_payment_id:
+            completed = Payment.objects.filter(
+                razorpay_payment_id=razorpay_payment_id, status='completed'
+            ).values_list('pk', 'booking_id', 'booking__status').first()
+            if completed:
+                completed_pk, booking_pk, booking_status = completed
+                if booking_status == 'refund_required':
+                    return payment_refund_response(request, booking_pk)
+                return payment_success_response(completed_pk)
+        
         # Try to locate the payment record by razorpay_order_id first,
         # fall back to the local payment_id if provided.
-        payment = None
         if razorpay_order_id:
             try:
-                payment = Payment.objects.get(razorpay_order_id=razorpay_order_id)
+                payment = Payment.objects.select_related(*PAYMENT_RELATED).get(razorpay_order_id=razorpay_order_id)
             except Payment.DoesNotExist:
                 payment = None
 
         if not payment and payment_id:
             try:
-                payment = Payment.objects.get(pk=payment_id)
+                payment = Payment.objects.select_related(*PAYMENT_RELATED).get(pk=payment_id)
             except Payment.DoesNotExist:
                 payment = None
 
@@ -474,56 +479,39 @@ def razorpay_callback(request):
             # Nothing we can do without a payment record
             return JsonResponse({'status': 'error', 'message': 'Payment record not found'}, status=404)
         
+        if payment.status == 'completed':
+            if needs_refund(payment):
+                return payment_refund_response(request, payment.booking_id)
+            return payment_success_response(payment.pk)
+        
         # Simulation path: test_order_/sim_order_ or global simulation enabled
         sim_enabled = is_simulation_enabled()
         if (razorpay_order_id and (str(razorpay_order_id).startswith('test_order_') or str(razorpay_order_id).startswith('sim_order_'))) or sim_enabled:
-            import uuid
             # Ensure we have a payment id
-            payment.razorpay_payment_id = razorpay_payment_id or f"SIMPAY{uuid.uuid4().hex[:8].upper()}"
+            razorpay_payment_id = razorpay_payment_id or f"SIMPAY{uuid.uuid4().hex[:8].upper()}"
 
             # Attempt to compute a realistic signature if secret available, else use placeholder
             key_secret = getattr(settings, 'RAZORPAY_KEY_SECRET', '') or ''
             if razorpay_signature:
                 sig = razorpay_signature
             elif key_secret:
-                sig = compute_signature(razorpay_order_id, payment.razorpay_payment_id, key_secret)
+                sig = compute_signature(razorpay_order_id, razorpay_payment_id, key_secret)
             else:
                 sig = 'SIMULATED_SIGNATURE'
 
-            payment.razorpay_signature = sig
-            payment.status = 'completed'
-            payment.completed_at = timezone.now()
-            payment.save()
-
-            # Update related record: booking (for tickets) or food order
-            if payment.booking:
-                booking = payment.booking
-                booking.status = 'confirmed'
-                booking.payment_method = payment.payment_method.get_name_display() if payment.payment_method else 'online'
-                booking.save()
-            else:
-                # Try to update a food order if referenced
-                try:
-                    if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-                        fo_id = int(payment.payment_notes.split(':', 1)[1])
-                        food_order = FoodOrder.objects.filter(pk=fo_id, user=request.user).first()
-                        if food_order:
-                            food_order.status = 'preparing'
-                            food_order.save()
-                except Exception:
-                    pass
-            
+            completed = complete_payment(payment, razorpay_payment_id, sig)
+            if needs_refund(payment):
+                return payment_refund_response(request, payment.booking_id)
+            if completed:
+                messages.success(request, 'Payment completed (simulated).')
             # Return JSON with redirect URL so client JS can navigate the main window
-            success_url = reverse('payments:payment_success', kwargs={'payment_id': payment.pk})
-            messages.success(request, 'Payment completed (simulated).')
-            return JsonResponse({'status': 'success', 'redirect_url': success_url})
+            return payment_success_response(payment.pk)
 
         # Verify Razorpay signature for real orders using validated client
         client = get_razorpay_client()
         if client is None:
             messages.error(request, 'Razorpay API keys are not properly configured.')
-            payment.status = 'failed'
-            payment.save()
+            fail_payment(payment)
             return JsonResponse({'status': 'error', 'message': 'Razorpay keys not configured'}, status=500)
 
         params_dict = {
@@ -536,50 +524,22 @@ def razorpay_callback(request):
         client.utility.verify_payment_signature(params_dict)
         
         # Payment verified
-        payment.razorpay_payment_id = razorpay_payment_id
-        payment.razorpay_signature = razorpay_signature
-        payment.status = 'completed'
-        payment.completed_at = timezone.now()
-        payment.save()
-
-        # Update related record: booking (for tickets) or food order
-        if payment.booking:
-            booking = payment.booking
-            booking.status = 'confirmed'
-            booking.payment_method = payment.payment_method.get_name_display() if payment.payment_method else 'online'
-            booking.save()
-        else:
-            try:
-                if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-                    fo_id = int(payment.payment_notes.split(':', 1)[1])
-                    food_order = FoodOrder.objects.filter(pk=fo_id, user=request.user).first()
-                    if food_order:
-                        food_order.status = 'preparing'
-                        food_order.save()
-            except Exception:
-                pass
-
-        success_url = reverse('payments:payment_success', kwargs={'payment_id': payment.pk})
-        messages.success(request, 'Payment completed successfully.')
-        return JsonResponse({'status': 'success', 'redirect_url': success_url})
+        completed = complete_payment(payment, razorpay_payment_id, razorpay_signature)
+        if needs_refund(payment):
+            return payment_refund_response(request, payment.booking_id)
+        if completed:
+            messages.success(request, 'Payment completed successfully.')
+        return payment_success_response(payment.pk)
     
     except SignatureVerificationError:
         messages.error(request, 'Payment verification failed: Invalid signature.')
-        try:
-            payment.status = 'failed'
-            payment.save()
-        except:
-            pass
+        fail_payment(payment)
         return JsonResponse({'status': 'error', 'message': 'Invalid signature'}, status=400)
     except Payment.DoesNotExist:
         return JsonResponse({'status': 'error', 'message': 'Payment record not found'}, status=404)
     except Exception as e:
         messages.error(request, f'Payment processing error: {str(e)}')
-        try:
-            payment.status = 'failed'
-            payment.save()
-        except:
-            pass
+        fail_payment(payment)
         return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
 
 
@@ -588,36 +548,23 @@ def payment_success(request, payment_id):
     """
     Display payment success message
     """
-    payment = get_object_or_404(Payment, pk=payment_id)
+    payment = get_object_or_404(Payment.objects.select_related(*PAYMENT_RELATED), pk=payment_id)
     # Authorize access: payment either linked to a booking owned by user or linked to a food order in notes
     if payment.booking:
         if payment.booking.user != request.user:
             return HttpResponseForbidden()
     else:
-        # check food order ownership
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-                if not fo or fo.user != request.user:
-                    return HttpResponseForbidden()
-            except Exception:
-                return HttpResponseForbidden()
-        else:
+        # food order payment: the order must be the user's
+        if not payment.food_order or payment.food_order.user_id != request.user.id:
             return HttpResponseForbidden()
     
-    # include food_order in context when payment references one
-    fo = None
-    if not payment.booking and payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-        try:
-            fo_id = int(payment.payment_notes.split(':', 1)[1])
-            fo = FoodOrder.objects.filter(pk=fo_id).first()
-        except Exception:
-            fo = None
-
+    if needs_refund(payment):
+        messages.error(request, SEATS_RELEASED_MESSAGE)
+        return redirect('bookings:booking_detail', pk=payment.booking_id)
+    
     context = {
         'payment': payment,
-        'food_order': fo,
+        'food_order': payment.food_order,
         'page_title': 'Payment Successful',
     }
     return render(request, 'payments/payment_success.html', context)
@@ -628,35 +575,21 @@ def payment_failed(request, payment_id):
     """
     Display payment failed message and option to retry
     """
-    payment = get_object_or_404(Payment, pk=payment_id)
+    payment = get_object_or_404(Payment.objects.select_related(*PAYMENT_RELATED), pk=payment_id)
     if payment.booking:
         if payment.booking.user != request.user:
             return HttpResponseForbidden()
     else:
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-                if not fo or fo.user != request.user:
-                    return HttpResponseForbidden()
-            except Exception:
-                return HttpResponseForbidden()
-        else:
+        # food order payment: the order must be the user's
+        if not payment.food_order or payment.food_order.user_id != request.user.id:
             return HttpResponseForbidden()
     
     context = {
         'payment': payment,
-        'food_order': None,
+        'food_order': payment.food_order,
         'page_title': 'Payment Failed',
     }
 
-    # If payment refers to a food order, include it
-    if not payment.booking and payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-        try:
-            fo_id = int(payment.payment_notes.split(':', 1)[1])
-            context['food_order'] = FoodOrder.objects.filter(pk=fo_id).first()
-        except Exception:
-            context['food_order'] = None
 
     return render(request, 'payments/payment_failed.html', context)
 
@@ -666,38 +599,29 @@ def retry_payment(request, payment_id):
     """
     Retry a failed payment by resetting payment status and redirecting to checkout
     """
-    payment = get_object_or_404(Payment, pk=payment_id)
+    payment = get_object_or_404(Payment.objects.select_related(*PAYMENT_RELATED), pk=payment_id)
     if payment.booking:
         if payment.booking.user != request.user:
             return HttpResponseForbidden()
     else:
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-                if not fo or fo.user != request.user:
-                    return HttpResponseForbidden()
-            except Exception:
-                return HttpResponseForbidden()
-        else:
+        # food order payment: the order must be the user's
+        if not payment.food_order or payment.food_order.user_id != request.user.id:
             return HttpResponseForbidden()
     
-    # Only allow retry for failed payments
-    if payment.status not in ['failed', 'pending']:
+    # Only allow retry for failed payments; reset status to allow re-attempt
+    if not set_payment_status(
+        payment, 'pending', from_states=('failed', 'pending'),
+        razorpay_payment_id=None,
+        razorpay_signature=None,
+        razorpay_order_id=None,
+        completed_at=None,
+    ):
         messages.warning(request, 'This payment cannot be retried.')
         if payment.booking:
             return redirect('bookings:booking_detail', pk=payment.booking.pk)
         # fallback to food orders list
         return redirect('food:order_list')
     
-    # Reset payment status to allow re-attempt
-    payment.status = 'pending'
-    payment.razorpay_payment_id = None
-    payment.razorpay_signature = None
-    payment.razorpay_order_id = None
-    payment.completed_at = None
-    payment.save()
-    
     messages.info(request, f'Retrying payment of ₹{payment.total_amount}...')
     return redirect('payments:razorpay_checkout', payment_id=payment.pk)
 
@@ -711,45 +635,23 @@ def simulate_payment(request, payment_id):
     if not getattr(settings, 'DEBUG', False):
         return HttpResponseForbidden('Simulation not allowed in production')
 
-    payment = get_object_or_404(Payment, pk=payment_id)
+    payment = get_object_or_404(Payment.objects.select_related(*PAYMENT_RELATED), pk=payment_id)
     if payment.booking:
         if payment.booking.user != request.user:
             return HttpResponseForbidden()
     else:
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-                if not fo or fo.user != request.user:
-                    return HttpResponseForbidden()
-            except Exception:
-                return HttpResponseForbidden()
-        else:
+        # food order payment: the order must be the user's
+        if not payment.food_order or payment.food_order.user_id != request.user.id:
             return HttpResponseForbidden()
 
-    # Mark payment as completed
-    payment.razorpay_payment_id = f"SIMPAY{uuid.uuid4().hex[:8].upper()}"
-    payment.razorpay_signature = 'SIMULATED_SIGNATURE'
-    payment.status = 'completed'
-    payment.completed_at = timezone.now()
-    payment.save()
-
-    # Update related record
-    if payment.booking:
-        booking = payment.booking
-        booking.status = 'confirmed'
-        booking.payment_method = payment.payment_method.get_name_display() if payment.payment_method else 'online'
-        booking.save()
-    else:
-        try:
-            if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                food_order = FoodOrder.objects.filter(pk=fo_id, user=request.user).first()
-                if food_order:
-                    food_order.status = 'preparing'
-                    food_order.save()
-        except Exception:
-            pass
+    # Mark payment as completed and confirm the booking or food order
+    completed = complete_payment(payment, f"SIMPAY{uuid.uuid4().hex[:8].upper()}", 'SIMULATED_SIGNATURE')
+    if needs_refund(payment):
+        messages.error(request, SEATS_RELEASED_MESSAGE)
+        return redirect('bookings:booking_detail', pk=payment.booking_id)
+    if not completed:
+        messages.warning(request, 'This payment is already completed or cancelled.')
+        return redirect('payments:payment_success', payment_id=payment.pk)
 
     messages.success(request, f'Payment of ₹{payment.total_amount} simulated as successful.')
     return redirect('payments:payment_success', payment_id=payment.pk)
@@ -760,20 +662,13 @@ def invoice_view(request, payment_id):
     """
     Display and download invoice
     """
-    payment = get_object_or_404(Payment, pk=payment_id)
+    payment = get_object_or_404(Payment.objects.select_related(*PAYMENT_RELATED), pk=payment_id)
     if payment.booking:
         if payment.booking.user != request.user:
             return HttpResponseForbidden()
     else:
-        if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-            try:
-                fo_id = int(payment.payment_notes.split(':', 1)[1])
-                fo = FoodOrder.objects.filter(pk=fo_id).first()
-                if not fo or fo.user != request.user:
-                    return HttpResponseForbidden()
-            except Exception:
-                return HttpResponseForbidden()
-        else:
+        # food order payment: the order must be the user's
+        if not payment.food_order or payment.food_order.user_id != request.user.id:
             return HttpResponseForbidden()
     
     try:
@@ -801,26 +696,16 @@ def invoice_view(request, payment_id):
             # redirect to appropriate place depending on related record
             if payment.booking:
                 return redirect('bookings:booking_detail', pk=payment.booking.pk)
-            try:
-                if payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-                    fo_id = int(payment.payment_notes.split(':', 1)[1])
-                    return redirect('food:order_detail', pk=fo_id)
-            except Exception:
-                pass
+            if payment.food_order_id:
+                return redirect('food:order_detail', pk=payment.food_order_id)
             return redirect('food:order_list')
     
     context = {
         'payment': payment,
         'invoice': invoice,
-        'food_order': None,
+        'food_order': payment.food_order,
         'page_title': f'Invoice #{invoice.invoice_id}',
     }
-    if not payment.booking and payment.payment_notes and payment.payment_notes.startswith('food_order:'):
-        try:
-            fo_id = int(payment.payment_notes.split(':', 1)[1])
-            context['food_order'] = FoodOrder.objects.filter(pk=fo_id).first()
-        except Exception:
-            context['food_order'] = None
     # If this payment is linked to a booking, include booking/ticket details
     if payment.booking:
         booking = payment.booking
@@ -1,20 +1,19 @@
 from decimal import Decimal
-from django.utils import timezone
+from django.db import transaction
 from payments.models import Payment
+from payments.transitions import complete_payment
 
-p = Payment.objects.filter(total_amount=Decimal('210.00')).first()
+p = Payment.objects.select_related('booking', 'payment_method').filter(total_amount=Decimal('210.00')).first()
 print('Found payment:', bool(p))
 if p:
     import uuid
-    p.razorpay_payment_id = 'SIMPAY' + uuid.uuid4().hex[:8].upper()
-    p.razorpay_signature = 'SIMULATED_SIGNATURE'
-    p.status = 'completed'
-    p.completed_at = timezone.now()
-    p.save()
-    b = p.booking
-    b.status = 'confirmed'
-    b.payment_method = p.payment_method.get_name_display() if p.payment_method else 'online'
-    b.save()
-    print('Simulated payment for id', p.pk)
+    # Same state machine as the payment callback: the booking is confirmed only
+    # if its holds became tickets, else it moves to refund_required
+    with transaction.atomic():
+        completed = complete_payment(p, 'SIMPAY' + uuid.uuid4().hex[:8].upper(), 'SIMULATED_SIGNATURE')
+    if not completed:
+        print('Payment', p.pk, 'is already', p.status)
+    else:
+        print('Simulated payment for id', p.pk, '- booking', p.booking.status if p.booking_id else None)
 else:
-    print('No payment with amount 210.00 found')
\ No newline at end of file
+    print('No payment with amount 210.00 found')
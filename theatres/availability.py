@@ -0,0 +1,105 @@
+"""
+Seat availability for show listings
+- Sold, held and available counts for many shows from their seat maps
+- Screen capacities and movie genres fetched alongside, not per row
+- A whole listing costs a fixed number of queries, whatever its size
+- Group search filters on Show.max_run (longest run of free seats together)
+- Date filters are ranges on the indexed Show.starts_at (see theatres.showtimes)
+"""
+
+from collections import namedtuple
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Show
+from .occupancy import fill_run_summaries, get_seat_maps
+from .showtimes import day_bounds
+
+ShowAvailability = namedtuple('ShowAvailability', ['capacity', 'sold', 'held', 'available'])
+
+
+def _count(bits):
+    return bin(bits).count('1')
+
+
+def availability_for(shows):
+    """
+    Return {show_id: ShowAvailability} for an iterable of shows.
+    Capacity counts sellable seats; sold and held are disjoint.
+    """
+    result = {}
+    for show_id, seat_map in get_seat_maps(shows).items():
+        sellable, booked = seat_map.sellable_bits, seat_map.booked_bits
+        result[show_id] = ShowAvailability(
+            capacity=_count(sellable),
+            sold=_count(booked & sellable),
+            held=_count(seat_map.held_bits & sellable & ~booked),
+            available=seat_map.available_count,
+        )
+    return result
+
+
+def listing_queryset(shows):
+    """Add the related data a show listing renders (movie with genres, screen, theatre)"""
+    return shows.select_related('movie', 'screen__theatre').prefetch_related('movie__genres')
+
+
+def with_availability(shows):
+    """
+    Evaluate a show queryset for a listing page.
+    Each show comes back with an `availability` attribute (ShowAvailability)
+    and its movie's genres prefetched, so get_genres_display() is free.
+    """
+    shows = list(listing_queryset(shows))
+    availability = availability_for(shows)
+    for show in shows:
+        show.availability = availability[show.pk]
+    return shows
+
+
+def theatre_schedule(theatre, show_date):
+    """
+    Active screens of a theatre with their shows on a date.
+    Returns (shows, screens): shows from with_availability(), in show time
+    order; each screen is annotated with `seat_count` and carries
+    its own shows in `day_shows`.
+    """
+    shows = with_availability(
+        Show.objects.on_date(show_date).filter(screen__theatre=theatre, is_active=True).order_by('starts_at')
+    )
+    screens = list(theatre.screens.filter(is_active=True).annotate(seat_count=Count('seats')))
+    by_screen = {screen.pk: screen for screen in screens}
+    for screen in screens:
+        screen.day_shows = []
+    for show in shows:
+        screen = by_screen.get(show.screen_id)
+        if screen is not None:
+            screen.day_shows.append(show)
+    return shows, screens
+
+
+def shows_with_seats_together(movie_id, city, date_from, date_to, count):
+    """
+    Bookable shows of a movie in a city starting between two dates
+    (inclusive) and not started yet, with at least `count` free seats side
+    by side, ordered by start time and price.
+    Reads the max_run summary on Show; shows whose summary is not known yet
+    (new shows, edited screens) have it filled in first, in bulk.
+    """
+    start = max(day_bounds(date_from)[0], timezone.now())
+    shows = Show.objects.starting_between(start, day_bounds(date_to)[1]).filter(
+        movie_id=movie_id,
+        screen__theatre__city__iexact=city,
+        screen__theatre__is_active=True,
+        is_active=True,
+        status='available',
+    )
+    unknown = list(shows.filter(max_run__isnull=True).only('pk', 'screen_id'))
+    if unknown:
+        fill_run_summaries(unknown)
+    return (
+        shows.filter(max_run__gte=count)
+        .select_related('screen__theatre')
+        .order_by('starts_at', 'base_ticket_price')
+    )
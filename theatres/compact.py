@@ -0,0 +1,106 @@
+"""
+Compact per-screen seat table for hot read paths
+- One CompactSeats per screen layout version, kept in process memory: seat
+  columns in typed arrays, plus small lookup tables for row labels, seat
+  types and prices
+- Seat views, seat status APIs and the seat finder read it instead of
+  instantiating Seat rows; the Seat table stays the source of truth and any
+  change to it bumps Screen.layout_version, which retires the old table
+"""
+
+from array import array
+from functools import lru_cache
+
+from .models import Seat
+
+NO_POSITION = -1
+
+
+class CompactSeats:
+    """
+    Seats of one screen as parallel arrays, ordered by row then seat number.
+    Seat i is described by ids[i], positions[i], row_labels[rows[i]],
+    numbers[i], type_names[types[i]], prices[price_tiers[i]] and available[i].
+    """
+
+    __slots__ = (
+        'screen_id', 'layout_version',
+        'ids', 'positions', 'rows', 'numbers', 'types', 'price_tiers', 'available',
+        'row_labels', 'type_names', 'prices', 'index_by_position',
+    )
+
+    def __init__(self, screen_id, layout_version, seats):
+        self.screen_id = screen_id
+        self.layout_version = layout_version
+        self.ids = array('q')
+        self.positions = array('l')
+        self.rows = array('H')
+        self.numbers = array('l')
+        self.types = array('B')
+        self.price_tiers = array('H')
+        self.available = array('B')
+        row_labels, type_names, prices = {}, {}, {}
+
+        for seat_id, row, number, seat_type, price, is_available, position in seats:
+            self.ids.append(seat_id)
+            self.positions.append(NO_POSITION if position is None else position)
+            self.rows.append(row_labels.setdefault(row, len(row_labels)))
+            self.numbers.append(number)
+            self.types.append(type_names.setdefault(seat_type, len(type_names)))
+            self.price_tiers.append(prices.setdefault(float(price), len(prices)))
+            self.available.append(bool(is_available))
+
+        self.row_labels = tuple(row_labels)
+        self.type_names = tuple(type_names)
+        self.prices = tuple(prices)
+        # Seat index for every position (NO_POSITION where unused)
+        self.index_by_position = array('l', [NO_POSITION]) * (max(self.positions, default=NO_POSITION) + 1)
+        for idx, position in enumerate(self.positions):
+            if position != NO_POSITION:
+                self.index_by_position[position] = idx
+
+    def __len__(self):
+        return len(self.ids)
+
+    def label(self, idx):
+        return f'{self.row_labels[self.rows[idx]]}{self.numbers[idx]}'
+
+    def seat_type(self, idx):
+        return self.type_names[self.types[idx]]
+
+    def price(self, idx):
+        return self.prices[self.price_tiers[idx]]
+
+    def is_taken(self, idx, taken_bits):
+        """Whether seat idx is set in an occupancy bitset"""
+        position = self.positions[idx]
+        return position != NO_POSITION and bool((taken_bits >> position) & 1)
+
+    def indexes_at(self, positions):
+        """Seat indexes for the given positions (unknown positions are skipped)"""
+        size = len(self.index_by_position)
+        for position in positions:
+            if 0 <= position < size and self.index_by_position[position] != NO_POSITION:
+                yield self.index_by_position[position]
+
+    def by_row(self):
+        """(row label, [seat index, ...]) front to back, seats left to right"""
+        grouped = {}
+        for idx in range(len(self.ids)):
+            grouped.setdefault(self.rows[idx], []).append(idx)
+        ordered = sorted(grouped.items(), key=lambda item: (len(self.row_labels[item[0]]), self.row_labels[item[0]]))
+        return [(self.row_labels[row], sorted(indexes, key=self.numbers.__getitem__)) for row, indexes in ordered]
+
+
+@lru_cache(maxsize=256)
+def compact_seats(screen_id, layout_version):
+    """The compact seat table of a screen; built once per layout version"""
+    seats = Seat.objects.filter(screen_id=screen_id).order_by('row', 'seat_number').values_list(
+        'id', 'row', 'seat_number', 'seat_type', 'base_price', 'is_available', 'position'
+    )
+    return CompactSeats(screen_id, layout_version, seats.iterator())
+
+
+def seats_for(screen):
+    """compact_seats() for a Screen instance"""
+    return compact_seats(screen.pk, screen.layout_version)
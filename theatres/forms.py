@@ -72,12 +72,12 @@ class SeatSelectionForm(forms.Form):
     def __init__(self, show=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if show:
-            from bookings.models import Ticket
-            # Get booked seats for this show
-            booked_seat_ids = Ticket.objects.filter(show=show).values_list('seat_id', flat=True)
+            from .occupancy import get_seat_map
+            # Get booked seat positions for this show
+            booked_positions = get_seat_map(show).booked_positions()
             # Show only available seats
             self.fields['seats'].queryset = show.screen.seats.filter(
                 is_available=True
-            ).exclude(id__in=booked_seat_ids)
+            ).exclude(position__in=booked_positions)
         else:
             self.fields['seats'].queryset = Seat.objects.none()
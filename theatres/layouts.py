@@ -0,0 +1,183 @@
+"""
+Screen layout definitions and bulk seat generation
+- A layout (Screen.layout, JSON) describes rows, aisles and gaps, seat-type
+  zones and a price per seat type
+- materialise_seats() creates every missing Seat of a screen with one
+  bulk_create, assigns positions up front and invalidates the screen's
+  cached maps and grids once
+- Screens without a layout fall back to total_rows x seats_per_row
+
+Layout format (every key optional except rows and seats_per_row):
+
+    {
+        "rows": 12,                      # or explicit labels ["A", "B", ...]
+        "seats_per_row": 24,
+        "aisles": [6, 19],               # columns left empty in every row
+        "gaps": {"A": [1, 2, 23, 24]},   # columns left empty in one row
+        "blocked": {"E": [12]},          # seats that exist but are not sold
+        "zones": [                       # first matching zone wins
+            {"rows": "J-L", "type": "premium"},
+            {"rows": ["M"], "type": "vip", "price": 600},
+        ],
+        "prices": {"standard": 200, "premium": 320, "vip": 500},
+        "price": 200                     # for types missing from "prices"
+    }
+
+Seats are numbered by column, so aisles and gaps leave numbers unused and
+seats either side of them are not adjacent (see theatres.seat_finder).
+"""
+
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+
+from .models import Screen, Seat
+from .occupancy import invalidate_screen_maps
+
+SEAT_TYPES = {value for value, _ in Seat.SEAT_TYPE_CHOICES}
+
+
+def row_labels(count):
+    """A, B, ... Z, AA, AB, ... for `count` rows"""
+    labels = []
+    for i in range(count):
+        label = ''
+        n = i
+        while True:
+            label = chr(ord('A') + (n % 26)) + label
+            n = n // 26 - 1
+            if n < 0:
+                break
+        labels.append(label)
+    return labels
+
+
+def default_layout(screen, price=None):
+    """Plain rectangular layout from the screen's total_rows and seats_per_row"""
+    layout = {'rows': screen.total_rows, 'seats_per_row': screen.seats_per_row}
+    if price is not None:
+        layout['price'] = price
+    return layout
+
+
+def _rows_in(spec, labels):
+    # A zone's rows: a list of labels or an inclusive "H-K" range
+    if isinstance(spec, str):
+        first, _, last = spec.partition('-')
+        last = last or first
+        if first not in labels or last not in labels:
+            raise ValidationError(f'Unknown row range {spec!r}')
+        return set(labels[labels.index(first):labels.index(last) + 1])
+    unknown = set(spec) - set(labels)
+    if unknown:
+        raise ValidationError(f'Unknown rows in zone: {sorted(unknown)}')
+    return set(spec)
+
+
+def _price(value):
+    try:
+        price = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValidationError(f'Invalid price {value!r}')
+    if price < 0:
+        raise ValidationError(f'Invalid price {value!r}')
+    return price
+
+
+def seat_specs(layout):
+    """
+    Expand a layout into (row, seat_number, seat_type, price, is_available)
+    tuples, front row first. Raises ValidationError for a bad layout.
+    """
+    rows = layout.get('rows')
+    labels = row_labels(rows) if isinstance(rows, int) else list(rows or [])
+    columns = layout.get('seats_per_row')
+    if not labels or not isinstance(columns, int) or columns < 1:
+        raise ValidationError('A layout needs rows and a positive seats_per_row')
+    if any(not isinstance(label, str) or not 1 <= len(label) <= 2 for label in labels) or len(set(labels)) != len(labels):
+        raise ValidationError('Row labels must be unique and 1-2 characters long')
+
+    aisles = set(layout.get('aisles', ()))
+    gaps = {row: set(cols) for row, cols in layout.get('gaps', {}).items()}
+    blocked = {row: set(cols) for row, cols in layout.get('blocked', {}).items()}
+    for mapping in (gaps, blocked):
+        if set(mapping) - set(labels):
+            raise ValidationError(f'Unknown rows: {sorted(set(mapping) - set(labels))}')
+
+    default_price = _price(layout.get('price', 0))
+    prices = {seat_type: _price(value) for seat_type, value in layout.get('prices', {}).items()}
+    zones = []
+    for zone in layout.get('zones', ()):
+        seat_type = zone.get('type', 'standard')
+        if seat_type not in SEAT_TYPES:
+            raise ValidationError(f'Unknown seat type {seat_type!r}')
+        zone_price = _price(zone['price']) if 'price' in zone else None
+        zones.append((_rows_in(zone.get('rows', labels), labels), seat_type, zone_price))
+
+    specs = []
+    for label in labels:
+        seat_type, price = 'standard', None
+        for zone_rows, zone_type, zone_price in zones:
+            if label in zone_rows:
+                seat_type, price = zone_type, zone_price
+                break
+        if price is None:
+            price = prices.get(seat_type, default_price)
+        skip = aisles | gaps.get(label, set())
+        for number in range(1, columns + 1):
+            if number not in skip:
+                specs.append((label, number, seat_type, price, number not in blocked.get(label, ())))
+    return specs
+
+
+def validate_layout(layout):
+    """Raise ValidationError unless the layout describes at least one seat"""
+    if not seat_specs(layout):
+        raise ValidationError('The layout has no seats')
+
+
+def materialise_seats(screen, layout=None):
+    """
+    Create the seats a layout defines that the screen does not have yet.
+
+    Args:
+        screen: Screen to fill
+        layout: layout definition; defaults to screen.layout, then to
+            default_layout(screen)
+
+    Returns:
+        Number of seats created (0 when the screen is already complete)
+    """
+    layout = layout or screen.layout or default_layout(screen)
+    specs = seat_specs(layout)
+    with transaction.atomic():
+        # Touch-UPDATE the screen first so concurrent runs cannot hand out the same positions
+        Screen.objects.filter(pk=screen.pk).update(layout_version=F('layout_version'))
+        existing = set(Seat.objects.filter(screen_id=screen.pk).values_list('row', 'seat_number'))
+        position = screen.next_seat_position()
+        seats = []
+        for row, number, seat_type, price, is_available in specs:
+            if (row, number) in existing:
+                continue
+            seats.append(Seat(
+                screen_id=screen.pk,
+                row=row,
+                seat_number=number,
+                seat_type=seat_type,
+                is_available=is_available,
+                status='available' if is_available else 'blocked',
+                base_price=price,
+                position=position,
+            ))
+            position += 1
+        if not seats:
+            return 0
+        # One multi-row INSERT (split only by the backend's parameter limit);
+        # bulk_create sends no post_save, so maps, grids and show capacity
+        # are refreshed once here
+        Seat.objects.bulk_create(seats)
+        Screen.objects.filter(pk=screen.pk).update(capacity=len(existing) + len(seats))
+        invalidate_screen_maps(screen.pk)
+    return len(seats)
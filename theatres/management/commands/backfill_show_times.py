@@ -0,0 +1,31 @@
+"""
+Management command to fill Show.starts_at and ends_at.
+Show.save() and Show.objects.bulk_create() keep them in sync; run this after
+writes that bypass both (queryset.update(), raw SQL, fixtures) or with --all
+after changing TIME_ZONE.
+"""
+
+from django.core.management.base import BaseCommand
+from theatres.models import Show
+from theatres.showtimes import backfill_show_windows
+
+
+class Command(BaseCommand):
+    help = 'Backfill show start/end timestamps in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of shows read and updated per batch (default: 1000)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Recompute every show, not only those missing a start time',
+        )
+
+    def handle(self, *args, **options):
+        updated = backfill_show_windows(Show, batch_size=options['batch_size'], only_missing=not options['all'])
+        self.stdout.write(self.style.SUCCESS(f'Updated start/end times for {updated} shows'))
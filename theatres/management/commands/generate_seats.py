@@ -0,0 +1,61 @@
+"""
+Management command to create the seats of screens from their layout.
+Seats are never generated while a customer loads a page; run this after
+adding a screen or changing its layout (existing seats are kept).
+"""
+
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from theatres.layouts import materialise_seats, validate_layout
+from theatres.models import Screen
+
+
+class Command(BaseCommand):
+    help = 'Generate missing seats for screens from their layout definition'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--screen',
+            type=int,
+            action='append',
+            help='Screen id to fill (may be repeated; default: every screen without seats)',
+        )
+        parser.add_argument(
+            '--layout',
+            type=str,
+            default=None,
+            help='JSON file with a layout definition to save on the screens first',
+        )
+
+    def handle(self, *args, **options):
+        layout = None
+        if options['layout']:
+            with open(options['layout']) as fh:
+                layout = json.load(fh)
+            try:
+                validate_layout(layout)
+            except ValidationError as exc:
+                raise CommandError(f'Invalid layout: {"; ".join(exc.messages)}')
+
+        if options['screen']:
+            screens = Screen.objects.filter(pk__in=options['screen'])
+        elif layout is not None:
+            raise CommandError('--layout needs at least one --screen')
+        else:
+            screens = Screen.objects.filter(seats__isnull=True)
+
+        total = 0
+        for screen in screens.select_related('theatre'):
+            if layout is not None:
+                screen.layout = layout
+                screen.save(update_fields=['layout'])
+            try:
+                created = materialise_seats(screen)
+            except ValidationError as exc:
+                self.stdout.write(self.style.ERROR(f'{screen}: {"; ".join(exc.messages)}'))
+                continue
+            total += created
+            self.stdout.write(f'{screen}: {created} seats created')
+        self.stdout.write(self.style.SUCCESS(f'Generated {total} seats'))
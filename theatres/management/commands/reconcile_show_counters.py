@@ -0,0 +1,54 @@
+"""
+Management command to recount Show.capacity, seats_sold and seats_held.
+The counters are updated with every seat map write; run this after a bulk
+import, a manual database fix, or once to fill them in for existing shows.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from theatres.models import Show
+from theatres.occupancy import reconcile_show_counters
+from theatres.showtimes import day_bounds
+
+
+class Command(BaseCommand):
+    help = 'Reconcile show seat counters (and housefull status) against tickets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--show',
+            type=int,
+            action='append',
+            help='Only this show id (may be repeated)',
+        )
+        parser.add_argument(
+            '--from-date',
+            type=date.fromisoformat,
+            default=None,
+            help='Only shows on or after this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of shows recounted per batch (default: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report differences without saving them',
+        )
+
+    def handle(self, *args, **options):
+        shows = Show.objects.all()
+        if options['show']:
+            shows = shows.filter(pk__in=options['show'])
+        if options['from_date']:
+            shows = shows.filter(starts_at__gte=day_bounds(options['from_date'])[0])
+
+        fixed = reconcile_show_counters(shows, dry_run=options['dry_run'], batch_size=options['batch_size'])
+        for show_id, old, new in fixed:
+            self.stdout.write(f'Show {show_id}: capacity/sold/held {old} -> {new}')
+        verb = 'Found' if options['dry_run'] else 'Fixed'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(fixed)} shows with drifted counters'))
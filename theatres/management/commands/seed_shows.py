@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from theatres.models import Theatre, Screen, Seat, Show
+from theatres.layouts import materialise_seats
+from theatres.models import Theatre, Screen, Show
 from movies.models import Movie
 from datetime import datetime, time, timedelta
 
@@ -49,33 +50,17 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR('No movies found in database. Create movies first.'))
             return
 
-        row_labels = [chr(ord('A') + i) for i in range(rows)]
-
         with transaction.atomic():
             theatres = Theatre.objects.all()
             movie_index = 0
             for theatre in theatres:
                 for screen in theatre.screens.all():
                     # Ensure seats exist
-                    existing = screen.seats.count()
-                    needed = rows * cols
-                    if existing < needed:
-                        to_create = []
-                        for r in row_labels:
-                            for c in range(1, cols + 1):
-                                to_create.append(Seat(
-                                    screen=screen,
-                                    row=r,
-                                    seat_number=c,
-                                    seat_type='standard',
-                                    is_available=True,
-                                    status='available',
-                                    base_price=price
-                                ))
-                        Seat.objects.bulk_create(to_create)
-                        self.stdout.write(self.style.SUCCESS(f'Created {len(to_create)} seats for {screen}'))
+                    created = materialise_seats(screen, {'rows': rows, 'seats_per_row': cols, 'price': price})
+                    if created:
+                        self.stdout.write(self.style.SUCCESS(f'Created {created} seats for {screen}'))
                     else:
-                        self.stdout.write(self.style.NOTICE(f'{screen} already has {existing} seats'))
+                        self.stdout.write(self.style.NOTICE(f'{screen} already has its seats'))
 
                     # Create shows for next N days at given times
                     for day_offset in range(days):
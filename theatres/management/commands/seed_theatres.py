@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from theatres.models import Theatre, Screen, Seat
+from theatres.layouts import materialise_seats
+from theatres.models import Theatre, Screen
 from django.db import transaction
 
 
@@ -197,8 +198,6 @@ class Command(BaseCommand):
         price = options['price']
         use_real = options['use_real']
 
-        row_labels = [chr(ord('A') + i) for i in range(rows)]
-
         with transaction.atomic():
             for city in cities:
                 theatres_list = REAL_THEATRES.get(city, []) if use_real else []
@@ -248,25 +247,10 @@ class Command(BaseCommand):
                             }
                         )
 
-                        existing = screen.seats.count()
-                        if existing >= rows * cols:
-                            self.stdout.write(self.style.NOTICE(f"{screen} already has {existing} seats, skipping"))
+                        created = materialise_seats(screen, {'rows': rows, 'seats_per_row': cols, 'price': price})
+                        if not created:
+                            self.stdout.write(self.style.NOTICE(f"{screen} already has its seats, skipping"))
                             continue
-
-                        seats_to_create = []
-                        for r_label in row_labels:
-                            for c in range(1, cols + 1):
-                                seats_to_create.append(Seat(
-                                    screen=screen,
-                                    row=r_label,
-                                    seat_number=c,
-                                    seat_type='standard',
-                                    is_available=True,
-                                    status='available',
-                                    base_price=price
-                                ))
-
-                        Seat.objects.bulk_create(seats_to_create)
-                        self.stdout.write(self.style.SUCCESS(f"Created {len(seats_to_create)} seats for {screen}"))
+                        self.stdout.write(self.style.SUCCESS(f"Created {created} seats for {screen}"))
 
             self.stdout.write(self.style.SUCCESS('Seeding complete'))
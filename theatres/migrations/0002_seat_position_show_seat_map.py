@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_seat_positions(apps, schema_editor):
+    """Number existing seats per screen in row/seat order"""
+    Seat = apps.get_model('theatres', 'Seat')
+    screen_ids = Seat.objects.values_list('screen_id', flat=True).distinct()
+    for screen_id in screen_ids:
+        seats = list(Seat.objects.filter(screen_id=screen_id).order_by('row', 'seat_number', 'pk'))
+        for position, seat in enumerate(seats):
+            seat.position = position
+        Seat.objects.bulk_update(seats, ['position'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatres', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShowSeatMap',
+            fields=[
+                ('show', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='seat_map', serialize=False, to='theatres.show')),
+                ('sellable', models.BinaryField(default=bytes)),
+                ('booked', models.BinaryField(default=bytes)),
+                ('available_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Show Seat Map',
+                'verbose_name_plural': 'Show Seat Maps',
+            },
+        ),
+        migrations.AddField(
+            model_name='seat',
+            name='position',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(assign_seat_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatres', '0002_seat_position_show_seat_map'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='showseatmap',
+            name='held',
+            field=models.BinaryField(default=bytes),
+        ),
+    ]
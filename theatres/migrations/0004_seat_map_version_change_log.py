@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatres', '0003_showseatmap_held'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='showseatmap',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='SeatMapChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField()),
+                ('booked', models.JSONField(default=list)),
+                ('held', models.JSONField(default=list)),
+                ('released', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('show', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seat_map_changes', to='theatres.show')),
+            ],
+            options={
+                'verbose_name': 'Seat Map Change',
+                'verbose_name_plural': 'Seat Map Changes',
+                'ordering': ['show', 'version'],
+                'unique_together': {('show', 'version')},
+            },
+        ),
+    ]
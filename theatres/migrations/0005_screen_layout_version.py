@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatres', '0004_seat_map_version_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='screen',
+            name='layout_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:56
+
+from django.db import migrations, models
+from django.db.models import Count, Exists, F, OuterRef
+
+# Frozen copy of theatres.occupancy.reconcile_show_counters as of this
+# migration: later changes to the app code must not change what it does
+BATCH_SIZE = 500
+
+
+def count_show_seats(apps, schema_editor):
+    """Fill capacity/seats_sold/seats_held of existing shows, and housefull status, in pk batches"""
+    Show = apps.get_model('theatres', 'Show')
+    Seat = apps.get_model('theatres', 'Seat')
+    Ticket = apps.get_model('bookings', 'Ticket')
+    SeatHold = apps.get_model('bookings', 'SeatHold')
+
+    last_pk = 0
+    while True:
+        batch = list(Show.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'screen_id', 'status')[:BATCH_SIZE])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        show_ids = [show.pk for show in batch]
+
+        capacity = dict(
+            Seat.objects.filter(screen_id__in={show.screen_id for show in batch}, is_available=True)
+            .values_list('screen_id').annotate(n=Count('pk')).values_list('screen_id', 'n')
+        )
+        active_tickets = Ticket.objects.exclude(status='cancelled')
+        sold = dict(
+            active_tickets.filter(show_id__in=show_ids, seat__screen_id=F('show__screen_id'), seat__is_available=True)
+            .values_list('show_id').annotate(n=Count('seat_id', distinct=True)).values_list('show_id', 'n')
+        )
+        held = dict(
+            SeatHold.objects.filter(show_id__in=show_ids, seat__screen_id=F('show__screen_id'), seat__is_available=True)
+            .exclude(Exists(active_tickets.filter(show_id=OuterRef('show_id'), seat_id=OuterRef('seat_id'))))
+            .values_list('show_id').annotate(n=Count('pk')).values_list('show_id', 'n')
+        )
+        for show in batch:
+            show.capacity = capacity.get(show.screen_id, 0)
+            show.seats_sold = sold.get(show.pk, 0)
+            show.seats_held = held.get(show.pk, 0)
+            if show.status == 'available' and show.capacity and show.seats_sold >= show.capacity:
+                show.status = 'housefull'
+            elif show.status == 'housefull' and show.seats_sold < show.capacity:
+                show.status = 'available'
+        Show.objects.bulk_update(batch, ['capacity', 'seats_sold', 'seats_held', 'status'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatres', '0005_screen_layout_version'),
+        ('bookings', '0003_seat_hold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='show',
+            name='capacity',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='show',
+            name='seats_held',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='show',
+            name='seats_sold',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_show_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatres', '0006_show_seat_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='show',
+            name='max_run',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='showseatmap',
+            name='row_runs',
+            field=models.JSONField(default=list),
+        ),
+    ]
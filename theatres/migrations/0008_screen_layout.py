@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatres', '0007_seat_run_summaries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='screen',
+            name='layout',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:05
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Frozen copy of theatres.showtimes as of this migration: later changes to
+# the app code must not change what this migration does
+BATCH_SIZE = 1000
+
+
+def show_window(show_date, show_time, end_time):
+    """(starts_at, ends_at) in the current time zone; an end at or before the start is the next day"""
+    if show_date is None or show_time is None:
+        return None, None
+    tz = timezone.get_current_timezone()
+    starts_at = timezone.make_aware(datetime.combine(show_date, show_time), tz)
+    if end_time is None:
+        return starts_at, None
+    ends_at = datetime.combine(show_date, end_time)
+    if end_time <= show_time:
+        ends_at += timedelta(days=1)
+    return starts_at, timezone.make_aware(ends_at, tz)
+
+
+def fill_show_windows(apps, schema_editor):
+    """Set starts_at/ends_at of existing shows in primary-key batches"""
+    Show = apps.get_model('theatres', 'Show')
+    missing = Show.objects.filter(starts_at__isnull=True).order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(
+            missing.filter(pk__gt=last_pk)
+            .only('pk', 'show_date', 'show_time', 'end_time')[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        for show in batch:
+            show.starts_at, show.ends_at = show_window(show.show_date, show.show_time, show.end_time)
+        Show.objects.bulk_update(batch, ['starts_at', 'ends_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('theatres', '0008_screen_layout'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='show',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='show',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['starts_at'], name='theatres_sh_starts__8722d7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['ends_at'], name='theatres_sh_ends_at_421afe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='show',
+            index=models.Index(fields=['movie', 'starts_at'], name='theatres_sh_movie_i_9fdfe1_idx'),
+        ),
+        migrations.RunPython(fill_show_windows, migrations.RunPython.noop),
+    ]
@@ -2,13 +2,18 @@
 Theatres App Models
 - Theatre information
 - Screens/Halls within a theatre
-- Shows (movie screenings) with timings
+- Shows (movie screenings) with timings and seat counters
 - Seats and their availability
+- Per-show seat occupancy bitsets
+- Recent seat map changes for delta polling
 """
 
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.urls import reverse
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from django.dispatch import receiver
 
 
 class Theatre(models.Model):
@@ -74,6 +79,9 @@ class Screen(models.Model):
     is_dolby = models.BooleanField(default=False)
     
     is_active = models.BooleanField(default=True)
+    # Rows, aisles, seat-type zones and prices (see theatres.layouts); empty = plain grid
+    layout = models.JSONField(default=dict, blank=True)
+    layout_version = models.PositiveIntegerField(default=1, editable=False)  # Bumped when seats change
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -84,9 +92,20 @@ class Screen(models.Model):
     def __str__(self):
         return f"{self.theatre.name} - {self.name}"
     
+    def clean(self):
+        from .layouts import validate_layout
+        super().clean()
+        if self.layout:
+            validate_layout(self.layout)
+    
     def get_available_seats(self):
         """Get count of available seats"""
         return self.seats.filter(is_available=True).count()
+    
+    def next_seat_position(self):
+        """Next unused bit position for a new seat in this screen"""
+        last = self.seats.aggregate(m=models.Max('position'))['m']
+        return 0 if last is None else last + 1
 
 
 class Seat(models.Model):
@@ -116,6 +135,9 @@ class Seat(models.Model):
     # Pricing
     base_price = models.DecimalField(max_digits=8, decimal_places=2, validators=[MinValueValidator(0)])
     
+    # Stable index of this seat inside the screen; bit position in ShowSeatMap
+    position = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -126,6 +148,38 @@ class Seat(models.Model):
     
     def __str__(self):
         return f"{self.screen.theatre.name} - {self.screen.name} - {self.row}{self.seat_number}"
+    
+    def save(self, *args, **kwargs):
+        """Assign the next free position within the screen"""
+        if self.position is None and self.screen_id:
+            self.position = self.screen.next_seat_position()
+        super().save(*args, **kwargs)
+
+
+class ShowQuerySet(models.QuerySet):
+    """Time-window filters on the indexed starts_at/ends_at columns"""
+    
+    def starting_between(self, start, end):
+        """Shows starting in [start, end)"""
+        return self.filter(starts_at__gte=start, starts_at__lt=end)
+    
+    def on_date(self, day):
+        """Shows starting on a local calendar day"""
+        from .showtimes import day_bounds
+        return self.starting_between(*day_bounds(day))
+    
+    def upcoming(self, now=None):
+        return self.filter(starts_at__gt=now or timezone.now())
+    
+    def ended(self, now=None):
+        return self.filter(ends_at__lte=now or timezone.now())
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        # save() is skipped by bulk_create; fill the time window here instead
+        objs = list(objs)
+        for obj in objs:
+            obj.sync_times()
+        return super().bulk_create(objs, *args, **kwargs)
 
 
 class Show(models.Model):
@@ -140,6 +194,10 @@ class Show(models.Model):
     show_date = models.DateField()
     show_time = models.TimeField()
     end_time = models.TimeField()  # Calculated based on movie duration
+    # Aware start/end derived from the fields above on save (see theatres.showtimes);
+    # end_time at or before show_time means the show ends after midnight
+    starts_at = models.DateTimeField(null=True, blank=True, editable=False)
+    ends_at = models.DateTimeField(null=True, blank=True, editable=False)
     
     # Pricing
     base_ticket_price = models.DecimalField(
@@ -157,6 +215,15 @@ class Show(models.Model):
     ]
     status = models.CharField(max_length=20, choices=SHOW_STATUS_CHOICES, default='available')
     
+    # Seat counters, kept in step with the seat map (see theatres.occupancy);
+    # save() never writes them back unless named in update_fields
+    COUNTER_FIELDS = ('capacity', 'seats_sold', 'seats_held', 'max_run')
+    capacity = models.PositiveIntegerField(default=0, editable=False)  # Sellable seats on the screen
+    seats_sold = models.PositiveIntegerField(default=0, editable=False)
+    seats_held = models.PositiveIntegerField(default=0, editable=False)
+    # Longest run of adjacent free seats in any row; None until the seat map is built
+    max_run = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -168,13 +235,158 @@ class Show(models.Model):
         indexes = [
             models.Index(fields=['show_date', 'screen']),
             models.Index(fields=['movie', 'show_date']),
+            models.Index(fields=['starts_at']),
+            models.Index(fields=['ends_at']),
+            models.Index(fields=['movie', 'starts_at']),
         ]
     
+    objects = ShowQuerySet.as_manager()
+    
     def __str__(self):
         return f"{self.movie.title} at {self.screen.theatre.name} - {self.show_date} {self.show_time}"
     
+    def sync_times(self):
+        """Recompute starts_at/ends_at from show_date, show_time and end_time"""
+        from .showtimes import show_window
+        self.starts_at, self.ends_at = show_window(self.show_date, self.show_time, self.end_time)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        show = super().from_db(db, field_names, values)
+        show._loaded_status = show.__dict__.get('status')
+        return show
+    
+    def save(self, *args, **kwargs):
+        """
+        A full save of an existing show writes every field except the seat
+        counters, which theatres.occupancy keeps with atomic updates, and
+        except status unless it was changed on this instance. A status
+        changed to anything but 'cancelled' is then re-derived from the
+        stored counters (available <-> housefull).
+        """
+        self.sync_times()
+        adding = self._state.adding
+        status_changed = self.status != getattr(self, '_loaded_status', None)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if {'show_date', 'show_time', 'end_time'} & set(update_fields):
+                kwargs['update_fields'] = set(update_fields) | {'starts_at', 'ends_at'}
+        elif not adding and not kwargs.get('force_insert'):
+            skip = set(self.COUNTER_FIELDS) | self.get_deferred_fields()
+            if not status_changed:
+                skip.add('status')
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in skip
+            ]
+        super().save(*args, **kwargs)
+        written = kwargs.get('update_fields')
+        if not adding and status_changed and self.status != 'cancelled' and (written is None or 'status' in written):
+            from .occupancy import housefull_status
+            Show.objects.filter(pk=self.pk).update(status=housefull_status(models.F('seats_sold'), models.F('capacity')))
+            self.status = Show.objects.values_list('status', flat=True).get(pk=self.pk)
+        self._loaded_status = self.status
+    
     def get_available_seats_count(self):
         """Get count of available seats for this show"""
-        from bookings.models import Ticket
-        booked_seats = Ticket.objects.filter(show=self).values_list('seat_id', flat=True)
-        return self.screen.seats.filter(is_available=True).exclude(id__in=booked_seats).count()
+        from .occupancy import get_seat_map
+        return get_seat_map(self).available_count
+    
+    @property
+    def seats_available(self):
+        """Available seats according to the stored counters (no extra query)"""
+        return max(self.capacity - self.seats_sold - self.seats_held, 0)
+
+
+class ShowSeatMap(models.Model):
+    """
+    Compact seat occupancy for a show.
+    Bit N of each bitset refers to the seat with position N in the show's screen.
+    """
+    show = models.OneToOneField(Show, on_delete=models.CASCADE, primary_key=True, related_name='seat_map')
+    sellable = models.BinaryField(default=bytes)  # Seats that exist and are not blocked
+    booked = models.BinaryField(default=bytes)  # Seats with an active ticket
+    held = models.BinaryField(default=bytes)  # Seats held for a pending booking
+    available_count = models.IntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0)  # Bumped on every occupancy change
+    row_runs = models.JSONField(default=list)  # Longest free run per row (see theatres.seat_finder.row_index)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Show Seat Map"
+        verbose_name_plural = "Show Seat Maps"
+    
+    def __str__(self):
+        return f"Seat map - {self.show_id}"
+    
+    @property
+    def sellable_bits(self):
+        return int.from_bytes(bytes(self.sellable or b''), 'little')
+    
+    @property
+    def booked_bits(self):
+        return int.from_bytes(bytes(self.booked or b''), 'little')
+    
+    @property
+    def held_bits(self):
+        return int.from_bytes(bytes(self.held or b''), 'little')
+    
+    @property
+    def taken_bits(self):
+        """Seats that cannot be sold right now (booked or held)"""
+        return self.booked_bits | self.held_bits
+    
+    def set_bits(self, sellable=None, booked=None, held=None):
+        """Store new bitsets (Python ints) and refresh the available count"""
+        from .occupancy import to_bytes
+        if sellable is not None:
+            self.sellable = to_bytes(sellable)
+        if booked is not None:
+            self.booked = to_bytes(booked)
+        if held is not None:
+            self.held = to_bytes(held)
+        self.available_count = bin(self.sellable_bits & ~self.taken_bits).count('1')
+    
+    def is_booked(self, position):
+        """Whether the seat at this position is taken"""
+        return position is not None and bool((self.taken_bits >> position) & 1)
+    
+    def booked_positions(self):
+        """Set of taken (booked or held) seat positions"""
+        bits = self.taken_bits
+        return {i for i in range(bits.bit_length()) if (bits >> i) & 1}
+
+
+class SeatMapChange(models.Model):
+    """
+    One occupancy change of a show's seat map, kept for a short while so
+    polling clients can fetch what changed since the version they hold.
+    Positions are seat positions in the show's screen.
+    """
+    show = models.ForeignKey(Show, on_delete=models.CASCADE, related_name='seat_map_changes')
+    version = models.PositiveBigIntegerField()
+    booked = models.JSONField(default=list)
+    held = models.JSONField(default=list)
+    released = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name = "Seat Map Change"
+        verbose_name_plural = "Seat Map Changes"
+        unique_together = ['show', 'version']
+        ordering = ['show', 'version']
+    
+    def __str__(self):
+        return f"Seat map change - {self.show_id} v{self.version}"
+    
+    def positions(self):
+        """All seat positions touched by this change"""
+        return set(self.booked) | set(self.held) | set(self.released)
+
+
+@receiver(post_save, sender=Seat)
+@receiver(post_delete, sender=Seat)
+def invalidate_seat_maps(sender, instance, **kwargs):
+    """Rebuild occupancy maps lazily after a screen's seats change"""
+    from .occupancy import invalidate_screen_maps
+    invalidate_screen_maps(instance.screen_id)
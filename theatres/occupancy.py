@@ -0,0 +1,425 @@
+"""
+Per-show seat occupancy maps
+- Compact bitsets indexed by Seat.position
+- Read with a single primary-key fetch of ShowSeatMap
+- Updated inside the same transaction as ticket creation/cancellation
+  and seat hold/release; changes are published to live seat layouts
+- Every change bumps the map's version and is logged for delta polling
+- get_seat_maps() reads (and builds) the maps of many shows in bulk
+- Show.capacity/seats_sold/seats_held follow every map write in the same
+  transaction, and a show that sells out is marked housefull
+- Each map keeps the longest free run per row, refreshed only for rows a
+  write touches; Show.max_run holds the overall longest for searches
+"""
+
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, Exists, F, Max, OuterRef, Value, When
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+from django.utils import timezone
+
+from .models import Screen, Seat, SeatMapChange, Show, ShowSeatMap
+from .seat_events import publish_seat_changes, seat_changes
+
+
+def to_bytes(bits):
+    """Encode a Python int bitset into little-endian bytes"""
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+
+def bits_for(positions):
+    """Build an int bitset with the given positions set"""
+    bits = 0
+    for pos in positions:
+        if pos is not None:
+            bits |= 1 << pos
+    return bits
+
+
+def assign_missing_positions(screen_id):
+    """
+    Give every seat of a screen without a position the next free index.
+    Positions are never reused so existing bitsets stay valid.
+    """
+    missing = list(
+        Seat.objects.filter(screen_id=screen_id, position__isnull=True).order_by('row', 'seat_number', 'pk')
+    )
+    if not missing:
+        return 0
+    start = Seat.objects.filter(screen_id=screen_id).aggregate(m=Max('position'))['m']
+    start = -1 if start is None else start
+    for offset, seat in enumerate(missing, start=1):
+        seat.position = start + offset
+    Seat.objects.bulk_update(missing, ['position'])
+    # Positions are part of the screen's layout (see theatres.packed)
+    Screen.objects.filter(pk=screen_id).update(layout_version=F('layout_version') + 1)
+    return len(missing)
+
+
+def _count(bits):
+    return bin(bits).count('1')
+
+
+def seat_counts(seat_map):
+    """(capacity, sold, held) of a map; only sellable seats count"""
+    sellable, booked = seat_map.sellable_bits, seat_map.booked_bits
+    return _count(sellable), _count(booked & sellable), _count(seat_map.held_bits & sellable & ~booked)
+
+
+def housefull_status(sold, capacity):
+    """
+    Expression for Show.status given the sold and capacity values being
+    written: 'available' <-> 'housefull' follows sales, 'cancelled' stays.
+    Held seats do not make a show housefull; they may yet be released.
+    """
+    return Case(
+        When(GreaterThanOrEqual(sold, capacity), capacity__gt=0, status='available', then=Value('housefull')),
+        When(LessThan(sold, capacity), status='housefull', then=Value('available')),
+        default=F('status'),
+    )
+
+
+def _status_after(status, sold, capacity):
+    # Python mirror of housefull_status() for rows updated in bulk
+    if status == 'available' and capacity and sold >= capacity:
+        return 'housefull'
+    if status == 'housefull' and sold < capacity:
+        return 'available'
+    return status
+
+
+def free_row_runs(seat_map, screen_id, layout_version, touched=None):
+    """
+    Longest run of adjacent free seats in each row of a map's screen.
+    With `touched` (seat positions), only the rows holding those seats are
+    recounted and the rest are taken from seat_map.row_runs.
+    """
+    from .seat_finder import longest_run, row_index
+
+    index = row_index(screen_id, layout_version)
+    free_bits = seat_map.sellable_bits & ~seat_map.taken_bits
+    runs = list(seat_map.row_runs or ())
+    if touched is None or len(runs) != len(index.rows):
+        return [longest_run(seats, free_bits) for _, seats in index.rows]
+    for row in {index.row_of[pos] for pos in touched if pos in index.row_of}:
+        runs[row] = longest_run(index.rows[row][1], free_bits)
+    return runs
+
+
+def _set_counters(show_id, seat_map):
+    capacity, sold, held = seat_counts(seat_map)
+    Show.objects.filter(pk=show_id).update(
+        capacity=capacity, seats_sold=sold, seats_held=held, max_run=max(seat_map.row_runs, default=0),
+        status=housefull_status(Value(sold), Value(capacity)),
+    )
+
+
+def _shift_counters(show_id, sold_delta, held_delta, max_run):
+    # Relative F() update: the counters stay right even if they were written
+    # by another path since this transaction read the map
+    sold = F('seats_sold') + sold_delta
+    Show.objects.filter(pk=show_id).update(
+        seats_sold=sold, seats_held=F('seats_held') + held_delta, max_run=max_run,
+        status=housefull_status(sold, F('capacity')),
+    )
+
+
+def rebuild_seat_map(show):
+    """
+    Recompute a show's occupancy map from the Seat, Ticket and SeatHold tables.
+    Used the first time a show is read and by repair tooling.
+    """
+    from bookings.models import Ticket, SeatHold
+
+    assign_missing_positions(show.screen_id)
+    sellable = Seat.objects.filter(screen_id=show.screen_id, is_available=True).values_list('position', flat=True)
+    # Only count seats that belong to the show's screen; positions are per screen
+    booked = (
+        Ticket.objects.filter(show_id=show.pk, seat__screen_id=show.screen_id)
+        .exclude(status='cancelled').values_list('seat__position', flat=True)
+    )
+    held = SeatHold.objects.filter(show_id=show.pk, seat__screen_id=show.screen_id).values_list('seat__position', flat=True)
+
+    # Continue past any logged version: clients holding an older version
+    # find no change entry for this one and fall back to a full read
+    last_logged = SeatMapChange.objects.filter(show_id=show.pk).aggregate(m=Max('version'))['m']
+    seat_map = ShowSeatMap(show_id=show.pk, version=(last_logged or 0) + 1)
+    seat_map.set_bits(sellable=bits_for(sellable), booked=bits_for(booked), held=bits_for(held))
+    layout_version = Screen.objects.values_list('layout_version', flat=True).get(pk=show.screen_id)
+    seat_map.row_runs = free_row_runs(seat_map, show.screen_id, layout_version)
+    seat_map.save()
+    _set_counters(show.pk, seat_map)
+    return seat_map
+
+
+def get_seat_map(show):
+    """Return the occupancy map for a show, building it on first access"""
+    try:
+        return ShowSeatMap.objects.get(pk=show.pk)
+    except ShowSeatMap.DoesNotExist:
+        with transaction.atomic():
+            return rebuild_seat_map(show)
+
+
+def build_seat_maps(shows):
+    """
+    Batch counterpart of rebuild_seat_map() for shows that have no map yet.
+    Uses a fixed number of queries however many shows are given.
+    """
+    from bookings.models import Ticket, SeatHold
+
+    shows = list(shows)
+    if not shows:
+        return {}
+    show_ids = [show.pk for show in shows]
+    screen_ids = {show.screen_id for show in shows}
+    unpositioned = (
+        Seat.objects.filter(screen_id__in=screen_ids, position__isnull=True)
+        .values_list('screen_id', flat=True).distinct()
+    )
+    for screen_id in list(unpositioned):
+        assign_missing_positions(screen_id)
+
+    sellable = defaultdict(int)
+    for screen_id, pos in Seat.objects.filter(screen_id__in=screen_ids, is_available=True).values_list('screen_id', 'position'):
+        sellable[screen_id] |= 1 << pos
+    booked = defaultdict(int)
+    tickets = (
+        Ticket.objects.filter(show_id__in=show_ids, seat__screen_id=F('show__screen_id'))
+        .exclude(status='cancelled').values_list('show_id', 'seat__position')
+    )
+    for show_id, pos in tickets:
+        booked[show_id] |= 1 << pos
+    held = defaultdict(int)
+    holds = SeatHold.objects.filter(show_id__in=show_ids, seat__screen_id=F('show__screen_id')).values_list('show_id', 'seat__position')
+    for show_id, pos in holds:
+        held[show_id] |= 1 << pos
+    last_logged = dict(
+        SeatMapChange.objects.filter(show_id__in=show_ids)
+        .values_list('show_id').annotate(m=Max('version')).values_list('show_id', 'm')
+    )
+
+    layout_versions = dict(Screen.objects.filter(pk__in=screen_ids).values_list('pk', 'layout_version'))
+
+    seat_maps = {}
+    for show in shows:
+        seat_map = ShowSeatMap(show_id=show.pk, version=last_logged.get(show.pk, 0) + 1)
+        seat_map.set_bits(sellable=sellable[show.screen_id], booked=booked[show.pk], held=held[show.pk])
+        seat_map.row_runs = free_row_runs(seat_map, show.screen_id, layout_versions[show.screen_id])
+        seat_maps[show.pk] = seat_map
+    # A map created concurrently wins; ours only serves this read
+    ShowSeatMap.objects.bulk_create(seat_maps.values(), ignore_conflicts=True)
+    for show_id, seat_map in seat_maps.items():
+        _set_counters(show_id, seat_map)
+    return seat_maps
+
+
+def get_seat_maps(shows):
+    """Return {show_id: ShowSeatMap} for many shows in a constant number of queries"""
+    shows = list(shows)
+    seat_maps = ShowSeatMap.objects.in_bulk([show.pk for show in shows])
+    missing = [show for show in shows if show.pk not in seat_maps]
+    if missing:
+        with transaction.atomic():
+            seat_maps.update(build_seat_maps(missing))
+    return seat_maps
+
+
+def fill_run_summaries(shows):
+    """
+    Compute Show.max_run for shows that have none yet: maps are built in
+    bulk where missing, and existing maps (from before the summaries, or
+    after a screen edit) are locked and recounted.
+    """
+    shows = list(shows)
+    with transaction.atomic():
+        existing = ShowSeatMap.objects.select_for_update().in_bulk([show.pk for show in shows])
+        build_seat_maps([show for show in shows if show.pk not in existing])
+        if not existing:
+            return
+        layout_versions = dict(
+            Screen.objects.filter(pk__in={show.screen_id for show in shows}).values_list('pk', 'layout_version')
+        )
+        filled = []
+        for show in shows:
+            seat_map = existing.get(show.pk)
+            if seat_map is None:
+                continue
+            seat_map.row_runs = free_row_runs(seat_map, show.screen_id, layout_versions[show.screen_id])
+            show.max_run = max(seat_map.row_runs, default=0)
+            filled.append(show)
+        ShowSeatMap.objects.bulk_update(existing.values(), ['row_runs'])
+        Show.objects.bulk_update(filled, ['max_run'])
+
+
+def _locked_seat_map(show_id):
+    """
+    Fetch a show's map for update inside an open transaction.
+    The touch-UPDATE takes the write lock first so read-modify-write on
+    SQLite (which ignores SELECT ... FOR UPDATE) cannot lose updates.
+    """
+    touched = ShowSeatMap.objects.filter(pk=show_id).update(updated_at=timezone.now())
+    if not touched:
+        return rebuild_seat_map(Show.objects.get(pk=show_id))
+    return ShowSeatMap.objects.select_for_update().get(pk=show_id)
+
+
+def update_positions(show_id, book=(), unbook=(), hold=(), unhold=()):
+    """
+    Apply bit changes (by seat position) to a show's map in one locked write.
+    Setting and clearing are idempotent, so a map rebuilt mid-transaction
+    from the source tables stays correct.
+    """
+    with transaction.atomic():
+        seat_map = _locked_seat_map(show_id)
+        before = (seat_map.booked_bits, seat_map.held_bits)
+        counts_before = seat_counts(seat_map)
+        booked = (before[0] | bits_for(book)) & ~bits_for(unbook)
+        held = (before[1] | bits_for(hold)) & ~bits_for(unhold)
+        changes = seat_changes(before, (booked, held))
+        seat_map.set_bits(booked=booked, held=held)
+        row_runs = seat_map.row_runs
+        if changes:
+            screen_id, layout_version = Show.objects.values_list('screen_id', 'screen__layout_version').get(pk=show_id)
+            touched = [pos for pos in (*book, *unbook, *hold, *unhold) if pos is not None]
+            seat_map.row_runs = free_row_runs(seat_map, screen_id, layout_version, touched)
+            seat_map.version += 1
+            SeatMapChange.objects.create(show_id=show_id, version=seat_map.version, **changes)
+            _prune_change_log(show_id, seat_map.version)
+        seat_map.save(update_fields=['booked', 'held', 'available_count', 'version', 'row_runs', 'updated_at'])
+        _, sold, held = seat_counts(seat_map)
+        if (sold, held) != counts_before[1:] or seat_map.row_runs != row_runs:
+            _shift_counters(
+                show_id, sold - counts_before[1], held - counts_before[2], max(seat_map.row_runs, default=0)
+            )
+
+        # Tell live seat layouts once the change is committed
+        if changes:
+            available_count, version = seat_map.available_count, seat_map.version
+            transaction.on_commit(lambda: publish_seat_changes(show_id, changes, available_count, version))
+    return seat_map
+
+
+def _prune_change_log(show_id, version):
+    # Trim in steps rather than on every write; clients further behind get a full map
+    keep = getattr(settings, 'SEAT_MAP_CHANGE_LOG_SIZE', 200)
+    if version % 50 == 0:
+        SeatMapChange.objects.filter(show_id=show_id, version__lte=version - keep).delete()
+
+
+def changes_since(seat_map, since):
+    """
+    Seat positions changed after version `since`, or None when the log
+    cannot answer (too old, from before a rebuild, or from the future).
+    """
+    if since == seat_map.version:
+        return set()
+    if since > seat_map.version:
+        return None
+    changes = list(
+        SeatMapChange.objects.filter(show_id=seat_map.show_id, version__gt=since, version__lte=seat_map.version)
+        .order_by('version')
+    )
+    if [c.version for c in changes] != list(range(since + 1, seat_map.version + 1)):
+        return None
+    positions = set()
+    for change in changes:
+        positions |= change.positions()
+    return positions
+
+
+def _seat_positions(seat_ids):
+    return list(Seat.objects.filter(pk__in=seat_ids).values_list('position', flat=True))
+
+
+def mark_booked(show, seat_ids):
+    """Set the booked bit for the given seats of a show"""
+    if not seat_ids:
+        return None
+    return update_positions(show.pk, book=_seat_positions(seat_ids))
+
+
+def mark_released(show, seat_ids):
+    """Clear the booked bit for the given seats of a show"""
+    if not seat_ids:
+        return None
+    return update_positions(show.pk, unbook=_seat_positions(seat_ids))
+
+
+def mark_held(show, seat_ids):
+    """Set the held bit for the given seats of a show"""
+    if not seat_ids:
+        return None
+    return update_positions(show.pk, hold=_seat_positions(seat_ids))
+
+
+def mark_unheld(show, seat_ids):
+    """Clear the held bit for the given seats of a show"""
+    if not seat_ids:
+        return None
+    return update_positions(show.pk, unhold=_seat_positions(seat_ids))
+
+
+def invalidate_screen_maps(screen_id):
+    """
+    Drop cached maps for every show of a screen after its seats change,
+    move the screen to a new layout version (see theatres.packed) and
+    refresh the shows' capacity
+    """
+    ShowSeatMap.objects.filter(show__screen_id=screen_id).delete()
+    Screen.objects.filter(pk=screen_id).update(layout_version=F('layout_version') + 1)
+    capacity = Seat.objects.filter(screen_id=screen_id, is_available=True).count()
+    # max_run is unknown until the maps are rebuilt (searches rebuild them)
+    Show.objects.filter(screen_id=screen_id).update(
+        capacity=capacity, max_run=None, status=housefull_status(F('seats_sold'), Value(capacity)),
+    )
+
+
+def reconcile_show_counters(shows, dry_run=False, batch_size=500):
+    """
+    Recount capacity, sold and held seats for shows from the Seat, Ticket
+    and SeatHold tables and fix any counter (and housefull status) that
+    drifted. Works through the queryset in primary-key batches.
+    Returns a list of (show_id, old (capacity, sold, held), new ones).
+    """
+    from bookings.models import Ticket, SeatHold
+
+    fixed = []
+    last_pk = 0
+    while True:
+        batch = list(shows.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not batch:
+            return fixed
+        last_pk = batch[-1].pk
+        show_ids = [show.pk for show in batch]
+
+        capacity = dict(
+            Seat.objects.filter(screen_id__in={show.screen_id for show in batch}, is_available=True)
+            .values_list('screen_id').annotate(n=Count('pk')).values_list('screen_id', 'n')
+        )
+        active_tickets = Ticket.objects.exclude(status='cancelled')
+        sold = dict(
+            active_tickets.filter(show_id__in=show_ids, seat__screen_id=F('show__screen_id'), seat__is_available=True)
+            .values_list('show_id').annotate(n=Count('seat_id', distinct=True)).values_list('show_id', 'n')
+        )
+        held = dict(
+            SeatHold.objects.filter(show_id__in=show_ids, seat__screen_id=F('show__screen_id'), seat__is_available=True)
+            .exclude(Exists(active_tickets.filter(show_id=OuterRef('show_id'), seat_id=OuterRef('seat_id'))))
+            .values_list('show_id').annotate(n=Count('pk')).values_list('show_id', 'n')
+        )
+
+        changed = []
+        for show in batch:
+            old = (show.capacity, show.seats_sold, show.seats_held)
+            new = (capacity.get(show.screen_id, 0), sold.get(show.pk, 0), held.get(show.pk, 0))
+            status = _status_after(show.status, new[1], new[0])
+            if old == new and status == show.status:
+                continue
+            show.capacity, show.seats_sold, show.seats_held = new
+            show.status = status
+            changed.append(show)
+            fixed.append((show.pk, old, new))
+        if changed and not dry_run:
+            Show.objects.bulk_update(changed, ['capacity', 'seats_sold', 'seats_held', 'status'])
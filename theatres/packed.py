@@ -0,0 +1,63 @@
+"""
+Packed seat-map wire format
+- Per-screen layout descriptor: seats as parallel arrays with row, type and
+  price lookup tables; fixed for a screen's layout_version, so it is served
+  from a versioned URL that browsers may cache forever
+- Per-show occupancy: the taken-seat bitset (bit N = seat position N) as base64
+"""
+
+import base64
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from .compact import NO_POSITION, seats_for
+from .occupancy import to_bytes
+
+
+def layout_url(screen):
+    return reverse('theatres:screen_layout', kwargs={'screen_id': screen.pk, 'version': screen.layout_version})
+
+
+def _build_layout(screen):
+    seats = seats_for(screen)
+    positions = [None if position == NO_POSITION else position for position in seats.positions]
+    return {
+        'screen': screen.pk,
+        'layout_version': screen.layout_version,
+        'rows': list(seats.row_labels),
+        'types': list(seats.type_names),
+        'prices': list(seats.prices),
+        'seats': {
+            'id': seats.ids.tolist(),
+            'position': positions,
+            'row': seats.rows.tolist(),
+            'number': seats.numbers.tolist(),
+            'type': seats.types.tolist(),
+            'price': seats.price_tiers.tolist(),
+        },
+        'blocked': [position for position, available in zip(positions, seats.available) if not available],
+    }
+
+
+def layout_descriptor(screen):
+    """The screen's static layout; built once per layout version"""
+    key = f'theatres:layout:{screen.pk}:{screen.layout_version}'
+    return cache.get_or_set(key, lambda: _build_layout(screen), timeout=None)
+
+
+def encode_bits(bits):
+    """Little-endian bitset as base64 text"""
+    return base64.b64encode(to_bytes(bits)).decode('ascii')
+
+
+def packed_seat_status(show, seat_map):
+    """Occupancy of a show in packed form, pointing at its layout descriptor"""
+    return {
+        'format': 'packed',
+        'version': seat_map.version,
+        'layout_version': show.screen.layout_version,
+        'layout_url': layout_url(show.screen),
+        'taken': encode_bits(seat_map.taken_bits),
+        'available_count': seat_map.available_count,
+    }
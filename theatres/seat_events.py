@@ -0,0 +1,206 @@
+"""
+Live seat status for the seat layout page
+- In-process publish/subscribe hub keyed by show; each subscriber is an
+  asyncio queue fed thread-safely, so an idle stream is a suspended
+  coroutine rather than a blocked worker thread (ASGI only, see
+  theatres.views.seat_events)
+- update_positions() publishes seat-state deltas after its transaction commits
+- Changes committed in other server processes never reach this hub: streams
+  also watch the show's seat map version (one read per show per
+  SEAT_EVENTS_POLL_SECONDS in each process) and resync when it moves
+- seat_event_stream() turns a subscription into a Server-Sent Events body
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+
+class Subscription:
+    """A stream's bounded event queue, owned by the event loop serving the stream"""
+
+    def __init__(self, max_pending):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_pending)
+
+    def _deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync'})
+
+    def put(self, event):
+        """Queue an event; safe to call from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            pass  # the loop is closed, and the stream with it
+
+    async def get(self, timeout):
+        """The next event, or None after `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SeatEventHub:
+    """
+    Fan seat-change events out to every subscriber of a show.
+    Each subscriber gets a bounded queue; one that falls too far behind is
+    flushed and told to resync instead of growing without limit.
+    The latest seat map version seen per watched show is shared by its
+    streams, so they cost one version read per poll interval between them.
+    """
+
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._subscribers = defaultdict(set)
+        self._versions = {}  # show_id -> (monotonic time read, version)
+        self._lock = threading.Lock()
+
+    def subscribe(self, show_id):
+        """Subscribe the calling coroutine's event loop to a show"""
+        subscription = Subscription(self.max_pending)
+        with self._lock:
+            self._subscribers[show_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, show_id, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(show_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[show_id]
+                    self._versions.pop(show_id, None)
+
+    def subscriber_count(self, show_id):
+        with self._lock:
+            return len(self._subscribers.get(show_id, ()))
+
+    def _note_version(self, show_id, version):
+        seen = self._versions.get(show_id)
+        if seen is None or version >= seen[1]:
+            self._versions[show_id] = (time.monotonic(), version)
+
+    def publish(self, show_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(show_id, ()))
+            if subscribers and 'version' in event:
+                self._note_version(show_id, event['version'])
+        for subscription in subscribers:
+            subscription.put(event)
+        return len(subscribers)
+
+    async def latest_version(self, show_id, load_version, max_age):
+        """
+        The show's seat map version: the last one seen if it is under
+        `max_age` seconds old, else read with the coroutine `load_version()`
+        """
+        with self._lock:
+            seen = self._versions.get(show_id)
+        if seen is not None and time.monotonic() - seen[0] < max_age:
+            return seen[1]
+        version = await load_version()
+        with self._lock:
+            self._note_version(show_id, version)
+            return self._versions[show_id][1]
+
+
+hub = SeatEventHub()
+
+
+def _positions(bits):
+    positions = []
+    while bits:
+        low = bits & -bits
+        positions.append(low.bit_length() - 1)
+        bits ^= low
+    return positions
+
+
+def seat_changes(before, after):
+    """
+    Delta between two states of a show's map, as given by
+    (booked_bits, held_bits). Returns None when nothing visible changed.
+    """
+    old_booked, old_held = before
+    new_booked, new_held = after
+    booked = new_booked & ~old_booked
+    held = new_held & ~old_held & ~new_booked
+    released = (old_booked | old_held) & ~(new_booked | new_held)
+    if not (booked or held or released):
+        return None
+    return {
+        'booked': _positions(booked),
+        'held': _positions(held),
+        'released': _positions(released),
+    }
+
+
+def publish_seat_changes(show_id, changes, available_count, version):
+    """Send a delta to everyone watching the show (call after commit)"""
+    hub.publish(show_id, dict(changes, type='seats', available_count=available_count, version=version))
+
+
+def _format_event(event):
+    name = event.get('type', 'message')
+    return f'event: {name}\ndata: {json.dumps(event, separators=(",", ":"))}\n\n'
+
+
+async def seat_event_stream(show_id, snapshot, load_version):
+    """
+    Async generator of SSE frames for one client of a show.
+
+    Starts with a snapshot of the seats taken right now (so nothing between
+    page render and subscribe is missed), then relays deltas. `snapshot()`
+    and `load_version()` are coroutines supplied by the view. When the
+    show's version moves without a local delta (a change made by another
+    process, or a gap in the deltas) the client gets a fresh snapshot.
+    Idle connections get a comment line every SEAT_EVENTS_KEEPALIVE_SECONDS;
+    after SEAT_EVENTS_MAX_SECONDS the stream ends and EventSource reconnects.
+    """
+    keepalive = getattr(settings, 'SEAT_EVENTS_KEEPALIVE_SECONDS', 15)
+    lifetime = getattr(settings, 'SEAT_EVENTS_MAX_SECONDS', 300)
+    poll = getattr(settings, 'SEAT_EVENTS_POLL_SECONDS', 2)
+    subscription = hub.subscribe(show_id)
+    try:
+        yield 'retry: 3000\n\n'
+        state = await snapshot()
+        version = state['version']
+        yield _format_event(dict(state, type='snapshot'))
+        deadline = time.monotonic() + lifetime
+        next_keepalive = time.monotonic() + keepalive
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = await subscription.get(timeout=min(poll, remaining))
+            if event is None:
+                if await hub.latest_version(show_id, load_version, poll) > version:
+                    event = {'type': 'resync'}
+                elif time.monotonic() >= next_keepalive:
+                    next_keepalive = time.monotonic() + keepalive
+                    yield ': keepalive\n\n'
+                    continue
+                else:
+                    continue
+            elif event.get('type') == 'seats':
+                if event['version'] <= version:
+                    continue  # already in the snapshot
+                if event['version'] > version + 1:
+                    event = {'type': 'resync'}  # missed a change made elsewhere
+            if event.get('type') == 'resync':
+                event = dict(await snapshot(), type='snapshot')
+            version = max(version, event.get('version', version))
+            next_keepalive = time.monotonic() + keepalive
+            yield _format_event(event)
+    finally:
+        hub.unsubscribe(show_id, subscription)
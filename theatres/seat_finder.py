@@ -0,0 +1,130 @@
+"""
+Best-available seat blocks for groups
+- Seats are adjacent when they share a row and have consecutive seat
+  numbers; a missing number (aisle) or blocked seat breaks a block
+- One pass per row over the screen's cached layout and the show's occupancy
+  bitset: O(rows x seats) whatever the group size
+- Blocks are scored on distance from the row centre, distance from the
+  preferred viewing depth and seat type
+- longest_run() feeds the per-row run summaries kept on each seat map
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+from .compact import NO_POSITION, compact_seats
+from .occupancy import get_seat_map
+
+# Largest group a single block search accepts
+MAX_BLOCK_SIZE = 20
+
+# Preferred row, as a fraction of the way back from the screen (row A)
+IDEAL_ROW_DEPTH = 0.65
+
+# Score weights (lower scores are better)
+CENTRE_WEIGHT = 1.0
+DEPTH_WEIGHT = 1.0
+TYPE_WEIGHT = 0.5
+TYPE_PREFERENCE = {'standard': 0, 'premium': 1, 'vip': 2}
+
+# row: row label; seat_ids/numbers/positions: the seats left to right
+SeatBlock = namedtuple('SeatBlock', ['row', 'seat_ids', 'numbers', 'positions', 'score'])
+
+# rows: a screen's seats front to back, each row as (row label,
+# [(seat number, position, seat type, seat id), ...]) ordered by seat number;
+# row_of: seat position -> index into rows
+RowIndex = namedtuple('RowIndex', ['rows', 'row_of'])
+
+
+@lru_cache(maxsize=256)
+def row_index(screen_id, layout_version):
+    """RowIndex of a screen's seats, kept per process for each layout version"""
+    seats = compact_seats(screen_id, layout_version)
+    rows = [
+        (label, [
+            (seats.numbers[idx], seats.positions[idx], seats.seat_type(idx), seats.ids[idx])
+            for idx in indexes if seats.positions[idx] != NO_POSITION
+        ])
+        for label, indexes in seats.by_row()
+    ]
+    rows = [(label, row) for label, row in rows if row]
+    row_of = {seat[1]: idx for idx, (_, row) in enumerate(rows) for seat in row}
+    return RowIndex(rows, row_of)
+
+
+def longest_run(seats, free_bits):
+    """Length of the longest run of adjacent free seats in one row of row_index().rows"""
+    longest = run = 0
+    previous_number = None
+    for number, position, _, _ in seats:
+        if not (free_bits >> position) & 1:
+            run = 0
+        elif run and number == previous_number + 1:
+            run += 1
+        else:
+            run = 1
+        previous_number = number
+        longest = max(longest, run)
+    return longest
+
+
+def best_block(rows, free_bits, count, seat_type=None):
+    """
+    Best run of `count` adjacent free seats, or None.
+
+    Args:
+        rows: row_index().rows of the show's screen
+        free_bits: bitset of seat positions that can be sold now
+        count: number of seats wanted together
+        seat_type: only consider seats of this type
+    """
+    best = None
+    top_preference = max(TYPE_PREFERENCE.values()) or 1
+    last_row = max(len(rows) - 1, 1)
+    for row_number, (label, seats) in enumerate(rows):
+        if len(seats) < count:
+            continue
+        depth = abs(row_number / last_row - IDEAL_ROW_DEPTH)
+        row_mid = (seats[0][0] + seats[-1][0]) / 2
+        half_width = max((seats[-1][0] - seats[0][0]) / 2, 1)
+
+        # Running sum of type preference so each window scores in O(1)
+        preference_sum = [0]
+        run_start = 0
+        previous_number = None
+        for idx, (number, position, kind, _) in enumerate(seats):
+            preference_sum.append(preference_sum[-1] + TYPE_PREFERENCE.get(kind, 0))
+            usable = (free_bits >> position) & 1 and (seat_type is None or kind == seat_type)
+            if not usable:
+                run_start = idx + 1
+            elif previous_number is not None and number != previous_number + 1:
+                run_start = idx
+            previous_number = number
+            start = idx - count + 1
+            if not usable or start < run_start:
+                continue
+
+            centre = abs((seats[start][0] + number) / 2 - row_mid) / half_width
+            preference = (preference_sum[idx + 1] - preference_sum[start]) / count / top_preference
+            score = CENTRE_WEIGHT * centre + DEPTH_WEIGHT * depth - TYPE_WEIGHT * preference
+            if best is None or score < best[0]:
+                best = (score, label, seats[start:idx + 1])
+
+    if best is None:
+        return None
+    score, label, block = best
+    return SeatBlock(
+        row=label,
+        seat_ids=[seat[3] for seat in block],
+        numbers=[seat[0] for seat in block],
+        positions=[seat[1] for seat in block],
+        score=round(score, 4),
+    )
+
+
+def find_best_seats(show, count, seat_type=None):
+    """Best block of `count` seats together for a show right now, or None"""
+    seat_map = get_seat_map(show)
+    free_bits = seat_map.sellable_bits & ~seat_map.taken_bits
+    rows = row_index(show.screen_id, show.screen.layout_version).rows
+    return best_block(rows, free_bits, count, seat_type)
@@ -0,0 +1,94 @@
+"""
+Precompiled seat grid for the seat layout page
+- The static markup of a screen's rows and seats is rendered once per
+  layout version and kept in process memory (no unpickling per request);
+  Seat changes bump the version (see theatres.occupancy.invalidate_screen_maps),
+  so stale grids are never read
+- The grid is cached with every seat available, together with where each
+  seat's markup sits; a request only splices in booked markup for the
+  show's taken seats, with no queries or template work per seat
+"""
+
+from functools import lru_cache
+
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .compact import NO_POSITION, compact_seats
+
+ROW_START = '<div class="seat-row mb-3"><div class="row-label me-3">{}</div><div class="seats">'
+ROW_END = '</div></div>'
+
+WRAPPER = (
+    '<div class="seat-wrapper" data-position="{}" data-seat-id="{}" '
+    'data-seat-label="{}" data-seat-price="{}">'
+)
+AVAILABLE = (
+    '<label class="seat-label">'
+    '<input type="checkbox" name="seats" value="{}" class="seat-checkbox" data-seat-label="{}" data-seat-price="{}">'
+    '<div class="seat seat-available" title="{} - ₹{}"><i class="fas fa-chair"></i></div>'
+    '</label></div>'
+)
+BOOKED = '<div class="seat seat-booked" title="{} - Booked"><i class="fas fa-chair"></i></div></div>'
+
+
+@lru_cache(maxsize=256)
+def compiled_grid(screen_id, layout_version):
+    """
+    The grid with every seat available, plus for each seat position the
+    span of its available markup and the booked markup that replaces it.
+    Built once per layout version.
+    """
+    parts, spans = [], {}
+    length = 0
+    previous_row = None
+
+    def add(text):
+        nonlocal length
+        parts.append(text)
+        length += len(text)
+
+    seats = compact_seats(screen_id, layout_version)
+    for idx, seat_id in enumerate(seats.ids):
+        row = seats.row_labels[seats.rows[idx]]
+        number, position = seats.numbers[idx], seats.positions[idx]
+        price = f'{seats.price(idx):.2f}'  # as the DecimalField renders
+        if row != previous_row:
+            if previous_row is not None:
+                add(ROW_END)
+            add(format_html(ROW_START, row))
+            previous_row = row
+        label = f'{row}{number}'
+        add(format_html(WRAPPER, '' if position == NO_POSITION else position, seat_id, label, price))
+        start = length
+        add(format_html(AVAILABLE, seat_id, label, price, label, price))
+        if position != NO_POSITION:
+            spans[position] = (start, length, format_html(BOOKED, label))
+    if previous_row is not None:
+        add(ROW_END)
+    return ''.join(parts), spans
+
+
+def seat_grid_html(screen, taken_bits):
+    """
+    Seat grid markup with the seats in taken_bits (by position) booked.
+    Work is proportional to the number of taken seats, not the screen size.
+    """
+    html, spans = compiled_grid(screen.pk, screen.layout_version)
+    taken = []
+    while taken_bits:
+        low = taken_bits & -taken_bits
+        span = spans.get(low.bit_length() - 1)
+        if span is not None:
+            taken.append(span)
+        taken_bits ^= low
+    taken.sort()
+
+    parts = []
+    offset = 0
+    for start, end, booked in taken:
+        parts.append(html[offset:start])
+        parts.append(booked)
+        offset = end
+    parts.append(html[offset:])
+    return mark_safe(''.join(parts))
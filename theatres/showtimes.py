@@ -0,0 +1,61 @@
+"""
+Show start/end timestamps
+- show_window() turns a show's local date, start time and end time into
+  aware datetimes; an end time at or before the start time means the show
+  runs past midnight and ends the next day
+- backfill_show_windows() fills Show.starts_at/ends_at in primary-key
+  batches (see the backfill_show_times command)
+"""
+
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+
+def show_window(show_date, show_time, end_time):
+    """(starts_at, ends_at) in the current time zone, or (None, None) if incomplete"""
+    if show_date is None or show_time is None:
+        return None, None
+    tz = timezone.get_current_timezone()
+    starts_at = timezone.make_aware(datetime.combine(show_date, show_time), tz)
+    if end_time is None:
+        return starts_at, None
+    ends_at = datetime.combine(show_date, end_time)
+    if end_time <= show_time:
+        ends_at += timedelta(days=1)
+    return starts_at, timezone.make_aware(ends_at, tz)
+
+
+def day_bounds(day):
+    """Aware [start, end) of a local calendar day, for starts_at range queries"""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()), tz)
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), datetime.min.time()), tz)
+
+
+def backfill_show_windows(show_model, batch_size=1000, only_missing=True):
+    """
+    Recompute starts_at/ends_at for shows, streaming primary-key batches so
+    memory stays flat on large tables. Returns the number of rows updated.
+    """
+    shows = show_model.objects.all()
+    if only_missing:
+        shows = shows.filter(starts_at__isnull=True)
+    updated = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            shows.filter(pk__gt=last_pk).order_by('pk')
+            .only('pk', 'show_date', 'show_time', 'end_time', 'starts_at', 'ends_at')[:batch_size]
+        )
+        if not batch:
+            return updated
+        last_pk = batch[-1].pk
+        changed = []
+        for show in batch:
+            window = show_window(show.show_date, show.show_time, show.end_time)
+            if window != (show.starts_at, show.ends_at):
+                show.starts_at, show.ends_at = window
+                changed.append(show)
+        show_model.objects.bulk_update(changed, ['starts_at', 'ends_at'])
+        updated += len(changed)
@@ -0,0 +1,77 @@
+"""
+Tests for the theatres app
+- Show.save() must not write back seat counters maintained by theatres.occupancy
+"""
+
+from datetime import date, time
+
+from django.test import TestCase
+
+from movies.models import Movie
+from .models import Theatre, Screen, Seat, Show
+from .occupancy import get_seat_map, mark_booked
+
+
+class ShowSaveCountersTest(TestCase):
+    """A full save of a stale Show instance keeps counters changed meanwhile"""
+
+    def setUp(self):
+        theatre = Theatre.objects.create(
+            name='Test Theatre', address='-', city='Pune', state='MH',
+            postal_code='411001', phone_number='0', email='test@example.com', total_screens=1,
+        )
+        screen = Screen.objects.create(theatre=theatre, name='Screen 1', capacity=2, total_rows=1, seats_per_row=2)
+        self.seats = [
+            Seat.objects.create(screen=screen, row='A', seat_number=number, base_price=200)
+            for number in (1, 2)
+        ]
+        movie = Movie.objects.create(
+            title='Test Movie', description='-', poster='movie_posters/test.jpg',
+            release_date=date.today(), duration_minutes=120, language='english',
+        )
+        self.show = Show.objects.create(
+            screen=screen, movie=movie, show_date=date.today(), show_time=time(20, 0),
+            end_time=time(22, 0), base_ticket_price=200,
+        )
+        get_seat_map(self.show)  # builds the map and sets the counters
+
+    def book(self, seats):
+        """Book seats through another instance, as a concurrent request would"""
+        mark_booked(Show.objects.get(pk=self.show.pk), [seat.pk for seat in seats])
+
+    def test_full_save_after_concurrent_booking_keeps_count(self):
+        stale = Show.objects.get(pk=self.show.pk)
+        self.book(self.seats[:1])
+
+        stale.base_ticket_price = 250
+        stale.save()
+
+        show = Show.objects.get(pk=self.show.pk)
+        self.assertEqual(show.seats_sold, 1)
+        self.assertEqual(show.capacity, 2)
+        self.assertEqual(show.base_ticket_price, 250)
+        self.assertEqual(show.status, 'available')
+
+    def test_full_save_keeps_housefull_set_meanwhile(self):
+        stale = Show.objects.get(pk=self.show.pk)
+        self.book(self.seats)
+
+        stale.save()
+
+        show = Show.objects.get(pk=self.show.pk)
+        self.assertEqual(show.seats_sold, 2)
+        self.assertEqual(show.status, 'housefull')
+
+    def test_changed_status_is_saved_and_rederived(self):
+        self.book(self.seats)
+        show = Show.objects.get(pk=self.show.pk)
+
+        show.status = 'cancelled'
+        show.save()
+        self.assertEqual(Show.objects.get(pk=show.pk).status, 'cancelled')
+
+        # Reopening a sold-out show makes it housefull, not available
+        show.status = 'available'
+        show.save()
+        self.assertEqual(show.status, 'housefull')
+        self.assertEqual(Show.objects.get(pk=show.pk).status, 'housefull')
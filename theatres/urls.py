@@ -14,8 +14,12 @@ urlpatterns = [
     
     # Show and seat selection
     path('shows/available/', views.get_available_shows, name='get_available_shows'),
+    path('shows/seats-together/', views.search_seats_together, name='search_seats_together'),
     path('show/<int:show_id>/seats/', views.seat_layout, name='seat_layout'),
     path('show/<int:show_id>/seat-status/', views.get_seat_status, name='get_seat_status'),
+    path('show/<int:show_id>/seat-events/', views.seat_events, name='seat_events'),
+    path('show/<int:show_id>/best-seats/', views.best_seats, name='best_seats'),
+    path('screen/<int:screen_id>/layout/v<int:version>/', views.screen_layout, name='screen_layout'),
     
     # Theatre management
     path('<int:theatre_id>/manage-screens/', views.screen_management, name='screen_management'),
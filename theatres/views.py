@@ -3,14 +3,27 @@ Views for Theatres app
 - Display theatres list
 - Theatre details with available shows
 - Seat layout and selection
+- Live seat status (Server-Sent Events)
+- Best-available seats for groups
 """
 
-from django.shortcuts import render, get_object_or_404, redirect
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
 from django.views.decorators.http import require_http_methods
 from django.db.models import Q, Count
-from django.http import JsonResponse
-from .models import Theatre, Screen, Show, Seat
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.utils.http import parse_etags
+from .models import Theatre, Screen, Show, ShowSeatMap
 from .forms import TheatreSelectionForm, ShowSelectionForm, SeatSelectionForm
+from .availability import shows_with_seats_together, theatre_schedule
+from .compact import seats_for
+from .occupancy import changes_since, get_seat_map
+from .packed import layout_descriptor, layout_url, packed_seat_status
+from .seat_events import seat_event_stream
+from .seat_finder import MAX_BLOCK_SIZE, find_best_seats
+from .seat_grid import seat_grid_html
 from movies.models import Movie
 from datetime import datetime, timedelta
 
@@ -49,19 +62,12 @@ def theatre_detail(request, pk):
     except:
         show_date = datetime.now().date()
     
-    # Get shows for this theatre on selected date
-    shows = Show.objects.filter(
-        screen__theatre=theatre,
-        show_date=show_date,
-        is_active=True
-    ).select_related('movie', 'screen').order_by('show_time')
-
-    # Build screens info with shows and seat counts to display full details in template
-    screens_qs = theatre.screens.filter(is_active=True).prefetch_related('seats')
+    # Shows, seat counts and genres for every screen in a fixed number of queries
+    shows, screens = theatre_schedule(theatre, show_date)
     screens_info = []
-    for screen in screens_qs:
+    for screen in screens:
         screen_shows = []
-        for sh in shows.filter(screen=screen):
+        for sh in screen.day_shows:
             mv = sh.movie
             poster_url = None
             try:
@@ -79,7 +85,8 @@ def theatre_detail(request, pk):
                 'end_time': sh.end_time,
                 'base_ticket_price': sh.base_ticket_price,
                 'status': sh.status,
-                'available_seats': sh.get_available_seats_count(),
+                'available_seats': sh.availability.available,
+                'seats_sold': sh.availability.sold,
                 'duration': mv.get_duration_display() if hasattr(mv, 'get_duration_display') else None,
                 'genres': mv.get_genres_display() if hasattr(mv, 'get_genres_display') else None,
                 'rating': getattr(mv, 'rating', None),
@@ -91,7 +98,7 @@ def theatre_detail(request, pk):
 
         screens_info.append({
             'screen': screen,
-            'capacity': screen.seats.count(),
+            'capacity': screen.seat_count,
             'total_rows': getattr(screen, 'total_rows', None),
             'seats_per_row': getattr(screen, 'seats_per_row', None),
             'shows': screen_shows,
@@ -133,88 +140,78 @@ def get_available_shows(request):
     """
     movie_id = request.GET.get('movie_id')
     theatre_id = request.GET.get('theatre_id')
-    show_date = request.GET.get('date')
+    try:
+        show_date = parse_date(request.GET.get('date') or '')
+    except ValueError:
+        show_date = None
+    if show_date is None:
+        return JsonResponse({'shows': []})
     
-    shows = Show.objects.filter(
+    shows = Show.objects.on_date(show_date).filter(
         movie_id=movie_id,
         screen__theatre_id=theatre_id,
-        show_date=show_date,
         is_active=True,
         status='available'
-    ).values('id', 'show_time', 'end_time', 'base_ticket_price')
+    ).order_by('starts_at').values('id', 'show_time', 'end_time', 'base_ticket_price')
     
     return JsonResponse({
         'shows': list(shows)
     })
 
 
+@require_http_methods(["GET"])
+def search_seats_together(request):
+    """
+    AJAX endpoint: shows of a movie in a city that can seat a group together.
+    Takes movie_id, city, seats (group size), and date_from/date_to
+    (YYYY-MM-DD; default today and the following 6 days).
+    """
+    movie_id = request.GET.get('movie_id')
+    city = request.GET.get('city', '').strip()
+    try:
+        count = int(request.GET.get('seats', ''))
+        date_from = datetime.fromisoformat(request.GET['date_from']).date() if request.GET.get('date_from') else datetime.now().date()
+        date_to = datetime.fromisoformat(request.GET['date_to']).date() if request.GET.get('date_to') else date_from + timedelta(days=6)
+    except ValueError:
+        return JsonResponse({'error': 'seats must be a number and dates YYYY-MM-DD'}, status=400)
+    if not movie_id or not movie_id.isdigit() or not city:
+        return JsonResponse({'error': 'movie_id and city are required'}, status=400)
+    if not 1 <= count <= MAX_BLOCK_SIZE:
+        return JsonResponse({'error': f'seats must be between 1 and {MAX_BLOCK_SIZE}'}, status=400)
+
+    shows = shows_with_seats_together(int(movie_id), city, date_from, date_to, count)
+    return JsonResponse({
+        'seats': count,
+        'shows': [
+            {
+                'id': show.id,
+                'theatre_id': show.screen.theatre_id,
+                'theatre': show.screen.theatre.name,
+                'screen': show.screen.name,
+                'show_date': show.show_date,
+                'show_time': show.show_time,
+                'base_ticket_price': show.base_ticket_price,
+                'max_together': show.max_run,
+                'seats_available': show.seats_available,
+            }
+            for show in shows
+        ],
+    })
+
+
 def seat_layout(request, show_id):
     """
     Display seat layout for a selected show
     """
-    show = get_object_or_404(Show, id=show_id, is_active=True)
-    seats_qs = show.screen.seats.all().order_by('row', 'seat_number')
-
-    # If no seats exist for this screen, auto-generate seats based on screen configuration
-    seats = list(seats_qs)
-    if not seats:
-        screen = show.screen
-        # Determine rows as letters A, B, C... based on total_rows
-        total_rows = getattr(screen, 'total_rows', None) or 0
-        seats_per_row = getattr(screen, 'seats_per_row', None) or 0
-        # Safety checks
-        try:
-            total_rows = int(total_rows)
-            seats_per_row = int(seats_per_row)
-        except Exception:
-            total_rows = 0
-            seats_per_row = 0
-
-        rows = []
-        for i in range(total_rows):
-            # Support beyond 26 rows by repeating letters (AA, AB...)
-            letter = ''
-            n = i
-            while True:
-                letter = chr(ord('A') + (n % 26)) + letter
-                n = n // 26 - 1
-                if n < 0:
-                    break
-            rows.append(letter)
-
-        created_seats = []
-        for r in rows:
-            for sn in range(1, seats_per_row + 1):
-                s = Seat.objects.create(
-                    screen=screen,
-                    row=r,
-                    seat_number=sn,
-                    seat_type='standard',
-                    is_available=True,
-                    status='available',
-                    base_price=show.base_ticket_price or 0
-                )
-                created_seats.append(s)
-
-        seats = created_seats
-    
-    # Group seats by row
-    seats_by_row = {}
-    for seat in seats:
-        # seat may be dict-like if using values(), ensure attribute access
-        row_key = getattr(seat, 'row', None) or (seat.get('row') if isinstance(seat, dict) else None)
-        if row_key not in seats_by_row:
-            seats_by_row[row_key] = []
-        seats_by_row[row_key].append(seat)
-    
-    # Get booked seats
-    from bookings.models import Ticket
-    booked_seat_ids = Ticket.objects.filter(show=show).values_list('seat_id', flat=True)
+    show = get_object_or_404(Show.objects.select_related('movie', 'screen__theatre'), id=show_id, is_active=True)
+
+    # Static grid from the per-screen cache; only taken seats are filled in per request
+    seat_map = get_seat_map(show)
     
     context = {
         'show': show,
-        'seats_by_row': seats_by_row,
-        'booked_seat_ids': booked_seat_ids,
+        'seat_grid': seat_grid_html(show.screen, seat_map.taken_bits),
+        'max_block_size': MAX_BLOCK_SIZE,
         'page_title': f'Select Seats - {show.movie.title}',
     }
     return render(request, 'theatres/seat_layout.html', context)
@@ -223,32 +220,156 @@ def seat_layout(request, show_id):
 @require_http_methods(["GET"])
 def get_seat_status(request, show_id):
     """
-    AJAX endpoint to get seat availability status for a show
+    AJAX endpoint to get seat availability status for a show.
+
+    Responses carry the seat map version (also in the ETag, along with the
+    format). Clients can send ?since=<version> or If-None-Match: a 304 comes
+    back when nothing changed, and with `since` only the seats changed after
+    that version ({'delta': true, 'seats': [{'id', 'is_booked'}]}) are returned.
+    ?format=packed returns a base64 occupancy bitset plus the URL of the
+    screen's layout descriptor instead (see theatres.packed).
     """
-    show = get_object_or_404(Show, id=show_id)
-    seats = show.screen.seats.all().values('id', 'row', 'seat_number', 'seat_type', 'base_price')
+    show = get_object_or_404(Show.objects.select_related('screen'), id=show_id)
+    
+    # Occupancy comes from the show's bitset rather than a Ticket scan, and
+    # seats from the screen's in-memory table rather than Seat rows
+    seat_map = get_seat_map(show)
+    booked = seat_map.taken_bits
+    seats = seats_for(show.screen)
+    packed = request.GET.get('format') == 'packed'
+    # Each format is its own representation with its own validator
+    etag = f'"seats-{show.pk}-{seat_map.version}-{"packed" if packed else "json"}"'
+    
+    def respond(data, status=200):
+        response = JsonResponse(data, status=status) if data is not None else HttpResponse(status=304)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
     
-    # Get booked seats
-    from bookings.models import Ticket
-    booked_seat_ids = list(Ticket.objects.filter(show=show).values_list('seat_id', flat=True))
+    # Weak comparison, as If-None-Match requires: W/"x" matches "x"; * matches any version
+    client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+    if '*' in client_etags or etag in {tag.removeprefix('W/') for tag in client_etags}:
+        return respond(None)
+    
+    if packed:
+        if request.GET.get('since') == str(seat_map.version):
+            return respond(None)
+        return respond(packed_seat_status(show, seat_map))
+    
+    since = request.GET.get('since')
+    if since is not None and since.isdigit():
+        changed = changes_since(seat_map, int(since))
+        if changed == set():
+            return respond(None)
+        if changed is not None:
+            return respond({
+                'delta': True,
+                'version': seat_map.version,
+                'seats': [
+                    {'id': seats.ids[idx], 'is_booked': seats.is_taken(idx, booked)}
+                    for idx in seats.indexes_at(sorted(changed))
+                ],
+                'available_count': seat_map.available_count,
+            })
     
     seats_data = []
-    for seat in seats:
+    for idx in range(len(seats)):
         seats_data.append({
-            'id': seat['id'],
-            'row': seat['row'],
-            'seat_number': seat['seat_number'],
-            'type': seat['seat_type'],
-            'price': float(seat['base_price']),
-            'is_booked': seat['id'] in booked_seat_ids
+            'id': seats.ids[idx],
+            'row': seats.row_labels[seats.rows[idx]],
+            'seat_number': seats.numbers[idx],
+            'type': seats.seat_type(idx),
+            'price': seats.price(idx),
+            'is_booked': seats.is_taken(idx, booked),
         })
     
-    return JsonResponse({
+    return respond({
+        'delta': False,
+        'version': seat_map.version,
         'seats': seats_data,
-        'available_count': show.get_available_seats_count()
+        'available_count': seat_map.available_count
+    })
+
+
+@require_http_methods(["GET"])
+def screen_layout(request, screen_id, version):
+    """
+    Packed seat layout of a screen (see theatres.packed).
+    The URL carries the layout version, so a current response never changes
+    and may be cached forever; stale versions redirect to the current one.
+    """
+    screen = get_object_or_404(Screen, id=screen_id)
+    if version != screen.layout_version:
+        return redirect(layout_url(screen))
+    response = JsonResponse(layout_descriptor(screen))
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+@require_http_methods(["GET"])
+def best_seats(request, show_id):
+    """
+    AJAX endpoint suggesting the best block of ?count=N seats together.
+    Optional ?seat_type= limits the search to one seat type. Returns
+    {'found': false} when no row has that many adjacent free seats.
+    """
+    show = get_object_or_404(Show, id=show_id)
+    try:
+        count = int(request.GET.get('count', ''))
+    except ValueError:
+        count = 0
+    if not 1 <= count <= MAX_BLOCK_SIZE:
+        return JsonResponse({'error': f'count must be between 1 and {MAX_BLOCK_SIZE}'}, status=400)
+
+    block = find_best_seats(show, count, seat_type=request.GET.get('seat_type') or None)
+    if block is None:
+        return JsonResponse({'found': False, 'count': count})
+    return JsonResponse({
+        'found': True,
+        'count': count,
+        'row': block.row,
+        'seat_ids': block.seat_ids,
+        'seat_numbers': block.numbers,
+        'score': block.score,
     })
 
 
+@require_http_methods(["GET"])
+async def seat_events(request, show_id):
+    """
+    Server-Sent Events stream of seat changes for a show.
+    Sends a snapshot of taken seat positions, then booked/held/released deltas.
+
+    Served only under ASGI (movie_booking_project.asgi), where an open stream
+    is an idle coroutine. Under WSGI every stream would hold a worker thread
+    for up to SEAT_EVENTS_MAX_SECONDS, so the answer is 204 No Content: the
+    browser stops reconnecting and the seat layout page polls
+    get_seat_status instead.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    show = await aget_object_or_404(Show, id=show_id)
+
+    async def snapshot():
+        seat_map = await sync_to_async(get_seat_map)(show)
+        return {
+            'taken': sorted(seat_map.booked_positions()),
+            'available_count': seat_map.available_count,
+            'version': seat_map.version,
+        }
+
+    async def load_version():
+        version = await ShowSeatMap.objects.filter(pk=show.pk).values_list('version', flat=True).afirst()
+        return version or 0
+
+    response = StreamingHttpResponse(
+        seat_event_stream(show.pk, snapshot, load_version), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 def screen_management(request, theatre_id):
     """
     View for theatre managers to manage screens and seats (admin view)
@@ -0,0 +1,130 @@
+"""
+Benchmark: checkout and payment callback through the real Razorpay client path
+Run: python tools/bench_checkout.py [--payments 200] [--concurrency 1]
+                                    [--latency-ms 40] [--jitter-ms 20]
+                                    [--error-rate 0] [--timeout-rate 0] [--read-timeout 2]
+Starts tools/fake_razorpay.py in-process and points RAZORPAY_BASE_URL at it,
+so razorpay_checkout creates real orders over HTTP and razorpay_callback
+verifies real signatures. Reports throughput and latency percentiles.
+Uses a throwaway SQLite database; does not need the dev server.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from benchutil import setup_django, make_show, make_user, timed
+from fake_razorpay import FakeRazorpay, start_server
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return 'no samples'
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    return (f'p50 {pick(0.50):7.1f}  p95 {pick(0.95):7.1f}  p99 {pick(0.99):7.1f}  '
+            f'max {samples[-1] * 1000:7.1f} ms  (mean {statistics.mean(samples) * 1000:.1f})')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--payments', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=40)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--read-timeout', type=float, default=2)
+    args = parser.parse_args()
+
+    setup_django()
+    from decimal import Decimal
+    from django.conf import settings
+    # Worker threads open their own connections: wait for SQLite's single
+    # writer instead of failing with "database is locked"
+    settings.DATABASES['default'].setdefault('OPTIONS', {}).update(timeout=30, transaction_mode='IMMEDIATE')
+    from django.test import Client
+    from bookings.holds import claim_seats
+    from bookings.models import Booking
+    from payments import gateway
+    from payments.models import Payment
+
+    fake = FakeRazorpay(
+        key_id=settings.RAZORPAY_KEY_ID, key_secret=settings.RAZORPAY_KEY_SECRET,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate, hang_seconds=args.read_timeout * 2,
+    )
+    server, base_url = start_server(fake)
+    settings.RAZORPAY_BASE_URL = base_url
+    settings.RAZORPAY_FORCE_SIMULATION = False
+    settings.RAZORPAY_READ_TIMEOUT = args.read_timeout
+    settings.ALLOWED_HOSTS = ['*']
+    settings.QR_RENDER_WORKERS = 0
+    gateway.reset()
+
+    user = make_user()
+    cols = 20
+    show = make_show(rows=-(-args.payments // cols), cols=cols)
+    with timed(f'setup: {args.payments} pending bookings with one held seat'):
+        payments = []
+        for seat in show.screen.seats.order_by('position')[:args.payments]:
+            booking = Booking.objects.create(
+                user=user, show=show, total_amount=200, final_amount=210, status='pending'
+            )
+            claim_seats(booking, [(seat, Decimal('200'), Decimal('10'), Decimal('210'))])
+            payments.append(Payment.objects.create(
+                booking=booking, amount=booking.final_amount, total_amount=booking.final_amount,
+            ))
+
+    checkout_times, callback_times, failures = [], [], []
+    lock = threading.Lock()
+    pending = iter(payments)
+
+    def worker():
+        client = Client()
+        client.force_login(user)
+        while True:
+            with lock:
+                payment = next(pending, None)
+            if payment is None:
+                return
+            start = time.perf_counter()
+            response = client.get(f'/payments/{payment.pk}/checkout/')
+            elapsed = time.perf_counter() - start
+            order_id = Payment.objects.values_list('razorpay_order_id', flat=True).get(pk=payment.pk)
+            if response.status_code != 200 or not (order_id or '').startswith('order_'):
+                with lock:
+                    checkout_times.append(elapsed)
+                    failures.append(('checkout', payment.pk))
+                continue
+            # The customer pays in the checkout popup (not timed)
+            status, paid = fake.handle('POST', f'/_fake/orders/{order_id}/pay', {}, {}, None)
+            paid['payment_id'] = payment.pk
+            start = time.perf_counter()
+            response = client.post('/payments/callback/', paid)
+            with lock:
+                checkout_times.append(elapsed)
+                callback_times.append(time.perf_counter() - start)
+                if response.status_code != 200 or response.json().get('status') != 'success':
+                    failures.append(('callback', payment.pk))
+
+    with timed(f'{args.payments} checkouts + callbacks x{args.concurrency}', count=args.payments):
+        threads = [threading.Thread(target=worker) for _ in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    print(f'checkout  {percentiles(checkout_times)}')
+    print(f'callback  {percentiles(callback_times)}')
+    confirmed = Booking.objects.filter(show=show, status='confirmed').count()
+    print(f'confirmed {confirmed}/{args.payments}; failed: '
+          f'{sum(1 for kind, _ in failures if kind == "checkout")} checkouts, '
+          f'{sum(1 for kind, _ in failures if kind == "callback")} callbacks; '
+          f'circuit breaker {gateway.breaker.state}')
+    print('gateway calls:', dict(sorted(fake.stats.items())))
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
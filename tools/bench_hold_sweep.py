@@ -0,0 +1,62 @@
+"""
+Benchmark: cost of sweeping expired seat holds
+Run: python tools/bench_hold_sweep.py [--holds 100000] [--shows 250]
+Uses a throwaway SQLite database; does not need the dev server.
+"""
+import argparse
+from datetime import timedelta
+
+from benchutil import setup_django, make_show, make_user, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--holds', type=int, default=100000)
+    parser.add_argument('--shows', type=int, default=250)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    from decimal import Decimal
+    from django.db import connection
+    from django.utils import timezone
+    from bookings.holds import release_expired_holds
+    from bookings.models import Booking, SeatHold
+    from theatres.occupancy import get_seat_map
+
+    user = make_user()
+    per_show = -(-args.holds // args.shows)
+    cols = 20
+    rows = -(-per_show // cols)
+    expired_at = timezone.now() - timedelta(minutes=1)
+
+    with timed(f'setup: {args.holds:,} expired holds on {args.shows} shows'):
+        remaining = args.holds
+        shows = []
+        while remaining > 0:
+            show = make_show(rows=rows, cols=cols)
+            shows.append(show)
+            booking = Booking.objects.create(
+                user=user, show=show, total_amount=0, final_amount=0, status='pending'
+            )
+            seats = list(show.screen.seats.order_by('position')[:min(per_show, remaining)])
+            SeatHold.objects.bulk_create([
+                SeatHold(booking=booking, show=show, seat=seat, base_price=Decimal('200'),
+                         final_price=Decimal('210'), expires_at=expired_at)
+                for seat in seats
+            ], batch_size=2000)
+            remaining -= len(seats)
+            get_seat_map(show)  # build the map so the sweep has bits to clear
+
+    connection.queries_log.clear()
+    with timed('release_expired_holds', count=args.holds):
+        released = release_expired_holds(batch_size=args.batch_size)
+
+    assert released == args.holds, released
+    assert SeatHold.objects.count() == 0
+    assert all(get_seat_map(s).held_bits == 0 for s in shows)
+    print(f'released {released:,} holds; every seat map cleared')
+
+
+if __name__ == '__main__':
+    main()
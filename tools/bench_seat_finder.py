@@ -0,0 +1,79 @@
+"""
+Benchmark: best-available seat block search
+Run: python tools/bench_seat_finder.py [--rows 20] [--cols 25] [--repeat 200]
+Times the single-pass finder against scoring every window seat by seat on a
+500-seat screen at increasing occupancy (random seats taken, fixed seed).
+Uses a throwaway SQLite database.
+"""
+import argparse
+import random
+
+from benchutil import setup_django, make_show, timed
+
+
+def naive_block(rows, free_bits, count):
+    """Check and score every window independently: O(rows x seats x count)"""
+    from theatres import seat_finder
+
+    best = None
+    last_row = max(len(rows) - 1, 1)
+    for row_number, (label, seats) in enumerate(rows):
+        depth = abs(row_number / last_row - seat_finder.IDEAL_ROW_DEPTH)
+        row_mid = (seats[0][0] + seats[-1][0]) / 2
+        half_width = max((seats[-1][0] - seats[0][0]) / 2, 1)
+        for start in range(len(seats) - count + 1):
+            block = seats[start:start + count]
+            if not all((free_bits >> seat[1]) & 1 for seat in block):
+                continue
+            if any(b[0] != a[0] + 1 for a, b in zip(block, block[1:])):
+                continue
+            preference = sum(seat_finder.TYPE_PREFERENCE.get(seat[2], 0) for seat in block) / count / 2
+            score = (seat_finder.CENTRE_WEIGHT * abs((block[0][0] + block[-1][0]) / 2 - row_mid) / half_width
+                     + seat_finder.DEPTH_WEIGHT * depth - seat_finder.TYPE_WEIGHT * preference)
+            if best is None or score < best[0]:
+                best = (score, label, [seat[3] for seat in block])
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20)
+    parser.add_argument('--cols', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from theatres.occupancy import get_seat_map, update_positions
+    from theatres.seat_finder import best_block, find_best_seats, row_index
+
+    show = make_show(rows=args.rows, cols=args.cols)
+    total = args.rows * args.cols
+    rows = row_index(show.screen_id, show.screen.layout_version).rows
+    rng = random.Random(42)
+    print(f'{total} seats in {args.rows} rows')
+
+    taken = set()
+    for occupancy in (0.5, 0.8, 0.9, 0.95):
+        extra = rng.sample(sorted(set(range(total)) - taken), int(total * occupancy) - len(taken))
+        taken.update(extra)
+        seat_map = update_positions(show.pk, book=extra)
+        free_bits = seat_map.sellable_bits & ~seat_map.taken_bits
+        for count in (2, 4, 8):
+            label = f'{occupancy:.0%} taken, {count} together'
+            with timed(f'{label}: naive', count=args.repeat):
+                for _ in range(args.repeat):
+                    naive = naive_block(rows, free_bits, count)
+            with timed(f'{label}: single pass', count=args.repeat):
+                for _ in range(args.repeat):
+                    block = best_block(rows, free_bits, count)
+            assert (naive and naive[2]) == (block and block.seat_ids), (naive, block)
+            print(f'  -> {f"row {block.row} seats {block.numbers}" if block else "no block"}')
+
+    get_seat_map(show)
+    with timed('find_best_seats (map read + cached layout)', count=args.repeat):
+        for _ in range(args.repeat):
+            find_best_seats(show, 2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: seat layout grid rendering by screen size
+Run: python tools/bench_seat_layout.py [--repeat 50]
+Compares the per-request template loop over every Seat (as seat_layout used
+to render) with the compiled per-screen grid that only splices in taken
+seats, at 50% occupancy. Uses a throwaway SQLite database.
+"""
+import argparse
+import random
+
+from benchutil import setup_django, make_show, timed
+
+# The seat loop the seat_layout template used to run on every request
+LOOP_TEMPLATE = """{% for row, seats_list in seats_by_row.items %}<div class="seat-row mb-3"><div class="row-label me-3">{{ row }}</div><div class="seats">{% for seat in seats_list %}<div class="seat-wrapper" data-position="{{ seat.position }}" data-seat-id="{{ seat.id }}" data-seat-label="{{ seat.row }}{{ seat.seat_number }}" data-seat-price="{{ seat.base_price }}">{% if seat.position in booked_positions %}<div class="seat seat-booked" title="{{ seat.row }}{{ seat.seat_number }} - Booked"><i class="fas fa-chair"></i></div>{% else %}<label class="seat-label"><input type="checkbox" name="seats" value="{{ seat.id }}" class="seat-checkbox" data-seat-label="{{ seat.row }}{{ seat.seat_number }}" data-seat-price="{{ seat.base_price }}"><div class="seat seat-available" title="{{ seat.row }}{{ seat.seat_number }} - ₹{{ seat.base_price }}"><i class="fas fa-chair"></i></div></label>{% endif %}</div>{% endfor %}</div></div>{% endfor %}"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.template import Context, Template
+    from theatres.occupancy import get_seat_map, update_positions
+    from theatres.seat_grid import seat_grid_html
+
+    loop = Template(LOOP_TEMPLATE)
+    rng = random.Random(3)
+    for rows, cols in ((10, 10), (20, 25), (25, 40)):
+        show = make_show(rows=rows, cols=cols)
+        total = rows * cols
+        update_positions(show.pk, book=rng.sample(range(total), total // 2))
+        label = f'{total} seats'
+
+        with timed(f'{label}: template loop over Seat rows', count=args.repeat):
+            for _ in range(args.repeat):
+                seats_by_row = {}
+                for seat in show.screen.seats.all().order_by('row', 'seat_number'):
+                    seats_by_row.setdefault(seat.row, []).append(seat)
+                booked_positions = get_seat_map(show).booked_positions()
+                old = loop.render(Context({'seats_by_row': seats_by_row, 'booked_positions': booked_positions}))
+
+        seat_grid_html(show.screen, 0)  # compile once
+        with timed(f'{label}: compiled grid + overlay', count=args.repeat):
+            for _ in range(args.repeat):
+                new = seat_grid_html(show.screen, get_seat_map(show).taken_bits)
+
+        assert old.count('seat-booked') == new.count('seat-booked') == total // 2
+        print(f'  {len(new):,} bytes of seat markup')
+
+
+if __name__ == '__main__':
+    main()
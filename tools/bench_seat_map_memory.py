@@ -0,0 +1,89 @@
+"""
+Benchmark: memory and CPU per seat-map read, ORM rows vs compact arrays
+Run: python tools/bench_seat_map_memory.py [--rows 20] [--cols 25] [--repeat 200]
+Builds the per-seat status list a seat map request returns from Seat model
+instances, from values() dicts, and from the screen's CompactSeats table.
+Peak allocations are measured with tracemalloc. Uses a throwaway SQLite
+database.
+"""
+import argparse
+import random
+import tracemalloc
+
+from benchutil import setup_django, make_show, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20)
+    parser.add_argument('--cols', type=int, default=25)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+    from theatres.compact import compact_seats, seats_for
+    from theatres.models import Seat
+    from theatres.occupancy import update_positions
+
+    show = make_show(rows=args.rows, cols=args.cols)
+    total = args.rows * args.cols
+    taken = update_positions(show.pk, book=random.Random(5).sample(range(total), total // 2)).taken_bits
+    screen = show.screen
+
+    def from_models():
+        return [
+            {'id': seat.id, 'row': seat.row, 'seat_number': seat.seat_number, 'type': seat.seat_type,
+             'price': float(seat.base_price),
+             'is_booked': seat.position is not None and bool((taken >> seat.position) & 1)}
+            for seat in Seat.objects.filter(screen_id=screen.pk)
+        ]
+
+    def from_values():
+        return [
+            {'id': seat['id'], 'row': seat['row'], 'seat_number': seat['seat_number'], 'type': seat['seat_type'],
+             'price': float(seat['base_price']),
+             'is_booked': seat['position'] is not None and bool((taken >> seat['position']) & 1)}
+            for seat in Seat.objects.filter(screen_id=screen.pk).values(
+                'id', 'row', 'seat_number', 'seat_type', 'base_price', 'position')
+        ]
+
+    def from_compact():
+        seats = seats_for(screen)
+        return [
+            {'id': seats.ids[idx], 'row': seats.row_labels[seats.rows[idx]], 'seat_number': seats.numbers[idx],
+             'type': seats.seat_type(idx), 'price': seats.price(idx), 'is_booked': seats.is_taken(idx, taken)}
+            for idx in range(len(seats))
+        ]
+
+    def loaded_models():
+        return list(Seat.objects.filter(screen_id=screen.pk))
+
+    def loaded_compact():
+        compact_seats.cache_clear()
+        return seats_for(screen)
+
+    def peak(fn):
+        fn()  # warm caches and query compilation
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        kept = fn()
+        current, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return current, peak_bytes
+
+    print(f'{total} seats, half taken')
+    for label, fn in (('Seat instances', from_models), ('values() dicts', from_values), ('CompactSeats', from_compact)):
+        with timed(f'status list from {label}', count=args.repeat):
+            for _ in range(args.repeat):
+                fn()
+        _, peak_bytes = peak(fn)
+        print(f'  peak allocation per request: {peak_bytes / 1024:,.1f} KiB')
+
+    for label, fn in (('Seat instances', loaded_models), ('CompactSeats (cold build)', loaded_compact)):
+        current, peak_bytes = peak(fn)
+        print(f'seat table as {label:<26} kept {current / 1024:8,.1f} KiB, peak {peak_bytes / 1024:8,.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Benchmark: full seat JSON vs packed occupancy (payload size and view time)
+Run: python tools/bench_seat_wire.py [--rows 15] [--cols 20] [--repeat 500]
+Calls theatres.views.get_seat_status directly; half the seats are booked.
+Uses a throwaway SQLite database.
+"""
+import argparse
+import json
+
+from benchutil import setup_django, make_show, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=15)
+    parser.add_argument('--cols', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import RequestFactory
+    from theatres.occupancy import get_seat_map, update_positions
+    from theatres.views import get_seat_status, screen_layout
+
+    show = make_show(rows=args.rows, cols=args.cols)
+    get_seat_map(show)
+    update_positions(show.pk, book=range(0, args.rows * args.cols, 2))
+    factory = RequestFactory()
+    print(f'{args.rows * args.cols} seats, half booked')
+
+    full_request = factory.get('/', {})
+    packed_request = factory.get('/', {'format': 'packed'})
+
+    with timed('full JSON: get_seat_status', count=args.repeat):
+        for _ in range(args.repeat):
+            full = get_seat_status(full_request, show.pk)
+    with timed('packed: get_seat_status?format=packed', count=args.repeat):
+        for _ in range(args.repeat):
+            packed = get_seat_status(packed_request, show.pk)
+
+    layout = screen_layout(factory.get('/'), show.screen_id, show.screen.layout_version)
+    seats = json.loads(full.content)['seats']
+    with timed('json.dumps only: full seat list', count=args.repeat):
+        for _ in range(args.repeat):
+            json.dumps(seats)
+    occupancy = json.loads(packed.content)
+    with timed('json.dumps only: packed occupancy', count=args.repeat):
+        for _ in range(args.repeat):
+            json.dumps(occupancy)
+
+    print(f'full response:      {len(full.content):>8,} bytes per poll')
+    print(f'packed occupancy:   {len(packed.content):>8,} bytes per poll')
+    print(f'layout descriptor:  {len(layout.content):>8,} bytes once per layout version (cached forever)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: city-wide "N seats together" search
+Run: python tools/bench_seats_together.py [--shows 300] [--repeat 50]
+Compares the indexed Show.max_run filter with loading every show's seat map
+and scanning its rows. Shows are 300-seat screens with random occupancy
+(fixed seed). Uses a throwaway SQLite database.
+"""
+import argparse
+import random
+from datetime import date, time as dtime, timedelta
+
+from benchutil import setup_django, make_show, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shows', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--seats', type=int, default=6, help='group size searched for')
+    args = parser.parse_args()
+
+    setup_django()
+    from theatres.availability import shows_with_seats_together
+    from theatres.models import Show, ShowSeatMap
+    from theatres.occupancy import get_seat_maps, update_positions
+    from theatres.seat_finder import longest_run, row_index
+
+    first = make_show(rows=15, cols=20)
+    Show.objects.bulk_create([
+        Show(screen=first.screen, movie=first.movie, show_date=date.today() + timedelta(days=idx % 7),
+             show_time=dtime(9 + idx % 14, 0), end_time=dtime(23, 0), base_ticket_price=150 + idx % 5 * 50)
+        for idx in range(args.shows - 1)
+    ])
+    shows = list(Show.objects.filter(movie=first.movie))
+    get_seat_maps(shows)
+    rng = random.Random(7)
+    for show in shows:
+        update_positions(show.pk, book=rng.sample(range(300), rng.randint(150, 295)))
+    city = first.screen.theatre.city
+    window = (date.today(), date.today() + timedelta(days=6))
+    print(f'{len(shows)} shows of 300 seats, 50-98% taken; searching for {args.seats} together')
+
+    def scan_maps():
+        candidates = Show.objects.filter(
+            movie=first.movie, screen__theatre__city__iexact=city, show_date__range=window,
+            is_active=True, status='available',
+        ).select_related('screen')
+        maps = ShowSeatMap.objects.in_bulk([show.pk for show in candidates])
+        found = []
+        for show in candidates:
+            seat_map = maps[show.pk]
+            free_bits = seat_map.sellable_bits & ~seat_map.taken_bits
+            rows = row_index(show.screen_id, show.screen.layout_version).rows
+            if max(longest_run(seats, free_bits) for _, seats in rows) >= args.seats:
+                found.append(show.pk)
+        return found
+
+    with timed('load every seat map and scan rows', count=args.repeat):
+        for _ in range(args.repeat):
+            scanned = scan_maps()
+    with timed('max_run summary filter', count=args.repeat):
+        for _ in range(args.repeat):
+            matched = list(shows_with_seats_together(first.movie_id, city, *window, args.seats))
+    assert sorted(scanned) == sorted(show.pk for show in matched)
+    print(f'{len(matched)} of {len(shows)} shows can seat {args.seats} together')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: ticket PDF rendering throughput
+Run: python tools/bench_ticket_pdf.py [--group 50] [--repeat 20]
+Compares the cached renderer with a cold start per page (fonts and static
+artwork redrawn every time, as the views used to do) for a single-ticket
+and a multi-ticket booking. Uses a throwaway SQLite database.
+"""
+import argparse
+
+from benchutil import setup_django, make_show, make_user, timed
+
+
+def make_booking(show, user, seats):
+    from decimal import Decimal
+    from bookings.models import Booking, Ticket
+
+    booking = Booking.objects.create(
+        user=user, show=show, total_amount=0, final_amount=0, status='confirmed'
+    )
+    tickets = []
+    for seat in seats:
+        ticket = Ticket(booking=booking, show=show, seat=seat, base_price=Decimal('200'),
+                        tax=Decimal('10'), final_price=Decimal('210'))
+        ticket.assign_identifiers()
+        tickets.append(ticket)
+    Ticket.objects.bulk_create(tickets)
+    for ticket in tickets:
+        ticket.ensure_qr_code()
+    return list(booking.tickets.select_related('booking', 'seat', 'show__movie'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--group', type=int, default=50, help='tickets in the multi-ticket booking')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from bookings import ticket_pdf
+
+    show = make_show(rows=10, cols=max(10, -(-args.group // 10) + 1))
+    user = make_user()
+    seats = list(show.screen.seats.order_by('position'))
+    single = make_booking(show, user, seats[:1])
+    group = make_booking(show, user, seats[1:args.group + 1])
+
+    def cold():
+        ticket_pdf.get_fonts.cache_clear()
+        ticket_pdf.page_template.cache_clear()
+
+    for label, tickets, numbered in (('single ticket', single, False), (f'{args.group}-ticket booking', group, True)):
+        count = len(tickets) * args.repeat
+
+        with timed(f'{label}: cold fonts/artwork per page', count=count):
+            for _ in range(args.repeat):
+                pages = []
+                for idx, ticket in enumerate(tickets):
+                    cold()
+                    data = ticket_pdf.ticket_page_data(ticket, *((idx + 1, len(tickets)) if numbered else ()))
+                    pages.append(ticket_pdf.render_page(data))
+
+        ticket_pdf.page_template()  # warm the caches once
+        with timed(f'{label}: cached renderer (pages only)', count=count):
+            for _ in range(args.repeat):
+                for idx, ticket in enumerate(tickets):
+                    data = ticket_pdf.ticket_page_data(ticket, *((idx + 1, len(tickets)) if numbered else ()))
+                    ticket_pdf.render_page(data)
+
+        with timed(f'{label}: cached renderer (full PDF)', count=count):
+            for _ in range(args.repeat):
+                pdf = ticket_pdf.render_tickets_pdf(tickets, numbered=numbered)
+
+        assert pdf.startswith(b'%PDF')
+        print(f'{label}: {len(pdf):,} bytes per PDF')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Benchmark: serial vs process-pool rendering of a large booking's PDF
+Run: python tools/bench_ticket_pdf_parallel.py [--tickets 50] [--workers 4] [--repeat 3]
+The first parallel run includes spawning the pool; later runs reuse it,
+as a long-running web worker would. Uses a throwaway SQLite database.
+"""
+import argparse
+import os
+
+from benchutil import setup_django, make_show, make_user, timed
+from bench_ticket_pdf import make_booking
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tickets', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from bookings.ticket_pdf import render_tickets_pdf
+
+    settings.TICKET_PDF_PARALLEL_MIN_PAGES = 2
+    show = make_show(rows=10, cols=-(-args.tickets // 10))
+    tickets = make_booking(show, make_user(), show.screen.seats.order_by('position')[:args.tickets])
+    print(f'{len(tickets)} tickets, {args.workers} workers, {os.cpu_count()} CPUs')
+
+    with timed('serial (in-process)', count=len(tickets) * args.repeat):
+        for _ in range(args.repeat):
+            serial = render_tickets_pdf(tickets, numbered=True, workers=0)
+
+    with timed('parallel: first run (spawns pool)', count=len(tickets)):
+        parallel = render_tickets_pdf(tickets, numbered=True, workers=args.workers)
+
+    with timed('parallel: warm pool', count=len(tickets) * args.repeat):
+        for _ in range(args.repeat):
+            parallel = render_tickets_pdf(tickets, numbered=True, workers=args.workers)
+
+    assert parallel == serial, 'parallel output differs from serial'
+    print(f'identical output, {len(serial):,} bytes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: streamed vs buffered booking PDF (time to first byte, peak RSS)
+Run: python tools/bench_ticket_pdf_stream.py [--sizes 10,100,300]
+Each measurement runs in a fresh subprocess so peak RSS is per mode and size.
+"Buffered" keeps every page canvas and saves with Pillow, as booking_download
+used to. Uses a throwaway SQLite database per run; rendering is serial.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+from benchutil import setup_django, make_show, make_user
+
+
+def run_one(mode, tickets_count):
+    setup_django()
+    from io import BytesIO
+    from bench_ticket_pdf import make_booking
+    from bookings import ticket_pdf
+
+    show = make_show(rows=-(-tickets_count // 20), cols=20)
+    tickets = make_booking(show, make_user(), show.screen.seats.order_by('position')[:tickets_count])
+    ticket_pdf.page_template()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    if mode == 'stream':
+        for chunk in ticket_pdf.stream_tickets_pdf(tickets, numbered=True, workers=0):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+    else:
+        pages = [
+            ticket_pdf.render_page(ticket_pdf.ticket_page_data(t, idx + 1, len(tickets)))
+            for idx, t in enumerate(tickets)
+        ]
+        buf = BytesIO()
+        pages[0].save(buf, format='PDF', save_all=True, append_images=pages[1:])
+        first_byte = time.perf_counter() - start
+        size = buf.tell()
+    total = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f'{mode:<9} {tickets_count:>6} {first_byte * 1000:10.1f} {total * 1000:10.1f} '
+          f'{(peak - baseline) / 1024:10.1f} {size / 1024:10.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10,100,300')
+    parser.add_argument('--run', nargs=2, metavar=('MODE', 'TICKETS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_one(args.run[0], int(args.run[1]))
+        return
+
+    print(f'{"mode":<9} {"tickets":>6} {"TTFB ms":>10} {"total ms":>10} {"+RSS MB":>10} {"PDF KB":>10}')
+    for size in (int(s) for s in args.sizes.split(',')):
+        for mode in ('buffered', 'stream'):
+            subprocess.run([sys.executable, __file__, '--run', mode, str(size)], check=True)
+
+
+if __name__ == '__main__':
+    main()
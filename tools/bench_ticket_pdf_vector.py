@@ -0,0 +1,41 @@
+"""
+Benchmark: raster vs vector ticket PDFs (file size and render speed)
+Run: python tools/bench_ticket_pdf_vector.py [--group 50] [--repeat 10]
+Rendering is serial and in-process for both modes. Uses a throwaway SQLite database.
+"""
+import argparse
+
+from benchutil import setup_django, make_show, make_user, timed
+from bench_ticket_pdf import make_booking
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--group', type=int, default=50, help='tickets in the multi-ticket booking')
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from bookings.ticket_pdf import render_tickets_pdf
+
+    show = make_show(rows=-(-(args.group + 1) // 20), cols=20)
+    seats = list(show.screen.seats.order_by('position'))
+    user = make_user()
+    single = make_booking(show, user, seats[:1])
+    group = make_booking(show, user, seats[1:args.group + 1])
+
+    sizes = {}
+    for label, tickets, numbered in (('single ticket', single, False), (f'{args.group}-ticket booking', group, True)):
+        for mode in ('raster', 'vector'):
+            render_tickets_pdf(tickets[:1], mode=mode)  # warm font/template caches
+            with timed(f'{label}: {mode}', count=len(tickets) * args.repeat):
+                for _ in range(args.repeat):
+                    pdf = render_tickets_pdf(tickets, numbered=numbered, workers=0, mode=mode)
+            sizes[label, mode] = len(pdf)
+        raster, vector = sizes[label, 'raster'], sizes[label, 'vector']
+        print(f'{label}: raster {raster / 1024:,.1f} KB, vector {vector / 1024:,.1f} KB '
+              f'({raster / vector:,.0f}x smaller)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Shared helpers for the benchmark scripts in tools/
+- Boots Django against a throwaway SQLite database (never touches db.sqlite3)
+- Builds a minimal theatre/screen/show fixture
+- Simple wall-clock timer
+"""
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(db_path=None):
+    """Configure Django with a scratch database and apply migrations"""
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'movie_booking_project.settings')
+
+    from django.conf import settings
+    scratch = tempfile.mkdtemp(prefix='cinebook-bench-')
+    settings.DATABASES['default']['NAME'] = db_path or os.path.join(scratch, 'bench.sqlite3')
+    settings.MEDIA_ROOT = os.path.join(scratch, 'media')
+
+    import django
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def make_show(rows=10, cols=10, price=200):
+    """Create a theatre with one screen, its seats and a single show"""
+    from datetime import date, time as dtime
+    from movies.models import Movie
+    from theatres.models import Theatre, Screen, Seat, Show
+
+    theatre = Theatre.objects.create(
+        name=f'Bench Theatre {time.time_ns()}', address='-', city='Pune', state='MH',
+        postal_code='411001', phone_number='0', email='bench@example.com', total_screens=1,
+    )
+    screen = Screen.objects.create(
+        theatre=theatre, name='Screen 1', capacity=rows * cols, total_rows=rows, seats_per_row=cols,
+    )
+    Seat.objects.bulk_create([
+        Seat(screen=screen, row=chr(ord('A') + r % 26) * (1 + r // 26), seat_number=c + 1,
+             base_price=price, position=r * cols + c)
+        for r in range(rows) for c in range(cols)
+    ])
+    movie = Movie.objects.create(
+        title='Bench Movie', description='-', poster='movie_posters/bench.jpg',
+        release_date=date.today(), duration_minutes=120, language='english',
+    )
+    return Show.objects.create(
+        screen=screen, movie=movie, show_date=date.today(), show_time=dtime(20, 0),
+        end_time=dtime(22, 0), base_ticket_price=price,
+    )
+
+
+def make_user(username='bench'):
+    from django.contrib.auth.models import User
+    user, _ = User.objects.get_or_create(username=username)
+    return user
+
+
+@contextmanager
+def timed(label, count=None):
+    """Print elapsed wall time (and rate when count is given) for a block"""
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    rate = f' ({count / elapsed:,.0f}/s)' if count and elapsed else ''
+    print(f'{label:<48} {elapsed * 1000:10.1f} ms{rate}')
@@ -0,0 +1,341 @@
+"""
+Local stand-in for the Razorpay API (orders, payments, refunds, signatures)
+Run: python tools/fake_razorpay.py [--port 9090] [--latency-ms 50] [--jitter-ms 20]
+                                   [--error-rate 0.01] [--timeout-rate 0.01]
+Then start the app with RAZORPAY_BASE_URL=http://127.0.0.1:9090 and
+RAZORPAY_FORCE_SIMULATION=False; the real client code path is used unchanged.
+- Speaks the JSON API the razorpay SDK calls: /v1/orders, /v1/payments,
+  /v1/refunds, with HTTP basic auth on the key id and secret
+- POST /_fake/orders/<id>/pay plays the checkout popup: it creates a
+  captured payment and returns the razorpay_order_id/razorpay_payment_id/
+  razorpay_signature fields the browser would post to our callback
+- Latency and error injection (5xx SERVER_ERROR, or a hung request) per call
+- State lives in memory; GET /_fake/stats shows request counts
+Keys default to RAZORPAY_KEY_ID/RAZORPAY_KEY_SECRET from the environment,
+else the test keys from settings.py.
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_KEY_ID = os.environ.get('RAZORPAY_KEY_ID', 'rzp_test_S1fft0Wgnv1ulI')
+DEFAULT_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET', 'KuicTTUt04XID2bNu1j5aeJj')
+
+# Entity ids in a path, folded for the per-endpoint request counts
+ENTITY_ID = re.compile(r'/(order|pay|rfnd)_\w+')
+
+
+def signature(order_id, payment_id, secret):
+    """Checkout signature: HMAC-SHA256 of 'order_id|payment_id' with the key secret"""
+    return hmac.new(secret.encode(), f'{order_id}|{payment_id}'.encode(), hashlib.sha256).hexdigest()
+
+
+class ApiError(Exception):
+    def __init__(self, status, code, description):
+        super().__init__(description)
+        self.status = status
+        self.code = code
+        self.description = description
+
+
+def bad_request(description, status=400):
+    return ApiError(status, 'BAD_REQUEST_ERROR', description)
+
+
+class FakeRazorpay:
+    """In-memory gateway state and API semantics, independent of HTTP"""
+
+    def __init__(self, key_id=DEFAULT_KEY_ID, key_secret=DEFAULT_KEY_SECRET,
+                 latency_ms=0, jitter_ms=0, error_rate=0.0, timeout_rate=0.0, hang_seconds=30):
+        self.key_id = key_id
+        self.key_secret = key_secret
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.orders = {}
+        self.payments = {}
+        self.refunds = {}
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self.routes = [
+            ('GET', r'/v1/orders', self.list_orders),
+            ('POST', r'/v1/orders', self.create_order),
+            ('GET', r'/v1/orders/(?P<order_id>[\w]+)', self.fetch_order),
+            ('GET', r'/v1/orders/(?P<order_id>[\w]+)/payments', self.order_payments),
+            ('GET', r'/v1/payments/(?P<payment_id>[\w]+)', self.fetch_payment),
+            ('POST', r'/v1/payments/(?P<payment_id>[\w]+)/capture', self.capture_payment),
+            ('POST', r'/v1/payments/(?P<payment_id>[\w]+)/refund', self.refund_payment),
+            ('POST', r'/v1/refunds', self.create_refund),
+            ('GET', r'/v1/refunds/(?P<refund_id>[\w]+)', self.fetch_refund),
+            ('POST', r'/_fake/orders/(?P<order_id>[\w]+)/pay', self.pay_order),
+            ('GET', r'/_fake/stats', self.get_stats),
+        ]
+
+    # -- request handling -------------------------------------------------
+
+    def authorised(self, header):
+        if not header or not header.startswith('Basic '):
+            return False
+        try:
+            key_id, _, key_secret = base64.b64decode(header[6:]).decode().partition(':')
+        except ValueError:
+            return False
+        return key_id == self.key_id and key_secret == self.key_secret
+
+    def inject_faults(self):
+        """Sleep for the configured latency; maybe hang or fail the request"""
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+        if self.timeout_rate and random.random() < self.timeout_rate:
+            with self.lock:
+                self.stats['injected_timeouts'] += 1
+            time.sleep(self.hang_seconds)
+        if self.error_rate and random.random() < self.error_rate:
+            with self.lock:
+                self.stats['injected_errors'] += 1
+            raise ApiError(500, 'SERVER_ERROR', 'Injected failure')
+
+    def handle(self, method, path, query, body, auth_header):
+        """Returns (HTTP status, JSON-serialisable body)"""
+        endpoint = ENTITY_ID.sub(r'/:\1', path)
+        with self.lock:
+            self.stats[f'{method} {endpoint}'] += 1
+        try:
+            if not path.startswith('/_fake/'):
+                self.inject_faults()
+                if not self.authorised(auth_header):
+                    raise bad_request('Authentication failed', status=401)
+            for route_method, pattern, view in self.routes:
+                match = re.fullmatch(pattern, path)
+                if match and route_method == method:
+                    with self.lock:
+                        return 200, view(query=query, body=body, **match.groupdict())
+            raise bad_request('The requested URL was not found on the server.', status=404)
+        except ApiError as exc:
+            return exc.status, {'error': {'code': exc.code, 'description': exc.description}}
+
+    # -- entities ---------------------------------------------------------
+
+    def new_id(self, prefix):
+        return f'{prefix}_{secrets.token_hex(7)}'
+
+    def collection(self, items, query):
+        count = int(query.get('count', 10))
+        skip = int(query.get('skip', 0))
+        items = sorted(items, key=lambda item: item['created_at'], reverse=True)[skip:skip + count]
+        return {'entity': 'collection', 'count': len(items), 'items': items}
+
+    def get(self, store, entity_id):
+        if entity_id not in store:
+            raise bad_request('The id provided does not exist')
+        return store[entity_id]
+
+    def list_orders(self, query, body):
+        return self.collection(self.orders.values(), query)
+
+    def create_order(self, query, body):
+        amount = body.get('amount')
+        if not isinstance(amount, int) or amount < 100:
+            raise bad_request('The amount must be atleast INR 1.00.')
+        if not body.get('currency'):
+            raise bad_request('The currency field is required.')
+        order = {
+            'id': self.new_id('order'),
+            'entity': 'order',
+            'amount': amount,
+            'amount_paid': 0,
+            'amount_due': amount,
+            'currency': body['currency'],
+            'receipt': body.get('receipt'),
+            'status': 'created',
+            'attempts': 0,
+            'notes': body.get('notes') or [],
+            'created_at': int(time.time()),
+        }
+        self.orders[order['id']] = order
+        return order
+
+    def fetch_order(self, query, body, order_id):
+        return self.get(self.orders, order_id)
+
+    def order_payments(self, query, body, order_id):
+        self.get(self.orders, order_id)
+        return self.collection([p for p in self.payments.values() if p['order_id'] == order_id], query)
+
+    def fetch_payment(self, query, body, payment_id):
+        return self.get(self.payments, payment_id)
+
+    def capture_payment(self, query, body, payment_id):
+        payment = self.get(self.payments, payment_id)
+        if payment['status'] != 'authorized':
+            raise bad_request('This payment has already been captured' if payment['status'] == 'captured'
+                              else 'Only payments which have been authorized can be captured')
+        if body.get('amount') != payment['amount']:
+            raise bad_request('Capture amount must be equal to the amount authorized')
+        payment['status'] = 'captured'
+        payment['captured'] = True
+        return payment
+
+    def refund_payment(self, query, body, payment_id):
+        payment = self.get(self.payments, payment_id)
+        if payment['status'] not in ('captured', 'refunded'):
+            raise bad_request('Only captured payments can be refunded')
+        amount = body.get('amount', payment['amount'] - payment['amount_refunded'])
+        if not isinstance(amount, int) or amount <= 0 or amount > payment['amount'] - payment['amount_refunded']:
+            raise bad_request('The refund amount provided is greater than amount captured')
+        refund = {
+            'id': self.new_id('rfnd'),
+            'entity': 'refund',
+            'amount': amount,
+            'currency': payment['currency'],
+            'payment_id': payment_id,
+            'notes': body.get('notes') or [],
+            'receipt': body.get('receipt'),
+            'status': 'processed',
+            'speed_processed': 'normal',
+            'created_at': int(time.time()),
+        }
+        self.refunds[refund['id']] = refund
+        payment['amount_refunded'] += amount
+        payment['refund_status'] = 'full' if payment['amount_refunded'] == payment['amount'] else 'partial'
+        if payment['refund_status'] == 'full':
+            payment['status'] = 'refunded'
+        return refund
+
+    def create_refund(self, query, body):
+        return self.refund_payment(query, body, body.get('payment_id', ''))
+
+    def fetch_refund(self, query, body, refund_id):
+        return self.get(self.refunds, refund_id)
+
+    def pay_order(self, query, body, order_id):
+        """The customer completes checkout for an order (status: captured, authorized or failed)"""
+        order = self.get(self.orders, order_id)
+        status = body.get('status', 'captured')
+        if status not in ('captured', 'authorized', 'failed'):
+            raise bad_request(f'Unsupported payment status {status!r}')
+        if order['status'] == 'paid':
+            raise bad_request('Order is already paid')
+        payment = {
+            'id': self.new_id('pay'),
+            'entity': 'payment',
+            'amount': order['amount'],
+            'currency': order['currency'],
+            'status': status,
+            'order_id': order_id,
+            'method': body.get('method', 'upi'),
+            'captured': status == 'captured',
+            'amount_refunded': 0,
+            'refund_status': None,
+            'error_code': 'BAD_REQUEST_ERROR' if status == 'failed' else None,
+            'created_at': int(time.time()),
+        }
+        self.payments[payment['id']] = payment
+        order['attempts'] += 1
+        if status == 'failed':
+            order['status'] = 'attempted'
+            return {'error': {'code': 'BAD_REQUEST_ERROR', 'description': 'Payment failed',
+                              'metadata': {'order_id': order_id, 'payment_id': payment['id']}}}
+        order['status'] = 'paid'
+        order['amount_paid'] = order['amount']
+        order['amount_due'] = 0
+        return {
+            'razorpay_order_id': order_id,
+            'razorpay_payment_id': payment['id'],
+            'razorpay_signature': signature(order_id, payment['id'], self.key_secret),
+        }
+
+    def get_stats(self, query, body):
+        return dict(self.stats)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so pooled client connections are reused
+    gateway = None
+    quiet = True
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+    def dispatch(self, method):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {key: values[-1] for key, values in parse_qs(raw.decode()).items()}
+        status, payload = self.gateway.handle(method, url.path.rstrip('/'), query, body,
+                                              self.headers.get('Authorization'))
+        data = json.dumps(payload).encode()
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (e.g. timed out on an injected hang)
+            self.close_connection = True
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+
+def start_server(gateway, host='127.0.0.1', port=0, quiet=True):
+    """Serve a FakeRazorpay from a background thread; returns (server, base_url)"""
+    handler = type('FakeRazorpayHandler', (Handler,), {'gateway': gateway, 'quiet': quiet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9090)
+    parser.add_argument('--key-id', default=DEFAULT_KEY_ID)
+    parser.add_argument('--key-secret', default=DEFAULT_KEY_SECRET)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added delay per API call')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- spread on the delay')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered 500 SERVER_ERROR')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of calls that hang')
+    parser.add_argument('--hang-seconds', type=float, default=30, help='How long a hung call waits')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+
+    gateway = FakeRazorpay(
+        key_id=args.key_id, key_secret=args.key_secret, latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms, error_rate=args.error_rate, timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+    )
+    server, base_url = start_server(gateway, args.host, args.port, quiet=not args.verbose)
+    print(f'Fake Razorpay listening on {base_url} (key id {args.key_id})')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -236,13 +236,9 @@ def check_show_availability(show):
     Returns:
         Boolean indicating availability
     """
-    from bookings.models import Ticket
-    from theatres.models import Seat
+    from theatres.occupancy import get_seat_map
     
-    booked_count = Ticket.objects.filter(show=show).count()
-    total_seats = Seat.objects.filter(screen=show.screen).count()
-    
-    return booked_count < total_seats
+    return get_seat_map(show).available_count > 0
 
 
 def get_available_seat_count(show):
@@ -255,13 +251,9 @@ def get_available_seat_count(show):
     Returns:
         Number of available seats
     """
-    from bookings.models import Ticket
-    from theatres.models import Seat
-    
-    booked_count = Ticket.objects.filter(show=show).count()
-    total_seats = Seat.objects.filter(screen=show.screen, is_available=True).count()
+    from theatres.occupancy import get_seat_map
     
-    return total_seats - booked_count
+    return get_seat_map(show).available_count
 
 
 def get_occupied_seats(show):
@@ -274,6 +266,7 @@ def get_occupied_seats(show):
     Returns:
         List of seat IDs
     """
-    from bookings.models import Ticket
+    from theatres.occupancy import get_seat_map
     
-    return list(Ticket.objects.filter(show=show).values_list('seat_id', flat=True))
+    booked_positions = get_seat_map(show).booked_positions()
+    return list(show.screen.seats.filter(position__in=booked_positions).values_list('id', flat=True))
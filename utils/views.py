@@ -9,8 +9,10 @@ from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
+from theatres.compact import seats_for
 from theatres.models import Show, Seat
-from bookings.models import Ticket
+from theatres.occupancy import get_seat_map
+from theatres.packed import packed_seat_status
 from .forms import ContactForm
 
 logger = logging.getLogger(__name__)
@@ -20,21 +22,31 @@ logger = logging.getLogger(__name__)
 def get_available_seats_api(request, show_id):
     """
     API endpoint to get available seats for a show
-    Returns JSON with seat information
+    Returns JSON with seat information (?format=packed for the packed form)
     """
     try:
-        show = Show.objects.get(id=show_id)
-        booked_seat_ids = Ticket.objects.filter(show=show).values_list('seat_id', flat=True)
-        available_seats = show.screen.seats.filter(is_available=True).exclude(id__in=booked_seat_ids)
+        show = Show.objects.select_related('screen').get(id=show_id)
+        seat_map = get_seat_map(show)
+        if request.GET.get('format') == 'packed':
+            # Occupancy bitset + layout descriptor URL instead of per-seat objects
+            return JsonResponse(dict(
+                packed_seat_status(show, seat_map),
+                status='success',
+                total_available=seat_map.available_count,
+            ))
+        booked = seat_map.taken_bits
+        seats = seats_for(show.screen)
         
         seats_data = []
-        for seat in available_seats:
+        for idx in range(len(seats)):
+            if not seats.available[idx] or seats.is_taken(idx, booked):
+                continue
             seats_data.append({
-                'id': seat.id,
-                'row': seat.row,
-                'seat_number': seat.seat_number,
-                'type': seat.seat_type,
-                'price': float(seat.base_price),
+                'id': seats.ids[idx],
+                'row': seats.row_labels[seats.rows[idx]],
+                'seat_number': seats.numbers[idx],
+                'type': seats.seat_type(idx),
+                'price': seats.price(idx),
             })
         
         return JsonResponse({
@@ -55,19 +67,18 @@ def get_seat_status_api(request, show_id):
     API endpoint to get real-time seat status for a show
     """
     try:
-        show = Show.objects.get(id=show_id)
-        booked_seat_ids = list(Ticket.objects.filter(show=show).values_list('seat_id', flat=True))
+        show = Show.objects.select_related('screen').get(id=show_id)
+        booked = get_seat_map(show).taken_bits
         
-        seats = show.screen.seats.all()
+        seats = seats_for(show.screen)
         seat_status = {}
         
-        for seat in seats:
-            seat_key = f"{seat.row}{seat.seat_number}"
-            seat_status[seat_key] = {
-                'id': seat.id,
-                'booked': seat.id in booked_seat_ids,
-                'type': seat.seat_type,
-                'price': float(seat.base_price),
+        for idx in range(len(seats)):
+            seat_status[seats.label(idx)] = {
+                'id': seats.ids[idx],
+                'booked': seats.is_taken(idx, booked),
+                'type': seats.seat_type(idx),
+                'price': seats.price(idx),
             }
         
         return JsonResponse({